@@ -0,0 +1,57 @@
+"""
+记录淘汰数的缓存后端
+
+与 Django 自带的 LocMemCache / FileBasedCache 相同，只是缓存满后淘汰的条目数会累加到
+evictions[LOCATION]（当前进程内的计数），供缓存统计接口使用。在 settings.CACHES 中使用：
+    'BACKEND': 'articles.cache_backends.MeteredLocMemCache'
+"""
+import threading
+from collections import Counter
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+evictions = Counter()
+_lock = threading.Lock()
+
+
+def record_evictions(location, count):
+    if count > 0:
+        with _lock:
+            evictions[location] += count
+
+
+def get_evictions(cache):
+    """缓存实例累计淘汰的条目数（不是这两个后端时为None）"""
+    location = getattr(cache, 'location', None)
+    if location is None:
+        return None
+    with _lock:
+        return evictions[location]
+
+
+class MeteredLocMemCache(LocMemCache):
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        self.location = name
+
+    def _cull(self):
+        # 调用方已持有写锁
+        before = len(self._cache)
+        super()._cull()
+        record_evictions(self.location, before - len(self._cache))
+
+
+class MeteredFileBasedCache(FileBasedCache):
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self.location = dir
+
+    def _cull(self):
+        # set() 每次都会调用 _cull()，未满时与父类一样只列一次目录
+        before = len(self._list_cache_files())
+        if before < self._max_entries:
+            return
+        super()._cull()
+        record_evictions(self.location, before - len(self._list_cache_files()))
@@ -0,0 +1,72 @@
+"""
+文章表和单篇文章的缓存版本号
+
+每张文章表和每篇文章各有一个版本号：文章保存或删除后，表和该文章的版本号都换成新值，
+批量写入后表的版本号换成新值。依赖文章数据的缓存（列表计数、列表和分页响应、ETag 等）把版本号放进缓存键，
+版本变化后旧缓存自然失效，不需要逐条删除。
+
+版本号保存在 'versions' 缓存中（未配置时使用 default）。各进程的响应缓存可以是进程内的，
+但版本号必须所有进程共享，否则一个进程中的修改不会使其他进程的缓存失效；默认配置使用 FileBasedCache。
+更新版本号时写入新的随机值而不是加一：FileBasedCache 的 incr 不是原子操作，并发加一可能丢失一次更新，
+而两个并发写入的随机值都与之前的版本号不同。
+"""
+import uuid
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.db import transaction
+
+
+CACHE_ALIAS = 'versions'
+KEY_PREFIX = 'version:'
+
+
+def get_cache():
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _key(model, pk=None):
+    key = KEY_PREFIX + model._meta.db_table
+    return key if pk is None else f'{key}:{pk}'
+
+
+def _new_version():
+    # 版本号被淘汰后重新创建时也不能与旧版本号重复
+    return uuid.uuid4().hex
+
+
+def get_version(model, pk=None):
+    """文章表的版本号；给出 pk 时为单篇文章的版本号"""
+    cache = get_cache()
+    key = _key(model, pk)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(model, pk=None):
+    """
+    文章数据变化后调用（在事务中时应通过 transaction.on_commit 调用）
+
+    给出 pk 时同时更新这篇文章的版本号。
+    """
+    cache = get_cache()
+    keys = [_key(model)] if pk is None else [_key(model), _key(model, pk)]
+    cache.set_many({key: _new_version() for key in keys}, timeout=None)
+
+
+def bump_version_on_commit(model, pk=None):
+    """
+    在事务中修改文章后调用：立即更新版本号，事务提交后再更新一次
+
+    立即更新使本事务内随后的读取不会命中旧缓存；事务提交前其他请求可能把未提交前的数据
+    缓存在新版本号下，提交后再更新一次使这些条目也失效。
+    """
+    bump_version(model, pk)
+    transaction.on_commit(lambda: bump_version(model, pk))
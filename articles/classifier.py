@@ -0,0 +1,119 @@
+"""
+基于关键词的文章分类（Aho–Corasick 多模式匹配）
+
+关键词表从 JSON 文件加载：{"分类": ["关键词", ...], ...}，
+默认使用同目录下的 category_keywords.json。
+文本先按词切分（英文按单词，中文按单字），再在词序列上运行 Aho–Corasick 自动机，
+因此只会匹配完整的单词（"AI" 不会匹配 "said"），扫描一遍即可得到所有分类的得分，
+耗时与关键词数量无关。
+"""
+import json
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+
+
+DEFAULT_KEYWORDS_FILE = Path(__file__).resolve().parent / 'category_keywords.json'
+
+DEFAULT_CATEGORY = '其他'
+
+# 英文单词/数字为一个词，汉字逐字作为一个词
+TOKEN_RE = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def load_keywords(path=None):
+    """读取关键词表文件"""
+    with open(path or DEFAULT_KEYWORDS_FILE, encoding='utf-8') as f:
+        keywords = json.load(f)
+    if not isinstance(keywords, dict):
+        raise ValueError(f"关键词表格式错误（应为 {{分类: [关键词, ...]}}）: {path}")
+    return keywords
+
+
+class KeywordClassifier:
+    """
+    关键词分类器
+
+    构建一次后可重复使用；scores() 返回每个分类命中关键词的次数，
+    classify() 返回得分最高的分类（同分时按关键词表中的顺序）。
+    """
+
+    def __init__(self, keywords, default=DEFAULT_CATEGORY):
+        self.categories = list(keywords)
+        self.default = default
+
+        # 自动机状态：goto[state] 为 {词: 下一状态}，outputs[state] 为命中的分类下标
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [set()]
+
+        for index, category in enumerate(self.categories):
+            for keyword in keywords[category]:
+                tokens = tokenize(keyword)
+                if tokens:
+                    self._add(tokens, index)
+        self._build_failure_links()
+
+    def _add(self, tokens, category_index):
+        state = 0
+        for token in tokens:
+            next_state = self.goto[state].get(token)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][token] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append(set())
+            state = next_state
+        self.outputs[state].add(category_index)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(token, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                # 合并后缀状态的输出，扫描时不必再沿失败链查找
+                self.outputs[next_state] |= self.outputs[self.fail[next_state]]
+        self.outputs = [tuple(sorted(output)) for output in self.outputs]
+
+    @classmethod
+    def from_file(cls, path=None, **kwargs):
+        return cls(load_keywords(path), **kwargs)
+
+    def scores(self, text):
+        """扫描一遍文本，返回 {分类: 命中次数}（包含所有分类）"""
+        counts = [0] * len(self.categories)
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in outputs[state]:
+                counts[index] += 1
+        return dict(zip(self.categories, counts))
+
+    def classify(self, text):
+        """返回得分最高的分类，没有命中任何关键词时返回默认分类"""
+        best, best_score = self.default, 0
+        for category, score in self.scores(text).items():
+            if score > best_score:
+                best, best_score = category, score
+        return best
+
+
+@lru_cache(maxsize=None)
+def get_classifier(path=None):
+    """按关键词表文件缓存分类器（每个进程只构建一次）"""
+    return KeywordClassifier.from_file(path)
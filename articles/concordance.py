@@ -0,0 +1,236 @@
+"""
+单词位置倒排索引与 KWIC（上下文关键词）检索
+
+每个 (单词, 文章) 保存一行 WordPosting，positions 为该单词在正文中每次出现的
+起始字符位置，打包为 uint32 数组。分词规则与词频表一致（连续字母、转为小写、忽略单个字母）。
+Article.save() 在正文变化时重建该文章的索引；批量导入后由导入脚本调用 index_articles()，
+也可以运行 `python manage.py rebuild_word_index` 全量重建。
+
+检索结果按文章难度（初级在前，同级按可读性年级）排序，使用游标分页：
+游标记录最后一篇文章的排序键和该文章中已返回的出现次数。
+"""
+import base64
+import json
+import re
+from array import array
+
+from django.db import transaction
+from django.db.models import Case, When, Value, IntegerField, FloatField, Q
+from django.db.models.functions import Coalesce, Substr
+
+from .vocabulary import MIN_WORD_LENGTH, MAX_WORD_LENGTH
+
+
+WORD_TOKEN_RE = re.compile(r'[A-Za-z]+')
+
+DIFFICULTY_RANK = {'beginner': 0, 'intermediate': 1, 'advanced': 2}
+
+# 没有可读性年级的文章排在同一难度的最后
+UNKNOWN_READING_LEVEL = 1000.0
+
+# 上下文默认/最大字符数（关键词左右各取这么多）
+DEFAULT_CONTEXT_WIDTH = 60
+MAX_CONTEXT_WIDTH = 300
+
+DEFAULT_CONCORDANCE_LIMIT = 20
+MAX_CONCORDANCE_LIMIT = 100
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_word(word):
+    """把查询词转换为索引中的形式，不可索引时返回None"""
+    word = (word or '').strip().lower()
+    if not WORD_TOKEN_RE.fullmatch(word) or not MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH:
+        return None
+    return word
+
+
+def compute_postings(content):
+    """
+    计算正文中每个单词的出现位置
+
+    返回:
+        {单词: array('I', [起始位置, ...])}
+    """
+    postings = {}
+    for match in WORD_TOKEN_RE.finditer(content or ''):
+        word = match.group().lower()
+        if MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH:
+            postings.setdefault(word, array('I')).append(match.start())
+    return postings
+
+
+def _build_rows(article):
+    from .models import WordPosting
+
+    return [
+        WordPosting(
+            word=word, article_id=article.pk,
+            count=len(positions), positions=positions.tobytes()
+        )
+        for word, positions in compute_postings(article.content).items()
+    ]
+
+
+def index_article(article):
+    """重建一篇文章的单词索引"""
+    index_articles([article])
+
+
+def index_articles(articles, batch_size=1000):
+    """重建一批文章的单词索引（文章需已保存并加载了正文）"""
+    from .models import WordPosting
+
+    articles = [article for article in articles if article.pk is not None]
+    if not articles:
+        return
+    with transaction.atomic():
+        WordPosting.objects.filter(article_id__in=[article.pk for article in articles]).delete()
+        rows = []
+        for article in articles:
+            rows.extend(_build_rows(article))
+            if len(rows) >= batch_size:
+                WordPosting.objects.bulk_create(rows, batch_size=batch_size)
+                rows = []
+        WordPosting.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def rebuild_word_index(chunk_size=100):
+    """全量重建单词索引，返回处理的文章数"""
+    from .models import Article, WordPosting
+
+    WordPosting.objects.all().delete()
+    count = 0
+    batch = []
+    for article in Article.objects.only('id', 'content').order_by('id').iterator(chunk_size=chunk_size):
+        batch.append(article)
+        if len(batch) >= chunk_size:
+            index_articles(batch)
+            count += len(batch)
+            batch = []
+    index_articles(batch)
+    return count + len(batch)
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """解析游标 [难度排名, 可读性年级, 文章ID, 已返回的出现次数]，无效时返回None"""
+    try:
+        rank, level, article_id, skip = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return int(rank), float(level), int(article_id), int(skip)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def ranked_postings(word):
+    """单词在所有启用文章中的索引行，按文章难度从易到难排序"""
+    from .models import WordPosting
+
+    return WordPosting.objects.filter(word=word, article__is_active=True).annotate(
+        rank=Case(
+            *[When(article__difficulty=difficulty, then=Value(rank))
+              for difficulty, rank in DIFFICULTY_RANK.items()],
+            default=Value(len(DIFFICULTY_RANK)),
+            output_field=IntegerField()
+        ),
+        level=Coalesce('article__reading_level', Value(UNKNOWN_READING_LEVEL), output_field=FloatField()),
+    ).order_by('rank', 'level', 'article_id')
+
+
+def find_occurrences(word, limit=DEFAULT_CONCORDANCE_LIMIT, cursor=None):
+    """
+    按排序取出单词的下一批出现位置
+
+    返回:
+        ([(posting, 起始位置), ...], 下一页游标或None)
+    """
+    postings = ranked_postings(word).select_related('article').only(
+        'article', 'count', 'positions',
+        'article__title', 'article__difficulty', 'article__reading_level'
+    )
+    skip = 0
+    if cursor:
+        rank, level, article_id, skip = cursor
+        postings = postings.filter(
+            Q(rank__gt=rank)
+            | Q(rank=rank, level__gt=level)
+            | Q(rank=rank, level=level, article_id__gte=article_id)
+        )
+
+    occurrences = []
+    for posting in postings.iterator(chunk_size=50):
+        if cursor and posting.article_id != cursor[2]:
+            skip = 0
+        positions = array('I')
+        positions.frombytes(bytes(posting.positions))
+        for index in range(skip, len(positions)):
+            if len(occurrences) == limit:
+                return occurrences, (posting.rank, posting.level, posting.article_id, index)
+            occurrences.append((posting, positions[index]))
+        skip = 0
+    return occurrences, None
+
+
+def load_contexts(occurrences, word_length, width):
+    """
+    用一条 UNION ALL 查询读取每个出现位置附近的正文片段
+
+    返回与 occurrences 顺序一致的 (左侧上下文, 关键词, 右侧上下文) 列表
+    """
+    from .models import Article
+
+    if not occurrences:
+        return []
+
+    queries = []
+    for index, (posting, start) in enumerate(occurrences):
+        begin = max(0, start - width)
+        # SQLite 的 substr() 从1开始按字符计数
+        queries.append(
+            Article.objects.filter(pk=posting.article_id).annotate(
+                slot=Value(index, output_field=IntegerField()),
+                text=Substr('content', begin + 1, start - begin + word_length + width),
+            ).order_by().values_list('slot', 'text')
+        )
+    first, *rest = queries
+    texts = dict(first.union(*rest, all=True)) if rest else dict(first)
+
+    contexts = []
+    for index, (posting, start) in enumerate(occurrences):
+        text = texts.get(index) or ''
+        offset = start - max(0, start - width)
+        contexts.append((
+            _WHITESPACE_RE.sub(' ', text[:offset]).lstrip(),
+            text[offset:offset + word_length],
+            _WHITESPACE_RE.sub(' ', text[offset + word_length:]).rstrip(),
+        ))
+    return contexts
+
+
+def search_concordance(word, width=DEFAULT_CONTEXT_WIDTH, limit=DEFAULT_CONCORDANCE_LIMIT, cursor=None):
+    """
+    返回单词的 KWIC 检索结果
+
+    返回:
+        (结果列表, 下一页游标字符串或None)
+    """
+    occurrences, next_key = find_occurrences(word, limit, cursor)
+    contexts = load_contexts(occurrences, len(word), width)
+    results = [
+        {
+            'article_id': posting.article_id,
+            'article_title': posting.article.title,
+            'difficulty': posting.article.difficulty,
+            'reading_level': posting.article.reading_level,
+            'position': start,
+            'left': left,
+            'keyword': keyword,
+            'right': right,
+        }
+        for (posting, start), (left, keyword, right) in zip(occurrences, contexts)
+    ]
+    return results, encode_cursor(next_key) if next_key else None
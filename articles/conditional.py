@@ -0,0 +1,90 @@
+"""
+文章详情和分页内容的条件请求（ETag / Last-Modified）
+
+校验值只需读取文章自己的 updated_at（和 content_hash，如果模型有这个字段）：
+    ETag = sha256(表名, 文章ID, updated_at, content_hash, 单篇文章的缓存版本号, 查询参数, Accept)
+    Last-Modified = updated_at
+客户端带 If-None-Match / If-Modified-Since 且文章未变化时直接返回 304，不读取正文也不序列化。
+校验值不包含表的缓存版本号：保存其他文章不会使这篇文章的 ETag 失效。
+批量更新必须同时写入 updated_at（rescore_difficulty 如此），否则客户端会得到过期的304。
+响应带 Cache-Control: no-cache，浏览器每次使用缓存前都会带着校验值重新验证。
+"""
+import hashlib
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache_versions import get_version
+
+
+# 响应格式变化时加一，使客户端已缓存的旧格式响应失效
+REPRESENTATION_VERSION = 1
+
+
+def _validator_fields(model):
+    fields = ['updated_at']
+    if any(field.name == 'content_hash' for field in model._meta.concrete_fields):
+        fields.append('content_hash')
+    return fields
+
+
+def compute_etag(model, pk, state, request):
+    """state 为 (updated_at, [content_hash])"""
+    params = sorted(request.query_params.lists())
+    identity = repr((
+        REPRESENTATION_VERSION,
+        model._meta.db_table,
+        str(pk),
+        [value.isoformat() if hasattr(value, 'isoformat') else value for value in state],
+        get_version(model, pk),
+        params,
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    return '"{}"'.format(hashlib.sha256(identity.encode('utf-8')).hexdigest())
+
+
+def article_validators(view, request, pk):
+    """
+    返回 (ETag, updated_at)；文章不存在或主键无效时返回None，交给视图返回404
+
+    只查询 updated_at（和 content_hash），查询集与视图相同（同样的启用状态和作者筛选）。
+    """
+    queryset = view.get_queryset()
+    try:
+        state = queryset.filter(pk=pk).values_list(*_validator_fields(queryset.model)).first()
+    except (TypeError, ValueError, ValidationError):
+        return None
+    if state is None:
+        return None
+    return compute_etag(queryset.model, pk, state, request), state[0]
+
+
+def conditional_article(view_method):
+    """为文章详情类接口加上条件请求支持（装饰视图集方法，URL 中需有 pk）"""
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        validators = article_validators(self, request, kwargs.get('pk'))
+        if validators is None:
+            return view_method(self, request, *args, **kwargs)
+
+        etag, updated_at = validators
+        last_modified = int(updated_at.timestamp())
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view_method(self, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            response['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+class ConditionalRetrieveMixin:
+    """文章详情（retrieve）支持条件请求"""
+
+    @conditional_article
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
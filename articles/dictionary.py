@@ -0,0 +1,118 @@
+"""
+离线英汉词典
+
+词条从 ECDICT 格式的 CSV（word, phonetic, definition, translation, pos, ..., tag, ..., exchange, ...）
+导入 DictionaryEntry 表：`python manage.py import_dictionary ecdict.csv`。
+查询走 key（小写单词）上的 B 树索引，每次查询 O(log n)，一批单词只需一条 IN 查询。
+变形词条（went）按 exchange 字段记录的原形再查一次，原形词条随结果一起返回。
+"""
+import csv
+import re
+
+
+# 每次批量查询最多的单词数
+MAX_LOOKUP_WORDS = 500
+
+# exchange 字段：'p:went/d:gone/i:going/3:goes'，原形词条记为 '0:go'
+_EXCHANGE_BASE_RE = re.compile(r'(?:^|/)0:([^/]+)')
+
+# CSV 中的释义用字面量 \n 分隔多行
+_ESCAPED_NEWLINE = '\\n'
+
+
+def lookup_key(word):
+    return (word or '').strip().lower()
+
+
+def entry_from_row(row):
+    """把 ECDICT CSV 的一行转换为 DictionaryEntry（无效行返回None）"""
+    from .models import DictionaryEntry
+
+    word = (row.get('word') or '').strip()
+    if not word or len(word) > 100:
+        return None
+    return DictionaryEntry(
+        word=word,
+        key=lookup_key(word),
+        phonetic=(row.get('phonetic') or '')[:100],
+        translation=(row.get('translation') or '').replace(_ESCAPED_NEWLINE, '\n'),
+        definition=(row.get('definition') or '').replace(_ESCAPED_NEWLINE, '\n'),
+        pos=(row.get('pos') or '')[:100],
+        tag=(row.get('tag') or '')[:100],
+        exchange=(row.get('exchange') or '')[:200],
+    )
+
+
+def iter_csv_entries(path):
+    """逐行读取 ECDICT CSV，产出 DictionaryEntry（不一次性加载整个文件）"""
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            entry = entry_from_row(row)
+            if entry is not None:
+                yield entry
+
+
+def serialize_entry(entry):
+    return {
+        'word': entry.word,
+        'phonetic': entry.phonetic,
+        'translation': entry.translation,
+        'definition': entry.definition,
+        'pos': entry.pos,
+        'tag': entry.tag,
+        'exchange': entry.exchange,
+    }
+
+
+def _fetch(keys):
+    """按查询键取词条：{key: [词条, ...]}"""
+    from .models import DictionaryEntry
+
+    entries = {}
+    for entry in DictionaryEntry.objects.filter(key__in=keys):
+        entries.setdefault(entry.key, []).append(entry)
+    return entries
+
+
+def _best_match(word, candidates):
+    """同一个小写键可能对应多个词条（Polish/polish），优先大小写完全一致的"""
+    for candidate in candidates:
+        if candidate.word == word:
+            return candidate
+    for candidate in candidates:
+        if candidate.word == candidate.key:
+            return candidate
+    return candidates[0]
+
+
+def lookup_words(words):
+    """
+    批量查词
+
+    返回:
+        {原单词: 词条字典或None}；词条为变形时附带 'base'（原形词条）
+    """
+    words = [word for word in dict.fromkeys(w.strip() for w in words) if word]
+    entries = _fetch({lookup_key(word) for word in words})
+
+    results = {}
+    base_words = {}
+    for word in words:
+        candidates = entries.get(lookup_key(word))
+        if not candidates:
+            results[word] = None
+            continue
+        entry = _best_match(word, candidates)
+        results[word] = serialize_entry(entry)
+        match = _EXCHANGE_BASE_RE.search(entry.exchange)
+        if match and lookup_key(match.group(1)) != entry.key:
+            base_words[word] = match.group(1)
+
+    # 变形词再查一次原形（同样只需一条查询）
+    if base_words:
+        bases = _fetch({lookup_key(base) for base in base_words.values()})
+        for word, base in base_words.items():
+            candidates = bases.get(lookup_key(base))
+            if candidates:
+                results[word]['base'] = serialize_entry(_best_match(base, candidates))
+    return results
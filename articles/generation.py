@@ -0,0 +1,278 @@
+"""
+AI 生成文章内容
+
+generate_content() 通过 llm 网关调用用户配置的服务商；未配置、SDK 未安装或调用失败时
+返回说明性的示例内容，保证前端总能拿到可以显示的文本。
+astream_content() 是流式版本，回退内容作为一个片段整体产出。
+服务商成功返回的内容存入生成缓存（generation_cache），相同的提示词直接返回缓存内容。
+"""
+from . import generation_cache, llm
+
+
+# 生成类型：普通文章 / 语法文章（系统语法文章和用户语法文章共用）
+GENERATION_KINDS = ('article', 'grammar')
+
+
+def sdk_missing_content(provider, prompt):
+    return f"""⚠️ AI SDK Not Installed
+
+To use {provider.upper()} API, please install the required package:
+
+For OpenAI/DeepSeek:
+pip install openai
+
+For Claude:
+pip install anthropic
+
+---
+
+Your prompt was: "{prompt}"
+
+Please install the SDK and restart the server to use real AI generation."""
+
+
+def _article_error_content(error, prompt):
+    return f"""⚠️ AI API Error: {error}
+
+Showing sample content instead...
+
+---
+
+# Sample Article
+
+Based on your prompt: "{prompt}"
+
+## Introduction
+
+This is a sample article structure. The actual content would be generated by the AI based on your prompt.
+
+## Main Content
+
+Your prompt requested information about: {prompt[:100]}...
+
+Here you would find detailed, well-structured content addressing your topic.
+
+## Conclusion
+
+To use real AI generation, please:
+1. Ensure your API key is correct
+2. Check your API account has sufficient credits
+3. Verify your network connection
+
+---
+
+Note: This is sample content shown because the AI API call failed."""
+
+
+def _grammar_error_content(error, prompt):
+    return f"""⚠️ AI API Error: {error}
+
+Showing sample content instead...
+
+---
+
+# Sample Grammar Article
+
+Based on your prompt: "{prompt}"
+
+## Grammar Point
+
+This section would explain the grammar concept in detail.
+
+## Usage and Rules
+
+Clear explanation of when and how to use this grammar point.
+
+## Examples
+
+1. Correct usage examples
+2. Common mistakes to avoid
+3. Practice exercises
+
+---
+
+Note: This is sample content shown because the AI API call failed."""
+
+
+def _article_sample_content(prompt):
+    return f"""# Sample Generated Article
+
+**Your prompt:** {prompt}
+
+## Introduction
+
+This is a **sample article** generated for demonstration purposes. To use real AI generation, please:
+
+1. Go to **Personal Center** (个人中心)
+2. Configure your **AI API** settings
+3. Choose a provider (OpenAI, Claude, DeepSeek, etc.)
+4. Enter your API key
+5. Save the configuration
+
+## Main Content
+
+Once you've configured a real AI API, the system will generate actual content based on your prompt. The content will be:
+
+- Professionally written
+- Tailored to your specific prompt
+- Suitable for language learners
+- Well-structured and informative
+
+### Example Topics
+
+For grammar articles, you might request:
+- Explanations of tenses
+- Common grammar mistakes
+- Usage of prepositions
+- Sentence structures
+
+## Conclusion
+
+This sample demonstrates the article structure. Configure your AI API to generate real content!
+
+---
+
+💡 **Tip:** DeepSeek is recommended for Chinese users - fast, affordable, and excellent Chinese support."""
+
+
+def _grammar_sample_content(prompt):
+    return f"""# Sample Grammar Article
+
+**Your prompt:** {prompt}
+
+## Overview
+
+This is a **sample grammar article** for demonstration purposes. To use real AI generation, please configure your AI API in the Personal Center.
+
+## How to Configure
+
+1. Go to **Personal Center** (个人中心)
+2. Configure your **AI API** settings
+3. Choose a provider (OpenAI, Claude, DeepSeek, etc.)
+4. Enter your API key
+5. Save the configuration
+
+## What You'll Get
+
+Once configured, the system will generate professional grammar articles including:
+
+- Clear explanations of grammar rules
+- Practical examples and usage scenarios
+- Common mistakes and how to avoid them
+- Practice exercises for learners
+
+---
+
+💡 **Tip:** DeepSeek is recommended for Chinese users - fast, affordable, and excellent grammar content generation."""
+
+
+def api_error_content(kind, error, prompt):
+    if kind == 'grammar':
+        return _grammar_error_content(error, prompt)
+    return _article_error_content(error, prompt)
+
+
+def sample_content(kind, prompt):
+    if kind == 'grammar':
+        return _grammar_sample_content(prompt)
+    return _article_sample_content(prompt)
+
+
+def _cache_key(kind, provider, custom_url, prompt):
+    model = llm.get_provider(provider).model
+    base_url = custom_url if provider == 'custom' else ''
+    return generation_cache.cache_key(kind, provider, model, prompt, base_url=base_url)
+
+
+def _cached(key, use_cache):
+    if not use_cache:
+        generation_cache.record_bypass()
+        return None
+    return generation_cache.get(key)
+
+
+def generate_content(kind, prompt, ai_config, use_cache=True):
+    """
+    生成文章内容
+
+    参数:
+        kind: 'article' 或 'grammar'
+        ai_config: 前端保存的 AI 配置 {'provider', 'apiKey', 'customUrl'}
+        use_cache: 为False时不读缓存，重新生成并覆盖缓存
+
+    返回:
+        (内容, 服务商名称, 是否来自缓存)；没有可用配置时服务商为 'demo'
+
+    异常:
+        llm.ProviderBusy：服务商并发已满，由调用方返回503
+    """
+    provider = ai_config.get('provider', '')
+    api_key = ai_config.get('apiKey', '')
+    custom_url = ai_config.get('customUrl', '')
+
+    content = None
+    if provider and llm.is_configured(provider, api_key, custom_url):
+        key = _cache_key(kind, provider, custom_url, prompt)
+        content = _cached(key, use_cache)
+        if content is not None:
+            return content, provider, True
+        try:
+            content = llm.generate(provider, prompt, kind=kind, api_key=api_key, base_url=custom_url)
+            if content:
+                generation_cache.store(key, content)
+        except llm.ProviderNotInstalled:
+            content = sdk_missing_content(provider, prompt)
+        except llm.ProviderBusy:
+            raise
+        except Exception as api_error:
+            content = api_error_content(kind, api_error, prompt)
+
+    # 如果没有配置或调用失败，返回示例内容
+    if not content:
+        content = sample_content(kind, prompt)
+    return content, provider if provider else 'demo', False
+
+
+async def astream_content(kind, prompt, ai_config, use_cache=True):
+    """
+    流式生成文章内容，逐段产出文本
+
+    已经产出部分内容后上游失败时直接抛出异常（不能再替换为示例内容），由调用方通知前端。
+    缓存命中时整篇内容作为一个片段产出；完整接收的生成结果写入缓存。
+    """
+    provider = ai_config.get('provider', '')
+    api_key = ai_config.get('apiKey', '')
+    custom_url = ai_config.get('customUrl', '')
+
+    content = None
+    if provider and llm.is_configured(provider, api_key, custom_url):
+        key = _cache_key(kind, provider, custom_url, prompt)
+        if use_cache:
+            content = await generation_cache.aget(key)
+        else:
+            generation_cache.record_bypass()
+        if content is not None:
+            yield content
+            return
+        started = False
+        parts = []
+        try:
+            async for chunk in llm.astream(provider, prompt, kind=kind, api_key=api_key, base_url=custom_url):
+                started = True
+                parts.append(chunk)
+                yield chunk
+        except llm.ProviderNotInstalled:
+            content = sdk_missing_content(provider, prompt)
+        except llm.ProviderBusy:
+            raise
+        except Exception as api_error:
+            if started:
+                raise
+            content = api_error_content(kind, api_error, prompt)
+        if started:
+            await generation_cache.astore(key, ''.join(parts))
+            return
+
+    if not content:
+        content = sample_content(kind, prompt)
+    yield content
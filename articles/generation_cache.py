@@ -0,0 +1,98 @@
+"""
+AI 生成内容缓存
+
+生成结果按 (生成类型, 服务商, 模型, 规范化后的提示词) 的哈希存入 Django 缓存的
+'generation' 别名（未配置时使用 default），不同用户的相同提示词共享结果。
+过期时间和容量由 settings.CACHES 中该别名的 TIMEOUT / MAX_ENTRIES 决定。
+只缓存服务商成功返回的内容，示例内容和错误说明不缓存。
+
+命中率统计保存在进程内，可通过 GET /api/generation-cache/ 查看。
+"""
+import hashlib
+import json
+import re
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+from .cache_backends import get_evictions
+
+
+CACHE_ALIAS = 'generation'
+KEY_PREFIX = 'generation:'
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'bypassed': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def normalize_prompt(prompt):
+    """提示词规范化：合并空白、忽略大小写"""
+    return _WHITESPACE_RE.sub(' ', prompt).strip().casefold()
+
+
+def cache_key(kind, provider, model, prompt, base_url=''):
+    """
+    缓存键
+
+    自定义接口的模型名不能区分服务，base_url 也计入缓存键；API Key 不计入。
+    """
+    identity = json.dumps([kind, provider, base_url, model, normalize_prompt(prompt)], ensure_ascii=False)
+    return KEY_PREFIX + hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get(key):
+    """取缓存的内容，未命中返回None"""
+    content = get_cache().get(key)
+    _count('misses' if content is None else 'hits')
+    return content
+
+
+async def aget(key):
+    content = await get_cache().aget(key)
+    _count('misses' if content is None else 'hits')
+    return content
+
+
+def store(key, content):
+    get_cache().set(key, content)
+    _count('stores')
+
+
+async def astore(key, content):
+    await get_cache().aset(key, content)
+    _count('stores')
+
+
+def record_bypass():
+    """请求选择不使用缓存（重新生成并覆盖缓存）"""
+    _count('bypassed')
+
+
+def stats():
+    with _stats_lock:
+        result = dict(_stats)
+    result['evictions'] = get_evictions(get_cache())
+    lookups = result['hits'] + result['misses']
+    result['hit_rate'] = round(result['hits'] / lookups, 4) if lookups else None
+    return result
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
@@ -0,0 +1,452 @@
+"""
+大模型调用网关
+
+三个文章视图集的 AI 生成都通过 generate() 调用，服务商差异封装在 Provider 子类中：
+- SDK 客户端按 (服务商, base_url, API Key 哈希) 缓存复用，连接池不会每次请求重建
+- 每个服务商一个信号量限制并发调用数；并发已满时最多排队 LLM_QUEUE_TIMEOUT 秒，
+  超时抛出 ProviderBusy，而不是让请求线程一直等待
+- 每次生成有总期限（排队时间 + 调用时间），剩余时间作为 SDK 请求的超时，SDK 不自动重试
+
+astream() 是流式版本，在事件循环中逐段产出文本：使用 SDK 的异步客户端，
+并发上限用 asyncio 信号量（每个事件循环单独计数），等待上游时不占用线程。
+
+可在 settings 中配置：
+    LLM_TIMEOUT = 60                       # 单次生成的总期限（秒）
+    LLM_QUEUE_TIMEOUT = 5                  # 并发已满时最多等待的秒数
+    LLM_CONCURRENCY = {'claude': 2}        # 各服务商的并发上限，未配置的为4
+测试使用 FakeProvider（provider='fake'），不访问网络，输出只取决于提示词。
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_QUEUE_TIMEOUT = 5
+DEFAULT_CONCURRENCY = 4
+
+# 最多缓存的 SDK 客户端数（超出后关闭最久未使用的）
+MAX_CLIENTS = 32
+
+MAX_TOKENS = 2000
+TEMPERATURE = 0.7
+
+# 生成类型 -> 系统提示词
+SYSTEM_PROMPTS = {
+    'article': 'You are a helpful assistant that writes English articles for language learners. '
+               'Write clear, well-structured articles.',
+    'grammar': 'You are a helpful assistant that writes English grammar articles for language learners. '
+               'Write clear, well-structured grammar explanations with examples.',
+}
+
+
+class LLMError(Exception):
+    """大模型调用失败"""
+
+
+class ProviderNotInstalled(LLMError):
+    """服务商的 SDK 未安装"""
+
+
+class ProviderBusy(LLMError):
+    """服务商的并发调用数已满"""
+
+
+class GenerationTimeout(LLMError):
+    """超过生成期限"""
+
+
+class Provider:
+    """
+    服务商接口
+
+    create_client() / create_async_client() 创建可复用的客户端，
+    complete() 完成一次生成，astream() 以异步生成器逐段产出文本
+    """
+    name = ''
+    model = ''
+    base_url = None
+    requires_key = True
+    requires_base_url = False
+
+    def is_configured(self, api_key, base_url):
+        if self.requires_key and not api_key:
+            return False
+        return bool(base_url) or not self.requires_base_url
+
+    def create_client(self, api_key, base_url, timeout):
+        raise NotImplementedError
+
+    def complete(self, client, system, prompt, timeout):
+        raise NotImplementedError
+
+    def create_async_client(self, api_key, base_url, timeout):
+        raise NotImplementedError
+
+    async def astream(self, client, system, prompt):
+        raise NotImplementedError
+        yield
+
+
+class OpenAIProvider(Provider):
+    """OpenAI 及兼容 OpenAI 接口的服务商"""
+    name = 'openai'
+    model = 'gpt-3.5-turbo'
+
+    def create_client(self, api_key, base_url, timeout):
+        try:
+            import openai
+        except ImportError:
+            raise ProviderNotInstalled('openai')
+        return openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url or self.base_url,
+            timeout=timeout,
+            max_retries=0
+        )
+
+    def complete(self, client, system, prompt, timeout):
+        import openai
+        try:
+            response = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=MAX_TOKENS,
+                temperature=TEMPERATURE,
+                timeout=timeout
+            )
+        except openai.APITimeoutError as e:
+            raise GenerationTimeout(str(e)) from e
+        return response.choices[0].message.content
+
+    def create_async_client(self, api_key, base_url, timeout):
+        try:
+            import openai
+        except ImportError:
+            raise ProviderNotInstalled('openai')
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url or self.base_url,
+            timeout=timeout,
+            max_retries=0
+        )
+
+    async def astream(self, client, system, prompt):
+        stream = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=MAX_TOKENS,
+            temperature=TEMPERATURE,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class DeepSeekProvider(OpenAIProvider):
+    name = 'deepseek'
+    model = 'deepseek-chat'
+    base_url = 'https://api.deepseek.com'
+
+
+class CustomProvider(OpenAIProvider):
+    """用户自定义地址的 OpenAI 兼容接口"""
+    name = 'custom'
+    requires_base_url = True
+
+
+class ClaudeProvider(Provider):
+    name = 'claude'
+    model = 'claude-3-sonnet-20240229'
+
+    def create_client(self, api_key, base_url, timeout):
+        try:
+            import anthropic
+        except ImportError:
+            raise ProviderNotInstalled('anthropic')
+        return anthropic.Anthropic(api_key=api_key, timeout=timeout, max_retries=0)
+
+    def complete(self, client, system, prompt, timeout):
+        import anthropic
+        try:
+            message = client.messages.create(
+                model=self.model,
+                max_tokens=MAX_TOKENS,
+                system=system,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                timeout=timeout
+            )
+        except anthropic.APITimeoutError as e:
+            raise GenerationTimeout(str(e)) from e
+        return message.content[0].text
+
+    def create_async_client(self, api_key, base_url, timeout):
+        try:
+            import anthropic
+        except ImportError:
+            raise ProviderNotInstalled('anthropic')
+        return anthropic.AsyncAnthropic(api_key=api_key, timeout=timeout, max_retries=0)
+
+    async def astream(self, client, system, prompt):
+        async with client.messages.stream(
+            model=self.model,
+            max_tokens=MAX_TOKENS,
+            system=system,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+
+class FakeProvider(Provider):
+    """本地测试用服务商：不访问网络，相同的提示词总是得到相同的文章"""
+    name = 'fake'
+    model = 'fake'
+    requires_key = False
+    # 模拟上游耗时（秒；流式生成时为第一个片段之前的等待）
+    delay = 0
+
+    def create_client(self, api_key, base_url, timeout):
+        return None
+
+    def create_async_client(self, api_key, base_url, timeout):
+        return None
+
+    def text(self, system, prompt):
+        digest = hashlib.sha256(f'{system}\n{prompt}'.encode('utf-8')).hexdigest()[:8]
+        return (
+            f'# Article {digest}\n\n'
+            f'This article was written for the prompt: {prompt}\n\n'
+            f'It is generated locally and contains no real content.'
+        )
+
+    def complete(self, client, system, prompt, timeout):
+        if self.delay > timeout:
+            time.sleep(timeout)
+            raise GenerationTimeout(f'fake provider did not answer within {timeout:.1f}s')
+        time.sleep(self.delay)
+        return self.text(system, prompt)
+
+    async def astream(self, client, system, prompt):
+        await asyncio.sleep(self.delay)
+        # 按单词（连同其后的空白）逐个产出，拼接后与 complete() 的结果相同
+        for token in re.findall(r'\S+\s*', self.text(system, prompt)):
+            yield token
+            await asyncio.sleep(0)
+
+
+PROVIDERS = {
+    provider.name: provider
+    for provider in (OpenAIProvider(), DeepSeekProvider(), CustomProvider(), ClaudeProvider(), FakeProvider())
+}
+
+
+def get_provider(name):
+    """按名称取服务商，未知名称返回None"""
+    return PROVIDERS.get(name)
+
+
+def is_configured(name, api_key='', base_url=''):
+    """服务商存在且调用所需的 API Key / 地址都已提供"""
+    provider = get_provider(name)
+    return provider is not None and provider.is_configured(api_key, base_url)
+
+
+# 同步客户端进程内共享；异步客户端（httpx.AsyncClient）的连接绑定在创建它的事件循环上，
+# 按事件循环分别缓存：事件循环 -> OrderedDict
+_clients = OrderedDict()
+_async_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def _client_key(provider, api_key, base_url):
+    # 只保存 API Key 的哈希，缓存键不包含明文密钥
+    key_hash = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()
+    return provider.name, base_url or provider.base_url or '', key_hash
+
+
+def _close(client):
+    close = getattr(client, 'close', None)
+    if close is None:
+        return
+    result = close()
+    if asyncio.iscoroutine(result):
+        # 异步客户端只在创建它的事件循环中关闭（调用方保证）；不在事件循环中时丢弃，由垃圾回收释放连接
+        try:
+            asyncio.get_running_loop().create_task(result)
+        except RuntimeError:
+            result.close()
+
+
+def get_client(provider, api_key, base_url, timeout, asynchronous=False):
+    """
+    取缓存的 SDK 客户端，没有则创建（创建在锁外进行，并发创建时保留先写入的一个）
+
+    asynchronous=True 时必须在事件循环中调用，返回当前事件循环的异步客户端。
+    """
+    key = _client_key(provider, api_key, base_url)
+    with _clients_lock:
+        if asynchronous:
+            clients = _async_clients.setdefault(asyncio.get_running_loop(), OrderedDict())
+        else:
+            clients = _clients
+        if key in clients:
+            clients.move_to_end(key)
+            return clients[key]
+
+    if asynchronous:
+        client = provider.create_async_client(api_key, base_url, timeout)
+    else:
+        client = provider.create_client(api_key, base_url, timeout)
+    evicted = []
+    with _clients_lock:
+        if key in clients:
+            evicted.append(client)
+            client = clients[key]
+        else:
+            clients[key] = client
+            while len(clients) > MAX_CLIENTS:
+                evicted.append(clients.popitem(last=False)[1])
+        clients.move_to_end(key)
+    for stale in evicted:
+        _close(stale)
+    return client
+
+
+def clear_clients():
+    """关闭并清空所有缓存的客户端（其他事件循环的异步客户端只丢弃，不在当前循环中关闭）"""
+    try:
+        current_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        current_loop = None
+    with _clients_lock:
+        clients = list(_clients.values())
+        clients += list(_async_clients.get(current_loop, {}).values()) if current_loop else []
+        _clients.clear()
+        _async_clients.clear()
+    for client in clients:
+        _close(client)
+
+
+_semaphores = {}
+_semaphores_lock = threading.Lock()
+
+
+def concurrency_limit(name):
+    limits = getattr(settings, 'LLM_CONCURRENCY', {})
+    return limits.get(name, DEFAULT_CONCURRENCY)
+
+
+def _semaphore(name):
+    # 按 (服务商, 上限) 保存，修改配置后使用新的信号量
+    key = name, concurrency_limit(name)
+    with _semaphores_lock:
+        if key not in _semaphores:
+            _semaphores[key] = threading.BoundedSemaphore(key[1])
+        return _semaphores[key]
+
+
+# 事件循环 -> {(服务商, 上限): asyncio 信号量}；asyncio 信号量不能跨事件循环使用
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+def _async_semaphore(name):
+    key = name, concurrency_limit(name)
+    semaphores = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+    if key not in semaphores:
+        semaphores[key] = asyncio.BoundedSemaphore(key[1])
+    return semaphores[key]
+
+
+def generate(name, prompt, kind='article', api_key='', base_url='', timeout=None):
+    """
+    调用服务商生成文章
+
+    参数:
+        name: 服务商名称（openai / deepseek / claude / custom / fake）
+        kind: 生成类型，决定系统提示词（article / grammar）
+        timeout: 总期限（秒），默认为 settings.LLM_TIMEOUT
+
+    返回:
+        生成的文本
+
+    异常:
+        ProviderNotInstalled、ProviderBusy、GenerationTimeout，以及 SDK 的其他异常
+    """
+    provider = get_provider(name)
+    if provider is None:
+        raise LLMError(f'未知的服务商: {name}')
+    timeout = timeout or getattr(settings, 'LLM_TIMEOUT', DEFAULT_TIMEOUT)
+    deadline = time.monotonic() + timeout
+
+    queue_timeout = getattr(settings, 'LLM_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+    semaphore = _semaphore(provider.name)
+    if not semaphore.acquire(timeout=min(queue_timeout, timeout)):
+        raise ProviderBusy(f'{provider.name} 的并发调用数已满')
+    try:
+        client = get_client(provider, api_key, base_url, timeout)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise GenerationTimeout(f'排队超过了 {timeout} 秒的期限')
+        return provider.complete(client, SYSTEM_PROMPTS[kind], prompt, remaining)
+    finally:
+        semaphore.release()
+
+
+async def astream(name, prompt, kind='article', api_key='', base_url='', timeout=None):
+    """
+    流式调用服务商，逐段产出生成的文本
+
+    参数和异常与 generate() 相同；期限对整个流生效，超过期限时抛出 GenerationTimeout。
+    调用方中途停止迭代（例如客户端断开）时关闭上游流并释放并发名额。
+    """
+    provider = get_provider(name)
+    if provider is None:
+        raise LLMError(f'未知的服务商: {name}')
+    timeout = timeout or getattr(settings, 'LLM_TIMEOUT', DEFAULT_TIMEOUT)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    queue_timeout = getattr(settings, 'LLM_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+    semaphore = _async_semaphore(provider.name)
+    try:
+        await asyncio.wait_for(semaphore.acquire(), min(queue_timeout, timeout))
+    except asyncio.TimeoutError:
+        raise ProviderBusy(f'{provider.name} 的并发调用数已满')
+    try:
+        client = get_client(provider, api_key, base_url, timeout, asynchronous=True)
+        chunks = provider.astream(client, SYSTEM_PROMPTS[kind], prompt)
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise GenerationTimeout(f'超过了 {timeout} 秒的期限')
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), remaining)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise GenerationTimeout(f'超过了 {timeout} 秒的期限')
+                if chunk:
+                    yield chunk
+        finally:
+            await chunks.aclose()
+    finally:
+        semaphore.release()
@@ -0,0 +1,134 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from articles.models import Article, Favorite, ReadingHistory
+from articles.views import ArticleViewSet
+
+
+class Rollback(Exception):
+    """基准测试结束后回滚生成的数据"""
+
+
+class Command(BaseCommand):
+    help = '在临时数据上测量"收藏"和"在读"列表的查询耗时（所有数据在事务中生成，结束后回滚）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-rows', type=int, default=1_000_000,
+                            help='生成的阅读记录数（默认: 1000000）')
+        parser.add_argument('--favorite-rows', type=int, default=200_000,
+                            help='生成的收藏记录数（默认: 200000）')
+        parser.add_argument('--articles', type=int, default=5000,
+                            help='生成的文章数（默认: 5000）')
+        parser.add_argument('--users', type=int, default=2000,
+                            help='用户数（默认: 2000）')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='每个查询的重复次数（默认: 50）')
+
+    def handle(self, *args, **options):
+        articles = options['articles']
+        users = options['users']
+        if articles < 1 or users < 1 or options['repeat'] < 1:
+            raise CommandError('--articles、--users 和 --repeat 必须大于0')
+        for name in ('history_rows', 'favorite_rows'):
+            if options[name] > articles * users:
+                raise CommandError(f'--{name.replace("_", "-")} 不能超过 文章数 × 用户数')
+
+        try:
+            with transaction.atomic():
+                self.populate(options)
+                self.report(options['repeat'])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('临时数据已回滚')
+
+    def populate(self, options):
+        now = timezone.now()
+        started = time.perf_counter()
+        created = Article.objects.bulk_create(
+            [
+                Article(title=f'Benchmark {i}', content='Benchmark article.',
+                        created_at=now - timedelta(minutes=i))
+                for i in range(options['articles'])
+            ],
+            batch_size=1000
+        )
+        article_ids = [article.id for article in created]
+        self.insert_rows(ReadingHistory, 'read_at', article_ids, options['users'], options['history_rows'], now)
+        self.insert_rows(Favorite, 'created_at', article_ids, options['users'], options['favorite_rows'], now)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        self.stdout.write(
+            f'已生成 {len(article_ids)} 篇文章、{options["history_rows"]} 条阅读记录、'
+            f'{options["favorite_rows"]} 条收藏（{time.perf_counter() - started:.1f} 秒）'
+        )
+
+    def insert_rows(self, model, time_field, article_ids, users, total, now):
+        """每个用户随机选不重复的文章，行数在用户间平均分配"""
+        table = model._meta.db_table
+        columns = ['article_id', 'username', time_field]
+        values = ['%s', '%s', '%s']
+        if model is ReadingHistory:
+            columns += ['user_ip', 'read_duration']
+            values += ["'127.0.0.1'", '0']
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(values)})"
+
+        adapt = connection.ops.adapt_datetimefield_value
+
+        def rows():
+            for user in range(users):
+                count = total // users + (1 if user < total % users else 0)
+                for article_id in random.sample(article_ids, count):
+                    yield article_id, f'user{user}', adapt(now - timedelta(seconds=random.randrange(10 ** 7)))
+
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows())
+
+    def report(self, repeat):
+        factory = APIRequestFactory()
+        view = ArticleViewSet.as_view({'get': 'list'})
+        for tab, param, model, time_field in (
+            ('在读', 'is_read', ReadingHistory, 'read_at'),
+            ('收藏', 'is_favorite', Favorite, 'created_at'),
+        ):
+            params = {param: 'true', 'username': 'user0'}
+
+            viewset = ArticleViewSet(action='list', format_kwarg=None)
+            viewset.request = Request(factory.get('/api/articles/', params))
+            current = viewset.get_queryset()
+
+            # 对照：相关子查询 EXISTS 筛选 + 子查询取时间排序
+            records = model.objects.filter(username='user0', article=OuterRef('pk'))
+            exists = Article.objects.filter(is_active=True).filter(Exists(records)).order_by(
+                Subquery(records.values(time_field)[:1]).desc()
+            )
+
+            for label, queryset in (('JOIN（当前实现）', current), ('EXISTS（对照）', exists)):
+                first_page = self.measure(lambda: list(queryset[:10]), repeat)
+                count = self.measure(queryset.count, repeat)
+                self.stdout.write(f'{tab} {label}: 第一页 {first_page:.2f} ms，总数 {count:.2f} ms')
+
+            # 分页链接需要请求的主机名，基准测试的请求不受 ALLOWED_HOSTS 限制
+            request = factory.get('/api/articles/', params)
+            with override_settings(ALLOWED_HOSTS=['*']):
+                endpoint = self.measure(lambda: view(request).render(), repeat)
+            self.stdout.write(f'{tab} 列表接口（含序列化）: {endpoint:.2f} ms')
+
+    def measure(self, func, repeat):
+        """返回耗时中位数（毫秒）"""
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article
+from articles.vocabulary import build_vocabulary
+
+
+class Command(BaseCommand):
+    help = '预先生成文章词频表（默认只处理还没有词频表的文章）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='重新生成所有文章的词频表')
+
+    def handle(self, *args, **options):
+        articles = Article.objects.order_by('id')
+        if not options['rebuild']:
+            articles = articles.filter(vocabulary_indexed=False)
+
+        count = rows = 0
+        # iterator() 逐篇读取正文，不一次性加载全部文章
+        for article in articles.iterator(chunk_size=100):
+            rows += build_vocabulary(article)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'词频表生成完成：{count} 篇文章，{rows} 行'))
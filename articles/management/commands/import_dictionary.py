@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from articles.dictionary import iter_csv_entries
+from articles.models import DictionaryEntry
+
+
+class Command(BaseCommand):
+    help = '从 ECDICT 格式的 CSV 文件导入离线英汉词典'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='ECDICT 格式的 CSV 文件路径')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='每批写入的词条数（默认: 5000）')
+        parser.add_argument('--replace', action='store_true',
+                            help='导入前清空已有词条')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        try:
+            entries = iter_csv_entries(options['csv_file'])
+            with transaction.atomic():
+                if options['replace']:
+                    DictionaryEntry.objects.all().delete()
+                # ignore_conflicts 跳过的词条不会报告，按写入前后的词条数计算实际新增数
+                existing = DictionaryEntry.objects.count()
+                count = 0
+                batch = []
+                for entry in entries:
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        count += self.write(batch)
+                        batch = []
+                count += self.write(batch)
+                imported = DictionaryEntry.objects.count() - existing
+        except OSError as e:
+            raise CommandError(f'无法读取词典文件: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'词典导入完成：处理 {count} 个词条，新增 {imported} 个，'
+            f'跳过 {count - imported} 个已存在或重复的词条'
+        ))
+
+    def write(self, batch):
+        # 已存在的单词保留原词条
+        DictionaryEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        return len(batch)
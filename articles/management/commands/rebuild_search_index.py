@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article, GrammarArticle, UserGrammarArticle
+from articles.search import rebuild_index, fts_enabled
+
+
+class Command(BaseCommand):
+    help = '重建文章全文检索索引（批量导入或批量更新后运行）'
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write(self.style.WARNING('当前数据库不支持FTS5，已跳过'))
+            return
+
+        for model in (Article, GrammarArticle, UserGrammarArticle):
+            rebuild_index(model)
+            self.stdout.write(f'✓ 已重建 {model._meta.db_table} 的全文索引')
+
+        self.stdout.write(self.style.SUCCESS('全文索引重建完成'))
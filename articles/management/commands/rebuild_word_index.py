@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from articles.concordance import rebuild_word_index
+
+
+class Command(BaseCommand):
+    help = '重建单词位置索引（KWIC检索使用，批量导入或批量修改正文后运行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100,
+                            help='每个事务处理的文章数（默认: 100）')
+
+    def handle(self, *args, **options):
+        count = rebuild_word_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'单词位置索引重建完成：{count} 篇文章'))
@@ -0,0 +1,98 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from articles.cache_versions import bump_version
+from articles.models import Article, GrammarArticle
+from articles.readability import score_rows
+
+
+MODELS = {
+    'article': Article,
+    'grammar': GrammarArticle,
+}
+
+
+def iter_chunks(model, chunk_size):
+    """按主键顺序分批读取 (id, content, difficulty)，不一次性加载全部正文"""
+    last_id = 0
+    while True:
+        rows = list(
+            model.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'content', 'difficulty')[:chunk_size]
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+class Command(BaseCommand):
+    help = '按可读性指标重新评估文章难度（分批读取，多进程计算，bulk_update 写回）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['all', *MODELS], default='all',
+                            help='要重新评估的文章表（默认: all）')
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='每批读取和写回的文章数（默认: 500）')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='计算进程数（默认: CPU核数，1 表示在当前进程中计算）')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        if chunk_size < 1 or workers < 1:
+            raise CommandError('--chunk-size 和 --workers 必须大于0')
+
+        models = MODELS.values() if options['model'] == 'all' else [MODELS[options['model']]]
+        for model in models:
+            total, changed = self.rescore(model, chunk_size, workers)
+            self.stdout.write(
+                f'✓ {model._meta.db_table}: 已评估 {total} 篇，难度变化 {changed} 篇'
+            )
+
+        self.stdout.write(self.style.SUCCESS('难度重新评估完成'))
+
+    def rescore(self, model, chunk_size, workers):
+        total = changed = written = 0
+        for results in self.iter_results(model, chunk_size, workers):
+            old_levels = dict(
+                model.objects.filter(id__in=[row[0] for row in results]).values_list('id', 'reading_level')
+            )
+            # 只写回难度或可读性年级有变化的文章；bulk_update 不调用 save()，
+            # updated_at 需要显式写入（详情的 Last-Modified 依赖它），全文索引和分页缓存不受影响
+            now = timezone.now()
+            updates = [
+                model(id=pk, difficulty=difficulty, reading_level=reading_level, updated_at=now)
+                for pk, old, difficulty, reading_level in results
+                if old != difficulty or old_levels.get(pk) != reading_level
+            ]
+            model.objects.bulk_update(updates, ['difficulty', 'reading_level', 'updated_at'])
+            total += len(results)
+            changed += sum(1 for _, old, new, _ in results if old != new)
+            written += len(updates)
+        if written:
+            # 依赖难度和可读性年级的列表计数、列表响应和 ETag 作废
+            bump_version(model)
+        return total, changed
+
+    def iter_results(self, model, chunk_size, workers):
+        """按批次顺序产出评估结果；进程池中最多同时排队 workers × 2 批"""
+        chunks = iter_chunks(model, chunk_size)
+        if workers == 1:
+            for rows in chunks:
+                yield score_rows(rows)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for rows in chunks:
+                pending.append(executor.submit(score_rows, rows))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+
+PREVIEW_LENGTH = 200
+BATCH_SIZE = 500
+
+
+def backfill_content_preview(apps, schema_editor):
+    """按主键分批回填已有文章的内容预览"""
+    for model_name in ('Article', 'GrammarArticle', 'UserGrammarArticle'):
+        model = apps.get_model('articles', model_name)
+        last_id = 0
+        while True:
+            batch = list(
+                model.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'content')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for obj in batch:
+                content = obj.content or ''
+                obj.content_preview = (
+                    content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content
+                )
+            model.objects.bulk_update(batch, ['content_preview'])
+            last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_add_markdown_support'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_preview',
+            field=models.CharField(blank=True, default='', max_length=203, verbose_name='内容预览'),
+        ),
+        migrations.AddField(
+            model_name='grammararticle',
+            name='content_preview',
+            field=models.CharField(blank=True, default='', max_length=203, verbose_name='内容预览'),
+        ),
+        migrations.AddField(
+            model_name='usergrammararticle',
+            name='content_preview',
+            field=models.CharField(blank=True, default='', max_length=203, verbose_name='内容预览'),
+        ),
+        migrations.RunPython(backfill_content_preview, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+FTS_TABLES = {
+    'articles': 'articles_fts',
+    'grammar_articles': 'grammar_articles_fts',
+    'user_grammar_articles': 'user_grammar_articles_fts',
+}
+
+
+def create_fts_tables(apps, schema_editor):
+    """创建外部内容FTS5索引表并从原表构建索引（仅SQLite）"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, fts in FTS_TABLES.items():
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"title, category, content, "
+            f"content='{table}', content_rowid='id', "
+            f"tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES('rebuild')")
+
+
+def drop_fts_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts in FTS_TABLES.values():
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_content_preview'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_tables, drop_fts_tables),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0010_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageBoundaryCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article_table', models.CharField(max_length=50, verbose_name='文章表')),
+                ('article_id', models.BigIntegerField(verbose_name='文章ID')),
+                ('params_key', models.CharField(max_length=100, verbose_name='分页参数')),
+                ('content_version', models.DateTimeField(verbose_name='文章更新时间')),
+                ('offsets', models.BinaryField(verbose_name='页边界偏移量')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': '分页边界缓存',
+                'verbose_name_plural': '分页边界缓存',
+                'db_table': 'page_boundary_cache',
+                'unique_together': {('article_table', 'article_id', 'params_key')},
+            },
+        ),
+    ]
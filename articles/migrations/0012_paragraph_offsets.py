@@ -0,0 +1,77 @@
+from array import array
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 200
+
+
+def compute_paragraph_offsets(content):
+    offsets = array('I')
+    position = 0
+    for chunk in (content or '').split('\n\n'):
+        stripped_end = len(chunk.rstrip())
+        if stripped_end:
+            offsets.append(position + len(chunk) - len(chunk.lstrip()))
+            offsets.append(position + stripped_end)
+        position += len(chunk) + 2
+    return offsets
+
+
+def backfill_paragraph_offsets(apps, schema_editor):
+    """按主键分批为已有文章计算段落偏移量"""
+    for model_name in ('Article', 'GrammarArticle', 'UserGrammarArticle'):
+        model = apps.get_model('articles', model_name)
+        last_id = 0
+        while True:
+            batch = list(
+                model.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'content')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for obj in batch:
+                offsets = compute_paragraph_offsets(obj.content)
+                obj.paragraph_offsets = offsets.tobytes()
+                obj.paragraph_count = len(offsets) // 2
+            model.objects.bulk_update(batch, ['paragraph_offsets', 'paragraph_count'])
+            last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0011_page_boundary_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='paragraph_offsets',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='段落偏移量'),
+        ),
+        migrations.AddField(
+            model_name='grammararticle',
+            name='paragraph_offsets',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='段落偏移量'),
+        ),
+        migrations.AddField(
+            model_name='usergrammararticle',
+            name='paragraph_offsets',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='段落偏移量'),
+        ),
+        migrations.RunPython(backfill_paragraph_offsets, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='article',
+            name='paragraphs',
+        ),
+        migrations.RemoveField(
+            model_name='grammararticle',
+            name='paragraphs',
+        ),
+        migrations.RemoveField(
+            model_name='usergrammararticle',
+            name='paragraphs',
+        ),
+    ]
@@ -0,0 +1,42 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 500
+
+
+def backfill_content_hash(apps, schema_editor):
+    """按主键分批计算已有文章的内容哈希"""
+    Article = apps.get_model('articles', 'Article')
+    last_id = 0
+    while True:
+        batch = list(
+            Article.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'content')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for article in batch:
+            article.content_hash = hashlib.sha256(
+                (article.content or '').encode('utf-8')
+            ).hexdigest()
+        Article.objects.bulk_update(batch, ['content_hash'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_paragraph_offsets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='内容哈希'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
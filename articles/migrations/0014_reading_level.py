@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_article_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='reading_level',
+            field=models.FloatField(blank=True, null=True, verbose_name='可读性年级'),
+        ),
+        migrations.AddField(
+            model_name='grammararticle',
+            name='reading_level',
+            field=models.FloatField(blank=True, null=True, verbose_name='可读性年级'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['difficulty', '-created_at'], name='articles_difficulty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grammararticle',
+            index=models.Index(fields=['difficulty', '-created_at'], name='grammar_difficulty_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0014_reading_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleWordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page', models.PositiveIntegerField(default=0, verbose_name='页码')),
+                ('word', models.CharField(max_length=100, verbose_name='单词')),
+                ('count', models.PositiveIntegerField(verbose_name='出现次数')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='word_counts', to='articles.article', verbose_name='文章')),
+            ],
+            options={
+                'verbose_name': '文章词频',
+                'verbose_name_plural': '文章词频',
+                'db_table': 'article_word_counts',
+                'indexes': [models.Index(fields=['article', 'page', '-count'], name='word_counts_frequency_idx')],
+                'unique_together': {('article', 'page', 'word')},
+            },
+        ),
+    ]
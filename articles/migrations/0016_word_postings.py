@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:03
+
+import re
+from array import array
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 100
+
+WORD_TOKEN_RE = re.compile(r'[A-Za-z]+')
+MIN_WORD_LENGTH = 2
+MAX_WORD_LENGTH = 100
+
+
+def compute_postings(content):
+    postings = {}
+    for match in WORD_TOKEN_RE.finditer(content or ''):
+        word = match.group().lower()
+        if MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH:
+            postings.setdefault(word, array('I')).append(match.start())
+    return postings
+
+
+def build_word_postings(apps, schema_editor):
+    """按主键分批为已有文章建立单词位置索引"""
+    Article = apps.get_model('articles', 'Article')
+    WordPosting = apps.get_model('articles', 'WordPosting')
+    last_id = 0
+    while True:
+        batch = list(
+            Article.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'content')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        WordPosting.objects.bulk_create(
+            [
+                WordPosting(
+                    word=word, article_id=article.id,
+                    count=len(positions), positions=positions.tobytes()
+                )
+                for article in batch
+                for word, positions in compute_postings(article.content).items()
+            ],
+            batch_size=1000
+        )
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0015_article_word_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100, verbose_name='单词')),
+                ('count', models.PositiveIntegerField(verbose_name='出现次数')),
+                ('positions', models.BinaryField(verbose_name='出现位置')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='word_postings', to='articles.article', verbose_name='文章')),
+            ],
+            options={
+                'verbose_name': '单词索引',
+                'verbose_name_plural': '单词索引',
+                'db_table': 'word_postings',
+                'unique_together': {('word', 'article')},
+            },
+        ),
+        migrations.RunPython(build_word_postings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:05
+
+import re
+from array import array
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 200
+
+TERMINATOR_RE = re.compile(r'[.!?]+[\'"’”)\]]*(?=\s|$)')
+
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'etc', 'no', 'vol',
+    'fig', 'inc', 'ltd', 'co', 'corp', 'dept', 'approx', 'gen', 'gov', 'sen', 'rep',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    'e.g', 'i.e', 'cf', 'al', 'u.s', 'u.k', 'a.m', 'p.m',
+})
+
+_LEADING_PUNCTUATION = '\'"‘“(['
+
+
+def _is_abbreviation(text, period_index):
+    word_start = period_index
+    while word_start > 0 and not text[word_start - 1].isspace():
+        word_start -= 1
+    word = text[word_start:period_index].lstrip(_LEADING_PUNCTUATION).lower()
+    if not word:
+        return False
+    if len(word) == 1 and word.isalpha():
+        return True
+    return word in ABBREVIATIONS
+
+
+def split_sentences(text):
+    spans = []
+    start = 0
+    for match in TERMINATOR_RE.finditer(text):
+        end = match.end()
+        punctuation = match.group().rstrip('\'"’”)]')
+        if punctuation == '.' and _is_abbreviation(text, match.start()):
+            continue
+        next_text = text[end:].lstrip()
+        if next_text and next_text[0].islower():
+            continue
+        spans.append((start, end))
+        start = end
+    spans.append((start, len(text)))
+
+    result = []
+    for span_start, span_end in spans:
+        chunk = text[span_start:span_end]
+        stripped_end = len(chunk.rstrip())
+        if stripped_end:
+            leading = len(chunk) - len(chunk.lstrip())
+            result.append((span_start + leading, span_start + stripped_end))
+    return result
+
+
+def compute_sentence_offsets(content, paragraph_offsets):
+    offsets = array('I')
+    for i in range(0, len(paragraph_offsets), 2):
+        paragraph_start, paragraph_end = paragraph_offsets[i], paragraph_offsets[i + 1]
+        for start, end in split_sentences(content[paragraph_start:paragraph_end]):
+            offsets.append(paragraph_start + start)
+            offsets.append(paragraph_start + end)
+    return offsets
+
+
+def backfill_sentence_offsets(apps, schema_editor):
+    """按主键分批根据已保存的段落偏移量计算句子偏移量"""
+    for model_name in ('Article', 'GrammarArticle', 'UserGrammarArticle'):
+        model = apps.get_model('articles', model_name)
+        last_id = 0
+        while True:
+            batch = list(
+                model.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'content', 'paragraph_offsets')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for obj in batch:
+                paragraph_offsets = array('I')
+                paragraph_offsets.frombytes(bytes(obj.paragraph_offsets or b''))
+                obj.sentence_offsets = compute_sentence_offsets(obj.content or '', paragraph_offsets).tobytes()
+            model.objects.bulk_update(batch, ['sentence_offsets'])
+            last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0016_word_postings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='sentence_offsets',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='句子偏移量'),
+        ),
+        migrations.AddField(
+            model_name='grammararticle',
+            name='sentence_offsets',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='句子偏移量'),
+        ),
+        migrations.AddField(
+            model_name='usergrammararticle',
+            name='sentence_offsets',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='句子偏移量'),
+        ),
+        migrations.RunPython(backfill_sentence_offsets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0017_sentence_offsets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64, verbose_name='原文哈希')),
+                ('source_lang', models.CharField(max_length=10, verbose_name='源语言')),
+                ('target_lang', models.CharField(max_length=10, verbose_name='目标语言')),
+                ('source_text', models.TextField(verbose_name='原文')),
+                ('translated_text', models.TextField(verbose_name='译文')),
+                ('backend', models.CharField(max_length=50, verbose_name='翻译后端')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': '翻译记忆',
+                'verbose_name_plural': '翻译记忆',
+                'db_table': 'translation_memory',
+                'unique_together': {('source_hash', 'source_lang', 'target_lang')},
+            },
+        ),
+    ]
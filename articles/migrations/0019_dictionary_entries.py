@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0018_translation_memory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DictionaryEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100, unique=True, verbose_name='单词')),
+                ('key', models.CharField(db_index=True, max_length=100, verbose_name='查询键')),
+                ('phonetic', models.CharField(blank=True, default='', max_length=100, verbose_name='音标')),
+                ('translation', models.TextField(blank=True, default='', verbose_name='中文释义')),
+                ('definition', models.TextField(blank=True, default='', verbose_name='英文释义')),
+                ('pos', models.CharField(blank=True, default='', max_length=100, verbose_name='词性')),
+                ('tag', models.CharField(blank=True, default='', max_length=100, verbose_name='标签')),
+                ('exchange', models.CharField(blank=True, default='', max_length=200, verbose_name='词形变化')),
+            ],
+            options={
+                'verbose_name': '词典词条',
+                'verbose_name_plural': '词典词条',
+                'db_table': 'dictionary_entries',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0019_dictionary_entries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='articles_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grammararticle',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='grammar_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usergrammararticle',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='user_grammar_keyset_idx'),
+        ),
+    ]
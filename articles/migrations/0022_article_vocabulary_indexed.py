@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+def mark_built_vocabularies(apps, schema_editor):
+    """已有词频行的文章标记为已生成（没有单词的文章下次请求时重新生成一次）"""
+    Article = apps.get_model('articles', 'Article')
+    ArticleWordCount = apps.get_model('articles', 'ArticleWordCount')
+    Article.objects.filter(
+        id__in=ArticleWordCount.objects.values('article_id')
+    ).update(vocabulary_indexed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0021_user_tab_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='vocabulary_indexed',
+            field=models.BooleanField(default=False, verbose_name='词频表已生成'),
+        ),
+        migrations.RunPython(mark_built_vocabularies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0022_article_vocabulary_indexed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pageboundarycache',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='文章内容哈希'),
+        ),
+    ]
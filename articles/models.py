@@ -1,6 +1,49 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
+import hashlib
 import json
+import re
+
+from .search import add_to_index, remove_from_index
+from .page_boundaries import invalidate_page_boundaries
+from .vocabulary import invalidate_vocabulary
+from .concordance import index_article
+from .paragraphs import compute_paragraph_offsets, pack_paragraph_offsets
+from .sentences import compute_sentence_offsets, pack_sentence_offsets
+from .cache_versions import bump_version_on_commit
+
+
+PREVIEW_LENGTH = 200
+
+WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+
+
+def build_content_preview(content):
+    """生成内容预览（前200个字符），供列表接口直接读取"""
+    if not content:
+        return ''
+    return content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content
+
+
+def compute_content_hash(content):
+    """正文的 SHA-256 哈希，用于导入时判断内容是否变化"""
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+def compute_content_fields(content):
+    """
+    根据正文计算派生字段：单词数、段落数、段落和句子偏移量（正文不再重复保存）和内容预览
+
+    save() 与批量导入（bulk_create 不会调用 save）共用。
+    """
+    offsets = compute_paragraph_offsets(content)
+    return {
+        'word_count': len(WORD_RE.findall(content)),
+        'paragraph_count': len(offsets) // 2,
+        'paragraph_offsets': pack_paragraph_offsets(offsets),
+        'sentence_offsets': pack_sentence_offsets(compute_sentence_offsets(content, offsets)),
+        'content_preview': build_content_preview(content),
+    }
 
 
 class Article(models.Model):
@@ -18,10 +61,27 @@ class Article(models.Model):
         default='intermediate',
         verbose_name='难度'
     )
+    reading_level = models.FloatField(blank=True, null=True, verbose_name='可读性年级')
     category = models.CharField(max_length=50, blank=True, null=True, verbose_name='分类')
     word_count = models.IntegerField(default=0, verbose_name='单词数')
     paragraph_count = models.IntegerField(default=0, verbose_name='段落数')
-    paragraphs = models.JSONField(default=list, blank=True, verbose_name='段落数据')
+    paragraph_offsets = models.BinaryField(default=b'', blank=True, verbose_name='段落偏移量')
+    sentence_offsets = models.BinaryField(default=b'', blank=True, verbose_name='句子偏移量')
+    content_format = models.CharField(
+        max_length=20,
+        choices=[
+            ('plain', '纯文本'),
+            ('markdown', 'Markdown'),
+            ('html', 'HTML'),
+        ],
+        default='plain',
+        verbose_name='内容格式'
+    )
+    is_markdown = models.BooleanField(default=False, verbose_name='是否为Markdown格式')
+    content_preview = models.CharField(max_length=PREVIEW_LENGTH + 3, blank=True, default='', verbose_name='内容预览')
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name='内容哈希')
+    # 词频表已按当前正文生成（没有单词的文章没有词频行，不能用是否有行来判断）
+    vocabulary_indexed = models.BooleanField(default=False, verbose_name='词频表已生成')
     created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
     is_active = models.BooleanField(default=True, verbose_name='是否启用')
@@ -33,21 +93,53 @@ class Article(models.Model):
         verbose_name = '文章'
         verbose_name_plural = '文章'
         ordering = ['-created_at']
+        indexes = [
+            # 按难度筛选后按创建时间排序（列表默认顺序）
+            models.Index(fields=['difficulty', '-created_at'], name='articles_difficulty_idx'),
+            # 列表的游标分页：WHERE is_active ORDER BY created_at DESC, id DESC
+            models.Index(fields=['is_active', '-created_at', '-id'], name='articles_keyset_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        # 自动计算单词数和段落数，并存储段落数据
+        # 自动计算单词数、段落数、段落偏移量和内容预览
         if self.content:
-            import re
-            words = re.findall(r'\b[a-zA-Z]+\b', self.content)
-            self.word_count = len(words)
-            # 分割并存储段落
-            paragraphs_list = [p.strip() for p in self.content.split('\n\n') if p.strip()]
-            self.paragraph_count = len(paragraphs_list)
-            self.paragraphs = paragraphs_list  # 存储段落数组
-        super().save(*args, **kwargs)
+            for field, value in compute_content_fields(self.content).items():
+                setattr(self, field, value)
+        else:
+            self.content_preview = ''
+        self.content_hash = compute_content_hash(self.content)
+        # 同步全文索引：先按旧内容移除，保存后再按新内容加入
+        with transaction.atomic():
+            previous_hash = vocabulary_indexed = None
+            if self.pk is not None:
+                previous_hash, vocabulary_indexed = Article.objects.filter(pk=self.pk).values_list(
+                    'content_hash', 'vocabulary_indexed'
+                ).first() or (None, None)
+            remove_from_index(self)
+            # 正文变化时旧的页边界缓存和词频表作废（只修改标题、分类等字段时保留）
+            content_changed = previous_hash != self.content_hash
+            if content_changed:
+                invalidate_page_boundaries(self)
+                invalidate_vocabulary(self)
+            else:
+                # 实例可能是在词频表生成之前读取的，沿用数据库中的标记
+                self.vocabulary_indexed = vocabulary_indexed
+            super().save(*args, **kwargs)
+            add_to_index(self)
+            # 使依赖文章数据的缓存（列表计数、响应缓存等）失效
+            bump_version_on_commit(type(self), self.pk)
+            # 单词位置索引只在正文变化时重建
+            if content_changed:
+                index_article(self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            remove_from_index(self)
+            bump_version_on_commit(type(self), self.pk)
+            return super().delete(*args, **kwargs)
 
 
 class ReadingHistory(models.Model):
@@ -64,6 +156,10 @@ class ReadingHistory(models.Model):
         verbose_name_plural = '阅读历史'
         ordering = ['-read_at']
         unique_together = [['article', 'username']]
+        indexes = [
+            # "在读"列表：按用户筛选并按阅读时间排序
+            models.Index(fields=['username', '-read_at'], name='history_user_read_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} - {self.article.title}"
@@ -99,6 +195,10 @@ class Favorite(models.Model):
         verbose_name_plural = '收藏'
         ordering = ['-created_at']
         unique_together = [['article', 'username']]
+        indexes = [
+            # "收藏"列表：按用户筛选并按收藏时间排序
+            models.Index(fields=['username', '-created_at'], name='favorites_user_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} - {self.article.title}"
@@ -119,10 +219,24 @@ class GrammarArticle(models.Model):
         default='intermediate',
         verbose_name='难度'
     )
+    reading_level = models.FloatField(blank=True, null=True, verbose_name='可读性年级')
     category = models.CharField(max_length=50, blank=True, null=True, verbose_name='分类')
     word_count = models.IntegerField(default=0, verbose_name='单词数')
     paragraph_count = models.IntegerField(default=0, verbose_name='段落数')
-    paragraphs = models.JSONField(default=list, blank=True, verbose_name='段落数据')
+    paragraph_offsets = models.BinaryField(default=b'', blank=True, verbose_name='段落偏移量')
+    sentence_offsets = models.BinaryField(default=b'', blank=True, verbose_name='句子偏移量')
+    content_format = models.CharField(
+        max_length=20,
+        choices=[
+            ('plain', '纯文本'),
+            ('markdown', 'Markdown'),
+            ('html', 'HTML'),
+        ],
+        default='plain',
+        verbose_name='内容格式'
+    )
+    is_markdown = models.BooleanField(default=False, verbose_name='是否为Markdown格式')
+    content_preview = models.CharField(max_length=PREVIEW_LENGTH + 3, blank=True, default='', verbose_name='内容预览')
     created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
     is_active = models.BooleanField(default=True, verbose_name='是否启用')
@@ -133,21 +247,38 @@ class GrammarArticle(models.Model):
         verbose_name = '语法文章'
         verbose_name_plural = '语法文章'
         ordering = ['-created_at']
+        indexes = [
+            # 按难度筛选后按创建时间排序（列表默认顺序）
+            models.Index(fields=['difficulty', '-created_at'], name='grammar_difficulty_idx'),
+            # 列表的游标分页：WHERE is_active ORDER BY created_at DESC, id DESC
+            models.Index(fields=['is_active', '-created_at', '-id'], name='grammar_keyset_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        # 自动计算单词数和段落数，并存储段落数据
+        # 自动计算单词数、段落数、段落偏移量和内容预览
         if self.content:
-            import re
-            words = re.findall(r'\b[a-zA-Z]+\b', self.content)
-            self.word_count = len(words)
-            # 分割并存储段落
-            paragraphs_list = [p.strip() for p in self.content.split('\n\n') if p.strip()]
-            self.paragraph_count = len(paragraphs_list)
-            self.paragraphs = paragraphs_list  # 存储段落数组
-        super().save(*args, **kwargs)
+            for field, value in compute_content_fields(self.content).items():
+                setattr(self, field, value)
+        else:
+            self.content_preview = ''
+        # 同步全文索引：先按旧内容移除，保存后再按新内容加入
+        with transaction.atomic():
+            remove_from_index(self)
+            # 内容可能已变化，旧的页边界缓存作废
+            invalidate_page_boundaries(self)
+            super().save(*args, **kwargs)
+            add_to_index(self)
+            # 使依赖文章数据的缓存（列表计数、响应缓存等）失效
+            bump_version_on_commit(type(self), self.pk)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            remove_from_index(self)
+            bump_version_on_commit(type(self), self.pk)
+            return super().delete(*args, **kwargs)
 
 
 class UserGrammarArticle(models.Model):
@@ -168,7 +299,20 @@ class UserGrammarArticle(models.Model):
     category = models.CharField(max_length=50, blank=True, null=True, verbose_name='分类')
     word_count = models.IntegerField(default=0, verbose_name='单词数')
     paragraph_count = models.IntegerField(default=0, verbose_name='段落数')
-    paragraphs = models.JSONField(default=list, blank=True, verbose_name='段落数据')
+    paragraph_offsets = models.BinaryField(default=b'', blank=True, verbose_name='段落偏移量')
+    sentence_offsets = models.BinaryField(default=b'', blank=True, verbose_name='句子偏移量')
+    content_format = models.CharField(
+        max_length=20,
+        choices=[
+            ('plain', '纯文本'),
+            ('markdown', 'Markdown'),
+            ('html', 'HTML'),
+        ],
+        default='plain',
+        verbose_name='内容格式'
+    )
+    is_markdown = models.BooleanField(default=False, verbose_name='是否为Markdown格式')
+    content_preview = models.CharField(max_length=PREVIEW_LENGTH + 3, blank=True, default='', verbose_name='内容预览')
     created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
     is_active = models.BooleanField(default=True, verbose_name='是否启用')
@@ -179,18 +323,132 @@ class UserGrammarArticle(models.Model):
         verbose_name = '用户语法文章'
         verbose_name_plural = '用户语法文章'
         ordering = ['-created_at']
+        indexes = [
+            # 列表只显示当前用户的文章，游标分页按 (created_at, id) 倒序
+            models.Index(fields=['author', '-created_at', '-id'], name='user_grammar_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.author}"
 
     def save(self, *args, **kwargs):
-        # 自动计算单词数和段落数，并存储段落数据
+        # 自动计算单词数、段落数、段落偏移量和内容预览
         if self.content:
-            import re
-            words = re.findall(r'\b[a-zA-Z]+\b', self.content)
-            self.word_count = len(words)
-            # 分割并存储段落
-            paragraphs_list = [p.strip() for p in self.content.split('\n\n') if p.strip()]
-            self.paragraph_count = len(paragraphs_list)
-            self.paragraphs = paragraphs_list  # 存储段落数组
-        super().save(*args, **kwargs)
+            for field, value in compute_content_fields(self.content).items():
+                setattr(self, field, value)
+        else:
+            self.content_preview = ''
+        # 同步全文索引：先按旧内容移除，保存后再按新内容加入
+        with transaction.atomic():
+            remove_from_index(self)
+            # 内容可能已变化，旧的页边界缓存作废
+            invalidate_page_boundaries(self)
+            super().save(*args, **kwargs)
+            add_to_index(self)
+            # 使依赖文章数据的缓存（列表计数、响应缓存等）失效
+            bump_version_on_commit(type(self), self.pk)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            remove_from_index(self)
+            bump_version_on_commit(type(self), self.pk)
+            return super().delete(*args, **kwargs)
+
+
+class PageBoundaryCache(models.Model):
+    """文章智能分页的页边界缓存（段落下标偏移量）"""
+    article_table = models.CharField(max_length=50, verbose_name='文章表')
+    article_id = models.BigIntegerField(verbose_name='文章ID')
+    params_key = models.CharField(max_length=100, verbose_name='分页参数')
+    content_version = models.DateTimeField(verbose_name='文章更新时间')
+    # 文章有内容哈希时按内容哈希判断缓存是否有效，只修改标题、分类等字段不会使页边界失效
+    content_hash = models.CharField(max_length=64, blank=True, default='', verbose_name='文章内容哈希')
+    offsets = models.BinaryField(verbose_name='页边界偏移量')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
+
+    class Meta:
+        db_table = 'page_boundary_cache'
+        verbose_name = '分页边界缓存'
+        verbose_name_plural = '分页边界缓存'
+        unique_together = [['article_table', 'article_id', 'params_key']]
+
+    def __str__(self):
+        return f"{self.article_table}#{self.article_id} ({self.params_key})"
+
+
+class ArticleWordCount(models.Model):
+    """文章词频表（page=0 为全文词频，page>=1 为默认智能分页各页的词频）"""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='word_counts', verbose_name='文章')
+    page = models.PositiveIntegerField(default=0, verbose_name='页码')
+    word = models.CharField(max_length=100, verbose_name='单词')
+    count = models.PositiveIntegerField(verbose_name='出现次数')
+
+    class Meta:
+        db_table = 'article_word_counts'
+        verbose_name = '文章词频'
+        verbose_name_plural = '文章词频'
+        unique_together = [['article', 'page', 'word']]
+        indexes = [
+            # 按频率排序（按字母排序使用唯一索引）
+            models.Index(fields=['article', 'page', '-count'], name='word_counts_frequency_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id}#{self.page} {self.word}: {self.count}"
+
+
+class WordPosting(models.Model):
+    """单词倒排索引：单词在每篇文章中出现的字符位置"""
+    word = models.CharField(max_length=100, verbose_name='单词')
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='word_postings', verbose_name='文章')
+    count = models.PositiveIntegerField(verbose_name='出现次数')
+    positions = models.BinaryField(verbose_name='出现位置')
+
+    class Meta:
+        db_table = 'word_postings'
+        verbose_name = '单词索引'
+        verbose_name_plural = '单词索引'
+        unique_together = [['word', 'article']]
+
+    def __str__(self):
+        return f"{self.word} @ {self.article_id} ({self.count})"
+
+
+class TranslationMemory(models.Model):
+    """段落翻译记忆（按原文哈希和语言对缓存翻译结果，所有用户共享）"""
+    source_hash = models.CharField(max_length=64, verbose_name='原文哈希')
+    source_lang = models.CharField(max_length=10, verbose_name='源语言')
+    target_lang = models.CharField(max_length=10, verbose_name='目标语言')
+    source_text = models.TextField(verbose_name='原文')
+    translated_text = models.TextField(verbose_name='译文')
+    backend = models.CharField(max_length=50, verbose_name='翻译后端')
+    created_at = models.DateTimeField(default=timezone.now, verbose_name='创建时间')
+
+    class Meta:
+        db_table = 'translation_memory'
+        verbose_name = '翻译记忆'
+        verbose_name_plural = '翻译记忆'
+        unique_together = [['source_hash', 'source_lang', 'target_lang']]
+
+    def __str__(self):
+        return f"{self.source_lang}->{self.target_lang} {self.source_text[:30]}"
+
+
+class DictionaryEntry(models.Model):
+    """离线英汉词典词条（ECDICT 格式，通过 import_dictionary 命令导入）"""
+    word = models.CharField(max_length=100, unique=True, verbose_name='单词')
+    key = models.CharField(max_length=100, db_index=True, verbose_name='查询键')
+    phonetic = models.CharField(max_length=100, blank=True, default='', verbose_name='音标')
+    translation = models.TextField(blank=True, default='', verbose_name='中文释义')
+    definition = models.TextField(blank=True, default='', verbose_name='英文释义')
+    pos = models.CharField(max_length=100, blank=True, default='', verbose_name='词性')
+    tag = models.CharField(max_length=100, blank=True, default='', verbose_name='标签')
+    exchange = models.CharField(max_length=200, blank=True, default='', verbose_name='词形变化')
+
+    class Meta:
+        db_table = 'dictionary_entries'
+        verbose_name = '词典词条'
+        verbose_name_plural = '词典词条'
+
+    def __str__(self):
+        return self.word
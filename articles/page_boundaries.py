@@ -0,0 +1,144 @@
+"""
+文章分页的页边界计算与缓存
+
+分页结果只保存为段落下标偏移量 offsets = [0, e1, e2, ..., n]，
+第 i 页（从1开始）包含第 offsets[i-1] 到 offsets[i]-1 个段落。
+智能分页的页边界按 (文章, 内容哈希或 updated_at, 分页参数) 缓存到 PageBoundaryCache 表，
+翻页时直接切片，不再对整本书重新分页。
+"""
+from array import array
+
+
+# 智能分页参数及默认值（顺序决定缓存键）
+SMART_PARAM_DEFAULTS = (
+    ('target_chars', 4000),
+    ('min_chars', 2000),
+    ('max_chars', 8000),
+    ('min_paragraphs', 2),
+    ('max_paragraphs', 15),
+)
+
+
+def compute_smart_offsets(paragraph_lengths, target_chars=4000, min_chars=2000,
+                          max_chars=8000, min_paragraphs=2, max_paragraphs=15):
+    """
+    智能分页算法：按目标字符数分页，同时保持段落完整性
+
+    参数:
+        paragraph_lengths: 各段落的字符数
+        target_chars: 目标字符数（每页理想长度）
+        min_chars: 最少字符数（避免页面太短）
+        max_chars: 最多字符数（避免页面太长）
+        min_paragraphs: 最少段落数（避免单段过长）
+        max_paragraphs: 最多段落数（避免段落过多）
+
+    返回:
+        页边界偏移量 [0, e1, e2, ..., 段落总数]，至少包含一页
+    """
+    offsets = [0]
+    current_count = 0
+    current_length = 0
+
+    for index, para_length in enumerate(paragraph_lengths):
+        if para_length == 0:  # 跳过空段落
+            continue
+
+        # 判断是否应该分页
+        should_paginate = False
+
+        # 条件1：达到最大段落数
+        if current_count >= max_paragraphs:
+            should_paginate = True
+
+        # 条件2：加上当前段落会超过最大字符数
+        elif current_length + para_length > max_chars and current_count >= min_paragraphs:
+            should_paginate = True
+
+        # 条件3：已达到目标字符数且至少有最少段落数
+        elif current_count >= min_paragraphs and current_length >= target_chars:
+            should_paginate = True
+
+        # 执行分页
+        if should_paginate and current_count:
+            offsets.append(index)
+            current_count = 0
+            current_length = 0
+
+        current_count += 1
+        current_length += para_length
+
+    offsets.append(len(paragraph_lengths))
+    return offsets
+
+
+def compute_fixed_offsets(paragraph_count, page_size):
+    """固定分页：每页 page_size 个段落（与 django Paginator 结果一致）"""
+    page_size = max(1, page_size)
+    if paragraph_count == 0:
+        return [0, 0]
+    return list(range(0, paragraph_count, page_size)) + [paragraph_count]
+
+
+def pack_offsets(offsets):
+    """把偏移量压缩为 uint32 字节串"""
+    return array('I', offsets).tobytes()
+
+
+def unpack_offsets(data):
+    offsets = array('I')
+    offsets.frombytes(bytes(data))
+    return offsets.tolist()
+
+
+def smart_params_key(params):
+    return ':'.join(str(params[name]) for name, _ in SMART_PARAM_DEFAULTS)
+
+
+def get_smart_offsets(article, paragraph_lengths, **params):
+    """
+    获取文章的智能分页页边界（优先读取缓存）
+
+    缓存按 (文章表, 文章ID, 分页参数) 存储一行，内容哈希（模型没有内容哈希时为 updated_at）
+    不一致时重新计算并覆盖。
+    """
+    from .models import PageBoundaryCache
+
+    params = {name: params.get(name, default) for name, default in SMART_PARAM_DEFAULTS}
+    lookup = {
+        'article_table': article._meta.db_table,
+        'article_id': article.pk,
+        'params_key': smart_params_key(params),
+    }
+
+    content_hash = getattr(article, 'content_hash', '')
+    cached = PageBoundaryCache.objects.filter(**lookup).only('content_version', 'content_hash', 'offsets').first()
+    if cached:
+        if content_hash:
+            valid = cached.content_hash == content_hash
+        else:
+            valid = cached.content_version == article.updated_at
+        if valid:
+            return unpack_offsets(cached.offsets)
+
+    offsets = compute_smart_offsets(paragraph_lengths, **params)
+    PageBoundaryCache.objects.update_or_create(
+        **lookup,
+        defaults={
+            'content_version': article.updated_at,
+            'content_hash': content_hash,
+            'offsets': pack_offsets(offsets),
+        }
+    )
+    return offsets
+
+
+def invalidate_page_boundaries(article):
+    """删除文章的全部页边界缓存（文章内容变化时调用）"""
+    from .models import PageBoundaryCache
+
+    if article.pk is None:
+        return
+    PageBoundaryCache.objects.filter(
+        article_table=article._meta.db_table,
+        article_id=article.pk
+    ).delete()
@@ -0,0 +1,194 @@
+"""
+文章列表的游标（keyset）分页
+
+请求参数 pagination=cursor 时启用，不传时仍使用全局的 PageNumberPagination，旧客户端不受影响。
+列表按 (created_at, id) 倒序排列，"收藏"列表按 (收藏时间, id)、"在读"列表按 (阅读时间, id) 倒序排列，
+游标记录上一页最后一篇文章的 (排序时间, id)，下一页用 WHERE t < c OR (t = c AND id < i)
+从索引上的这个位置继续读取，不需要 OFFSET 扫描，也不执行 COUNT(*)。
+搜索结果按相关度排序，没有可比较的排序键，游标记录已读取的条数；返回格式与其他列表相同。
+
+include_count=true 时附带总数。总数按 (文章表版本号, 查询语句) 缓存在默认缓存中，
+文章保存或删除后版本号变化，旧的计数随之失效；收藏、阅读记录的变化最多延迟 COUNT_CACHE_TIMEOUT 秒。
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .cache_versions import get_version
+
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# 列表总数的缓存时间（秒）
+COUNT_CACHE_TIMEOUT = 300
+
+# 游标分页排序键的注解名（收藏、在读列表的排序时间来自连接的表）
+KEYSET_VALUE = 'keyset_value'
+
+
+def use_keyset_pagination(request):
+    """请求是否使用游标分页"""
+    return request.query_params.get('pagination') == 'cursor'
+
+
+def keyset_field(request):
+    """
+    游标分页的排序时间字段（与视图中的排序一致）
+
+    "收藏"和"在读"列表同时请求时视图按阅读时间排序，这里也优先使用阅读时间。
+    """
+    params = request.query_params
+    if params.get('is_read') == 'true':
+        return 'readinghistory__read_at'
+    if params.get('is_favorite') == 'true':
+        return 'favorite__created_at'
+    return 'created_at'
+
+
+def _encode(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def _decode(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+
+def encode_cursor(sort_value, pk):
+    return _encode([sort_value.isoformat(), pk])
+
+
+def decode_cursor(cursor):
+    """解析游标 [排序时间, id]，无效时返回None"""
+    try:
+        sort_value, pk = _decode(cursor)
+        return datetime.fromisoformat(sort_value), int(pk)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def encode_offset_cursor(offset):
+    return _encode([offset])
+
+
+def decode_offset_cursor(cursor):
+    """解析搜索结果的游标 [已读取条数]，无效时返回None"""
+    try:
+        offset, = _decode(cursor)
+        offset = int(offset)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    return offset if offset >= 0 else None
+
+
+def cached_count(queryset):
+    """查询集的总数（按文章表版本号和查询语句缓存）"""
+    query = str(queryset.order_by().query)
+    key = 'list-count:{}:{}:{}'.format(
+        queryset.model._meta.db_table,
+        get_version(queryset.model),
+        hashlib.sha256(query.encode('utf-8')).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class KeysetPagination(BasePagination):
+    """按 (排序时间, id) 倒序的游标分页（搜索结果按相关度顺序），只支持向后翻页"""
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def get_page_size(self, request):
+        default = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE') or DEFAULT_PAGE_SIZE
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, default))
+        except ValueError:
+            page_size = default
+        return max(1, min(page_size, MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        self.count = None
+        if request.query_params.get('include_count') == 'true':
+            self.count = cached_count(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if request.query_params.get('search'):
+            return self._paginate_ranked(queryset, cursor, page_size)
+
+        field = keyset_field(request)
+        if field != 'created_at':
+            # 注解复用视图筛选收藏/阅读记录时的连接；再次 filter() 多值关系会产生新的连接
+            queryset = queryset.annotate(**{KEYSET_VALUE: F(field)})
+            field = KEYSET_VALUE
+        queryset = queryset.order_by(f'-{field}', '-id')
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None:
+                raise NotFound('无效的游标')
+            sort_value, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': sort_value}) | Q(**{field: sort_value, 'id__lt': pk})
+            )
+
+        # 多取一条判断是否还有下一页
+        rows = list(queryset[:page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            self.next_cursor = encode_cursor(getattr(page[-1], field), page[-1].id)
+        return page
+
+    def _paginate_ranked(self, queryset, cursor, page_size):
+        """搜索结果保持相关度顺序，按已读取的条数翻页"""
+        offset = 0
+        if cursor:
+            offset = decode_offset_cursor(cursor)
+            if offset is None:
+                raise NotFound('无效的游标')
+        rows = list(queryset[offset:offset + page_size + 1])
+        page = rows[:page_size]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            self.next_cursor = encode_offset_cursor(offset + page_size)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'results': data,
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        return Response(response)
+
+
+class KeysetPaginationMixin:
+    """列表请求带 pagination=cursor 时改用 KeysetPagination"""
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and use_keyset_pagination(self.request):
+            self._paginator = KeysetPagination()
+        return super().paginator
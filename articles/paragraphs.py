@@ -0,0 +1,78 @@
+"""
+段落偏移量存储
+
+文章只保存一份正文 content，段落以 (start, end) 字符偏移量的形式
+打包为 uint32 数组存储（start0, end0, start1, end1, ...）。
+段落 i 即 content[start_i:end_i]，与 `p.strip() for p in content.split('\n\n')` 的结果一致。
+翻页时只需用 SQL substr() 读取当前页覆盖的那一段正文。
+"""
+from array import array
+
+from django.db.models.functions import Substr
+
+
+PARAGRAPH_SEPARATOR = '\n\n'
+
+
+def compute_paragraph_offsets(content):
+    """
+    计算段落的字符偏移量（跳过空段落，去除段落首尾空白）
+
+    返回:
+        array('I', [start0, end0, start1, end1, ...])
+    """
+    offsets = array('I')
+    if not content:
+        return offsets
+
+    position = 0
+    for chunk in content.split(PARAGRAPH_SEPARATOR):
+        stripped_end = len(chunk.rstrip())
+        if stripped_end:
+            leading = len(chunk) - len(chunk.lstrip())
+            offsets.append(position + leading)
+            offsets.append(position + stripped_end)
+        position += len(chunk) + len(PARAGRAPH_SEPARATOR)
+    return offsets
+
+
+def pack_paragraph_offsets(offsets):
+    return offsets.tobytes()
+
+
+def unpack_paragraph_offsets(data):
+    """把存储的字节串还原为偏移量数组"""
+    offsets = array('I')
+    if data:
+        offsets.frombytes(bytes(data))
+    return offsets
+
+
+def paragraph_lengths(offsets):
+    """每个段落的字符数"""
+    return [offsets[i + 1] - offsets[i] for i in range(0, len(offsets), 2)]
+
+
+def load_paragraphs(article, start, end, offsets):
+    """
+    读取第 start 到 end-1 个段落的文本
+
+    只从数据库取出这些段落覆盖的正文片段，不加载整篇文章。
+    """
+    if start >= end:
+        return []
+
+    char_start = offsets[2 * start]
+    char_end = offsets[2 * end - 1]
+    if 'content' not in article.get_deferred_fields():
+        text = article.content[char_start:char_end]
+    else:
+        # SQLite 的 substr() 按字符计数且从1开始，与 Python 字符串下标一致
+        text = type(article).objects.filter(pk=article.pk).annotate(
+            page_text=Substr('content', char_start + 1, char_end - char_start)
+        ).values_list('page_text', flat=True).first() or ''
+
+    return [
+        text[offsets[2 * i] - char_start:offsets[2 * i + 1] - char_start]
+        for i in range(start, end)
+    ]
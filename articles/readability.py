@@ -0,0 +1,178 @@
+"""
+文本可读性统计与难度评估（NumPy 向量化）
+
+文章先切分为单词和句末标点，之后的统计都在数组上完成：
+- Flesch Reading Ease 与 Flesch-Kincaid 年级
+- 句子长度分布（平均值、中位数、90分位数、标准差）
+- 音节数估计（按元音组计数，去掉词尾不发音的 e）
+- 生僻词比例（不在常用词表 common_words.txt 中的单词所占比例）
+
+难度等级由 Flesch-Kincaid 年级和生僻词比例共同决定，
+导入脚本和 `python manage.py rescore_difficulty` 命令共用这里的计算。
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+
+COMMON_WORDS_FILE = Path(__file__).resolve().parent / 'common_words.txt'
+
+# 单词或连续的句末标点
+TOKEN_RE = re.compile(r"[A-Za-z]+|[.!?]+")
+
+VOWELS = np.frombuffer(b'aeiouy', dtype=np.uint8)
+
+# 查常用词表前依次尝试去掉的屈折后缀（studies -> studi 不处理，保持简单）
+INFLECTION_SUFFIXES = ('s', 'es', 'ed', 'ing', 'ly')
+
+# 不超过这个长度的单词不计为生僻词
+SHORT_WORD_LENGTH = 3
+
+# 难度分数 = Flesch-Kincaid 年级 + 生僻词比例 × RARE_WORD_WEIGHT
+RARE_WORD_WEIGHT = 20
+BEGINNER_MAX_SCORE = 10
+INTERMEDIATE_MAX_SCORE = 15
+
+DEFAULT_DIFFICULTY = 'intermediate'
+
+
+@lru_cache(maxsize=None)
+def common_words():
+    """常用词表（已排序的字符串数组）"""
+    words = COMMON_WORDS_FILE.read_text(encoding='utf-8').split()
+    return np.array(sorted(set(word.lower() for word in words)))
+
+
+def tokenize(text):
+    """
+    返回 (单词列表, 每个单词所在句子的长度数组)
+
+    单词已转为小写；没有句末标点的结尾部分也算一个句子。
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return [], np.zeros(0, dtype=np.int64)
+
+    is_end = np.fromiter((token[0] in '.!?' for token in tokens), dtype=bool, count=len(tokens))
+    words = [token.lower() for token, end in zip(tokens, is_end) if not end]
+    # 单词之前出现过的句末标点数即其句子编号
+    sentence_ids = np.cumsum(is_end)[~is_end]
+    sentence_lengths = np.bincount(sentence_ids)
+    return words, sentence_lengths[sentence_lengths > 0]
+
+
+def count_syllables(words):
+    """估计每个单词的音节数（元音组个数，词尾不发音的 e 不算，至少1个）"""
+    if not words:
+        return np.zeros(0, dtype=np.int64)
+
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    letters = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    ends = starts + lengths - 1
+
+    is_vowel = np.isin(letters, VOWELS)
+    previous_vowel = np.concatenate(([False], is_vowel[:-1]))
+    previous_vowel[starts] = False  # 单词首字母不与前一个单词相连
+    syllables = np.add.reduceat((is_vowel & ~previous_vowel).astype(np.int64), starts)
+
+    # make、time 的词尾 e 不发音，table 的 -le 保留
+    silent_e = (
+        (letters[ends] == ord('e'))
+        & (lengths > 2)
+        & (letters[ends - 1] != ord('l'))
+        & (syllables > 1)
+    )
+    return np.maximum(syllables - silent_e, 1)
+
+
+def rare_word_mask(words):
+    """每个单词是否为生僻词（去掉常见屈折后缀后仍不在常用词表中）"""
+    words = np.array(words)
+    if not words.size:
+        return np.zeros(0, dtype=bool)
+
+    vocabulary = common_words()
+    known = np.isin(words, vocabulary) | (np.char.str_len(words) <= SHORT_WORD_LENGTH)
+    for suffix in INFLECTION_SUFFIXES:
+        candidates = np.flatnonzero(~known & np.char.endswith(words, suffix))
+        if candidates.size:
+            stems = np.array([word[:-len(suffix)] for word in words[candidates]])
+            known[candidates] = np.isin(stems, vocabulary)
+    return ~known
+
+
+def text_statistics(text):
+    """
+    计算文本的可读性指标
+
+    返回:
+        {'word_count', 'sentence_count', 'sentence_length': {'mean', 'median', 'p90', 'std'},
+         'syllables_per_word', 'flesch_reading_ease', 'flesch_kincaid_grade', 'rare_word_ratio'}
+        文本中没有英文单词时返回None
+    """
+    words, sentence_lengths = tokenize(text)
+    if not words:
+        return None
+
+    syllables = count_syllables(words)
+    words_per_sentence = len(words) / len(sentence_lengths)
+    syllables_per_word = float(syllables.mean())
+
+    return {
+        'word_count': len(words),
+        'sentence_count': int(len(sentence_lengths)),
+        'sentence_length': {
+            'mean': round(words_per_sentence, 2),
+            'median': float(np.median(sentence_lengths)),
+            'p90': round(float(np.percentile(sentence_lengths, 90)), 2),
+            'std': round(float(sentence_lengths.std()), 2),
+        },
+        'syllables_per_word': round(syllables_per_word, 3),
+        'flesch_reading_ease': round(
+            206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2
+        ),
+        'flesch_kincaid_grade': round(
+            0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 2
+        ),
+        'rare_word_ratio': round(float(rare_word_mask(words).mean()), 4),
+    }
+
+
+def difficulty_from_statistics(stats):
+    """根据可读性指标给出难度等级 beginner / intermediate / advanced"""
+    if stats is None:
+        return DEFAULT_DIFFICULTY
+    score = stats['flesch_kincaid_grade'] + stats['rare_word_ratio'] * RARE_WORD_WEIGHT
+    if score < BEGINNER_MAX_SCORE:
+        return 'beginner'
+    if score < INTERMEDIATE_MAX_SCORE:
+        return 'intermediate'
+    return 'advanced'
+
+
+def score_text(text):
+    """
+    返回 (难度等级, Flesch-Kincaid 年级)
+
+    没有英文单词时年级为None。
+    """
+    stats = text_statistics(text)
+    if stats is None:
+        return DEFAULT_DIFFICULTY, None
+    return difficulty_from_statistics(stats), stats['flesch_kincaid_grade']
+
+
+def score_rows(rows):
+    """
+    计算一批文章的难度（供进程池调用，不依赖 Django）
+
+    参数:
+        rows: [(id, 正文, 原难度), ...]
+
+    返回:
+        [(id, 原难度, 新难度, 可读性年级), ...]
+    """
+    return [(pk, old_difficulty, *score_text(content)) for pk, content, old_difficulty in rows]
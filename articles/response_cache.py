@@ -0,0 +1,129 @@
+"""
+文章列表和分页内容的响应缓存
+
+对所有读者都相同的响应数据（推荐列表、按分类/难度筛选的列表、content_paginated 的分页内容）
+存入 Django 缓存的 'responses' 别名（未配置时使用 default）：
+- 列表按 (文章表版本号, 查询参数) 缓存，分页内容按 (单篇文章版本号, 查询参数) 缓存；
+  文章保存、删除后版本号更新（cache_versions），旧条目不会再被读到，过期或淘汰后自然清除
+- 缓存的是序列化后的数据而不是渲染结果，用户相关字段（阅读记录、收藏状态）由视图在取出后叠加
+- 按用户筛选的列表（收藏、在读）和用户语法文章列表因人而异，不缓存
+
+命中、未命中、写入和淘汰数保存在进程内，可通过 GET /api/response-cache/ 查看。
+"""
+import hashlib
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache_backends import get_evictions
+from .cache_versions import get_version
+
+
+CACHE_ALIAS = 'responses'
+
+# 只影响用户相关字段、不影响共享数据的查询参数（不计入缓存键）
+USER_PARAMS = ('username',)
+
+# 按用户筛选的列表参数，出现时不使用缓存
+USER_FILTER_PARAMS = ('is_favorite', 'is_read')
+
+# 分页链接中随页变化的参数
+PAGINATION_PARAMS = ('page', 'cursor')
+
+_stats = {'hits': 0, 'misses': 0, 'stores': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _params_hash(request):
+    params = sorted(
+        (name, values) for name, values in request.query_params.lists() if name not in USER_PARAMS
+    )
+    return hashlib.sha256(repr(params).encode('utf-8')).hexdigest()
+
+
+def is_shared_list(request):
+    """列表请求的结果是否对所有用户相同"""
+    return not any(request.query_params.get(name) == 'true' for name in USER_FILTER_PARAMS)
+
+
+def list_key(model, request):
+    table = model._meta.db_table
+    return f'list:{table}:{get_version(model)}:{_params_hash(request)}'
+
+
+def page_key(model, pk, request):
+    """分页内容的缓存键；主键无效时返回None（不缓存）"""
+    try:
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    table = model._meta.db_table
+    return f'page:{table}:{pk}:{get_version(model, pk)}:{_params_hash(request)}'
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def relink(url, request):
+    """把缓存数据中的分页链接换成当前请求的地址，只保留链接中的 page / cursor 参数"""
+    if not url:
+        return url
+    cached_params = parse_qs(urlsplit(url).query)
+    current = request.build_absolute_uri()
+    for param in PAGINATION_PARAMS:
+        if param in cached_params:
+            current = replace_query_param(current, param, cached_params[param][0])
+        else:
+            current = remove_query_param(current, param)
+    return current
+
+
+def get_or_build(key, request, build):
+    """
+    取缓存的响应数据，未命中时调用 build() 生成并写入缓存
+
+    key 为None时不使用缓存。返回的数据是缓存的副本，调用方可以直接修改。
+    """
+    if key is None:
+        return build()
+    data = get_cache().get(key)
+    if data is None:
+        _count('misses')
+        data = build()
+        get_cache().set(key, data)
+        _count('stores')
+        return data
+
+    _count('hits')
+    if isinstance(data, dict):
+        for link in ('next', 'previous'):
+            if data.get(link):
+                data[link] = relink(data[link], request)
+    return data
+
+
+def stats():
+    with _stats_lock:
+        result = dict(_stats)
+    result['evictions'] = get_evictions(get_cache())
+    lookups = result['hits'] + result['misses']
+    result['hit_rate'] = round(result['hits'] / lookups, 4) if lookups else None
+    return result
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
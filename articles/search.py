@@ -0,0 +1,173 @@
+"""
+文章全文检索（SQLite FTS5）
+
+每张文章表对应一张外部内容（external content）FTS5虚拟表，只保存倒排索引，
+正文仍从原表读取。索引由模型的 save()/delete() 同步维护；
+批量写入（bulk_create、queryset.update 等）后需要运行
+`python manage.py rebuild_search_index` 重建索引。
+"""
+import html
+import re
+
+from django.db import connection
+
+
+# 文章表 -> FTS5索引表
+FTS_TABLES = {
+    'articles': 'articles_fts',
+    'grammar_articles': 'grammar_articles_fts',
+    'user_grammar_articles': 'user_grammar_articles_fts',
+}
+
+# BM25权重：标题 > 分类 > 正文
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+
+# 摘要包含的最大词数
+SNIPPET_TOKENS = 24
+
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+
+# highlight()/snippet() 先用控制字符标记匹配位置，转义正文中的HTML后再换成 <mark> 标签
+_MATCH_OPEN = '\x02'
+_MATCH_CLOSE = '\x03'
+
+_TERM_RE = re.compile(r'[A-Za-z0-9]+')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def fts_enabled():
+    """只有SQLite数据库支持FTS5索引"""
+    return connection.vendor == 'sqlite'
+
+
+def _tables(model):
+    table = model._meta.db_table
+    return table, FTS_TABLES[table]
+
+
+def build_match_query(text):
+    """
+    把用户输入转换为FTS5 MATCH表达式
+
+    所有词都必须出现（AND），最后一个词按前缀匹配，方便边输入边搜索。
+    包含中文等非ASCII字符时返回None（unicode61分词器不切分中文），由调用方降级为模糊查询。
+    """
+    if not text or _NON_ASCII_RE.search(text):
+        return None
+    terms = _TERM_RE.findall(text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def remove_from_index(instance):
+    """从索引中删除文章（必须在数据库行被修改或删除之前调用）"""
+    if not fts_enabled() or instance.pk is None:
+        return
+    table, fts = _tables(type(instance))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {fts}({fts}, rowid, title, category, content) "
+            f"SELECT 'delete', id, title, category, content FROM {table} WHERE id = %s",
+            [instance.pk]
+        )
+
+
+def add_to_index(instance):
+    """把文章的当前数据库内容加入索引"""
+    if not fts_enabled() or instance.pk is None:
+        return
+    table, fts = _tables(type(instance))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {fts}(rowid, title, category, content) "
+            f"SELECT id, title, category, content FROM {table} WHERE id = %s",
+            [instance.pk]
+        )
+
+
+def add_many_to_index(model, ids, batch_size=500):
+    """把一批文章加入索引（bulk_create 不会调用 save()，需要在写入后调用）"""
+    if not fts_enabled() or not ids:
+        return
+    table, fts = _tables(model)
+    ids = list(ids)
+    with connection.cursor() as cursor:
+        for i in range(0, len(ids), batch_size):
+            chunk = ids[i:i + batch_size]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {fts}(rowid, title, category, content) "
+                f"SELECT id, title, category, content FROM {table} WHERE id IN ({placeholders})",
+                chunk
+            )
+
+
+def rebuild_index(model):
+    """根据原表全部数据重建索引"""
+    if not fts_enabled():
+        return
+    _, fts = _tables(model)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {fts}({fts}) VALUES('rebuild')")
+
+
+def apply_ranked_search(queryset, text):
+    """
+    用全文索引筛选查询集并按相关度排序
+
+    FTS表按 rowid 与文章表连接，查询集自身的条件（分类、难度、收藏等）和 MATCH 在同一条语句中执行，
+    结果是完整的排序结果集，由分页器按页读取。
+    无法使用全文索引时返回None，由调用方降级为 icontains 查询。
+    """
+    match = build_match_query(text)
+    if not fts_enabled() or match is None:
+        return None
+    table, fts = _tables(queryset.model)
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    return queryset.extra(
+        select={'search_rank': f'bm25({fts}, {weights})'},
+        tables=[fts],
+        where=[f'{fts}.rowid = {table}.id', f'{fts} MATCH %s'],
+        params=[match],
+    ).order_by('search_rank', 'id')
+
+
+def _to_html(marked):
+    """转义文本中的HTML，再把匹配标记换成 <mark> 标签"""
+    if marked is None:
+        return None
+    escaped = html.escape(marked)
+    return escaped.replace(_MATCH_OPEN, HIGHLIGHT_OPEN).replace(_MATCH_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def get_snippets(model, text, ids):
+    """
+    为一页结果生成高亮标题和正文摘要
+
+    标题和正文（包括用户编写的文章）中的HTML已转义，只有 <mark> 标签是标记，可以直接作为HTML显示。
+
+    返回:
+        {article_id: {'title': 高亮标题, 'snippet': 正文摘要}}
+    """
+    match = build_match_query(text)
+    if not fts_enabled() or match is None or not ids:
+        return {}
+    _, fts = _tables(model)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, "
+            f"highlight({fts}, 0, %s, %s), "
+            f"snippet({fts}, 2, %s, %s, '...', %s) "
+            f"FROM {fts} WHERE {fts} MATCH %s AND rowid IN ({placeholders})",
+            [_MATCH_OPEN, _MATCH_CLOSE, _MATCH_OPEN, _MATCH_CLOSE,
+             SNIPPET_TOKENS, match, *ids]
+        )
+        return {
+            row[0]: {'title': _to_html(row[1]), 'snippet': _to_html(row[2])}
+            for row in cursor.fetchall()
+        }
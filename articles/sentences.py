@@ -0,0 +1,130 @@
+"""
+句子切分与句子偏移量存储
+
+句子以 (start, end) 字符偏移量的形式打包为 uint32 数组存储（与段落偏移量格式相同），
+偏移量相对整篇正文，句子不会跨越段落。某个段落的句子即起始位置落在该段落范围内的句子，
+用二分查找即可定位，因此句子在文章中的下标可以作为稳定的句子ID。
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+
+# 句末标点（可连续出现），以及紧随其后的右引号/右括号
+TERMINATOR_RE = re.compile(r'[.!?]+[\'"’”)\]]*(?=\s|$)')
+
+# 句号结尾但通常不表示句子结束的缩写（小写，不含末尾句号）
+ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'etc', 'no', 'vol',
+    'fig', 'inc', 'ltd', 'co', 'corp', 'dept', 'approx', 'gen', 'gov', 'sen', 'rep',
+    'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec',
+    'e.g', 'i.e', 'cf', 'al', 'u.s', 'u.k', 'a.m', 'p.m',
+})
+
+_LEADING_PUNCTUATION = '\'"‘“(['
+
+
+def _is_abbreviation(text, period_index):
+    """判断 period_index 处的句号是否属于缩写或姓名首字母"""
+    word_start = period_index
+    while word_start > 0 and not text[word_start - 1].isspace():
+        word_start -= 1
+    word = text[word_start:period_index].lstrip(_LEADING_PUNCTUATION).lower()
+    if not word:
+        return False
+    # 单个字母的首字母缩写：J. K. Rowling
+    if len(word) == 1 and word.isalpha():
+        return True
+    return word in ABBREVIATIONS
+
+
+def split_sentences(text):
+    """
+    切分一段文本中的句子
+
+    - 句末标点后必须是空白或文本结尾，因此小数（3.14）和网址不会被切开
+    - 缩写（Mr.、e.g.）和姓名首字母后不切分
+    - 右引号和右括号归入前一个句子
+    - 句末标点后紧跟小写字母时不切分（"Hello?" she said.）
+
+    返回:
+        [(start, end), ...]，已去除句子首尾空白
+    """
+    spans = []
+    start = 0
+    for match in TERMINATOR_RE.finditer(text):
+        end = match.end()
+        punctuation = match.group().rstrip('\'"’”)]')
+        if punctuation == '.' and _is_abbreviation(text, match.start()):
+            continue
+        next_text = text[end:].lstrip()
+        if next_text and next_text[0].islower():
+            continue
+        spans.append((start, end))
+        start = end
+    spans.append((start, len(text)))
+
+    result = []
+    for span_start, span_end in spans:
+        chunk = text[span_start:span_end]
+        stripped_end = len(chunk.rstrip())
+        if stripped_end:
+            leading = len(chunk) - len(chunk.lstrip())
+            result.append((span_start + leading, span_start + stripped_end))
+    return result
+
+
+def compute_sentence_offsets(content, paragraph_offsets):
+    """
+    按段落计算整篇文章的句子偏移量
+
+    参数:
+        paragraph_offsets: 段落偏移量数组（start0, end0, start1, end1, ...）
+
+    返回:
+        array('I', [start0, end0, start1, end1, ...])，偏移量相对整篇正文
+    """
+    offsets = array('I')
+    for i in range(0, len(paragraph_offsets), 2):
+        paragraph_start, paragraph_end = paragraph_offsets[i], paragraph_offsets[i + 1]
+        for start, end in split_sentences(content[paragraph_start:paragraph_end]):
+            offsets.append(paragraph_start + start)
+            offsets.append(paragraph_start + end)
+    return offsets
+
+
+def pack_sentence_offsets(offsets):
+    return offsets.tobytes()
+
+
+def unpack_sentence_offsets(data):
+    """把存储的字节串还原为偏移量数组"""
+    offsets = array('I')
+    if data:
+        offsets.frombytes(bytes(data))
+    return offsets
+
+
+def page_sentences(sentence_offsets, paragraph_offsets, start, end):
+    """
+    第 start 到 end-1 个段落中的句子
+
+    返回:
+        (第一个句子在文章中的下标, [[(句子起点, 句子终点), ...], ...])
+        每个段落一个列表，偏移量相对该段落文本
+    """
+    starts = sentence_offsets[0::2]
+    first = index = bisect_left(starts, paragraph_offsets[2 * start]) if start < end else 0
+    paragraphs = []
+    for paragraph in range(start, end):
+        paragraph_start = paragraph_offsets[2 * paragraph]
+        paragraph_end = paragraph_offsets[2 * paragraph + 1]
+        spans = []
+        while index < len(starts) and starts[index] < paragraph_end:
+            spans.append((
+                sentence_offsets[2 * index] - paragraph_start,
+                sentence_offsets[2 * index + 1] - paragraph_start,
+            ))
+            index += 1
+        paragraphs.append(spans)
+    return first, paragraphs
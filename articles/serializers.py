@@ -7,75 +7,48 @@ class ArticleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Article
         fields = [
-            'id', 'title', 'content', 'source', 'difficulty',
+            'id', 'title', 'content', 'source', 'difficulty', 'reading_level',
             'category', 'word_count', 'paragraph_count', 'created_at', 'updated_at', 'author'
         ]
-        read_only_fields = ['word_count', 'paragraph_count', 'created_at', 'updated_at']
+        read_only_fields = ['reading_level', 'word_count', 'paragraph_count', 'created_at', 'updated_at']
+
+
+def format_reading_info(history):
+    """阅读历史记录 {'read_at', 'read_duration'} 转为列表中 reading_info 字段的格式"""
+    return {
+        'read_at': history['read_at'].isoformat() if history['read_at'] else None,
+        'read_duration': history['read_duration'],
+    }
+
+
+def apply_user_article_states(items, reading_history_map, favorited_article_ids):
+    """在已序列化的文章列表数据上填入用户的阅读历史和收藏状态（列表中这两个字段的唯一来源）"""
+    for item in items:
+        history = reading_history_map.get(item['id'])
+        item['reading_info'] = format_reading_info(history) if history else None
+        item['is_favorited'] = item['id'] in favorited_article_ids
 
 
 class ArticleListSerializer(serializers.ModelSerializer):
-    """文章列表序列化器（简化版）"""
-    content_preview = serializers.SerializerMethodField()
-    reading_info = serializers.SerializerMethodField()
-    is_favorited = serializers.SerializerMethodField()
+    """
+    文章列表序列化器（简化版）
+
+    只包含对所有用户相同的字段，结果可以进入响应缓存；
+    用户相关字段 reading_info、is_favorited 由视图在取出后用 apply_user_article_states 填入。
+    """
+    search_highlight = serializers.SerializerMethodField()
 
     class Meta:
         model = Article
         fields = [
             'id', 'title', 'content_preview', 'source', 
-            'difficulty', 'category', 'word_count', 'paragraph_count', 'created_at',
-            'reading_info', 'is_favorited'
+            'difficulty', 'reading_level', 'category', 'word_count', 'paragraph_count', 'created_at',
+            'search_highlight'
         ]
 
-    def get_content_preview(self, obj):
-        """返回内容预览（前200个字符）"""
-        if obj.content:
-            return obj.content[:200] + '...' if len(obj.content) > 200 else obj.content
-        return ''
-    
-    def get_reading_info(self, obj):
-        """返回阅读历史信息（如果有）"""
-        # 从context中获取用户名
-        username = self.context.get('username', None)
-        if not username:
-            return None
-        
-        try:
-            from .models import ReadingHistory
-            history = ReadingHistory.objects.filter(
-                article=obj,
-                username=username
-            ).first()
-            
-            if history:
-                # 从localStorage获取的当前阅读页码会在前端处理
-                # 这里只返回后端记录的信息
-                return {
-                    'read_at': history.read_at.isoformat() if history.read_at else None,
-                    'read_duration': history.read_duration,
-                }
-        except Exception as e:
-            print(f"获取阅读信息失败: {e}")
-        
-        return None
-    
-    def get_is_favorited(self, obj):
-        """返回是否已收藏"""
-        # 从context中获取用户名
-        username = self.context.get('username', None)
-        if not username:
-            return False
-        
-        try:
-            from .models import Favorite
-            return Favorite.objects.filter(
-                article=obj,
-                username=username
-            ).exists()
-        except Exception as e:
-            print(f"检查收藏状态失败: {e}")
-        
-        return False
+    def get_search_highlight(self, obj):
+        """返回搜索结果的高亮标题和摘要（仅搜索时有值）"""
+        return self.context.get('search_snippets', {}).get(obj.id)
 
 
 class ReadingHistorySerializer(serializers.ModelSerializer):
@@ -101,28 +74,27 @@ class GrammarArticleSerializer(serializers.ModelSerializer):
     class Meta:
         model = GrammarArticle
         fields = [
-            'id', 'title', 'content', 'source', 'difficulty',
+            'id', 'title', 'content', 'source', 'difficulty', 'reading_level',
             'category', 'word_count', 'paragraph_count', 'created_at', 'updated_at', 'author'
         ]
-        read_only_fields = ['word_count', 'paragraph_count', 'created_at', 'updated_at']
+        read_only_fields = ['reading_level', 'word_count', 'paragraph_count', 'created_at', 'updated_at']
 
 
 class GrammarArticleListSerializer(serializers.ModelSerializer):
     """语法文章列表序列化器（简化版）"""
-    content_preview = serializers.SerializerMethodField()
+    search_highlight = serializers.SerializerMethodField()
 
     class Meta:
         model = GrammarArticle
         fields = [
             'id', 'title', 'content_preview', 'source', 
-            'difficulty', 'category', 'word_count', 'paragraph_count', 'created_at'
+            'difficulty', 'reading_level', 'category', 'word_count', 'paragraph_count', 'created_at',
+            'search_highlight'
         ]
 
-    def get_content_preview(self, obj):
-        """返回内容预览（前200个字符）"""
-        if obj.content:
-            return obj.content[:200] + '...' if len(obj.content) > 200 else obj.content
-        return ''
+    def get_search_highlight(self, obj):
+        """返回搜索结果的高亮标题和摘要（仅搜索时有值）"""
+        return self.context.get('search_snippets', {}).get(obj.id)
 
 
 class UserGrammarArticleSerializer(serializers.ModelSerializer):
@@ -138,18 +110,17 @@ class UserGrammarArticleSerializer(serializers.ModelSerializer):
 
 class UserGrammarArticleListSerializer(serializers.ModelSerializer):
     """用户语法文章列表序列化器（简化版）"""
-    content_preview = serializers.SerializerMethodField()
+    search_highlight = serializers.SerializerMethodField()
 
     class Meta:
         model = UserGrammarArticle
         fields = [
             'id', 'title', 'content_preview', 'source', 
-            'difficulty', 'category', 'word_count', 'paragraph_count', 'created_at', 'author'
+            'difficulty', 'category', 'word_count', 'paragraph_count', 'created_at', 'author',
+            'search_highlight'
         ]
 
-    def get_content_preview(self, obj):
-        """返回内容预览（前200个字符）"""
-        if obj.content:
-            return obj.content[:200] + '...' if len(obj.content) > 200 else obj.content
-        return ''
+    def get_search_highlight(self, obj):
+        """返回搜索结果的高亮标题和摘要（仅搜索时有值）"""
+        return self.context.get('search_snippets', {}).get(obj.id)
 
@@ -1,3 +1,1493 @@
-from django.test import TestCase
+import io
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from datetime import timedelta
+from unittest import mock, skipUnless
+from pathlib import Path
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import (
+    Article, ReadingHistory, Favorite, Annotation, GrammarArticle, UserGrammarArticle, PageBoundaryCache,
+    ArticleWordCount, TranslationMemory, DictionaryEntry, PREVIEW_LENGTH
+)
+from . import generation_cache, llm, response_cache
+from .dictionary import MAX_LOOKUP_WORDS
+from .page_boundaries import compute_smart_offsets, compute_fixed_offsets, pack_offsets
+from .paragraphs import compute_paragraph_offsets, unpack_paragraph_offsets
+from .translation import StubBackend, MAX_BATCH_SIZE, MAX_PARAGRAPH_LENGTH
+from .views import MAX_WINDOW_PAGES
+
+
+def create_articles(count, prefix='Article'):
+    """批量创建测试文章"""
+    return [
+        Article.objects.create(
+            title=f'{prefix} {i}',
+            content=f'Paragraph one of {prefix} {i}.\n\nParagraph two of {prefix} {i}.'
+        )
+        for i in range(count)
+    ]
+
+
+class ArticleListQueryCountTest(TestCase):
+    """文章列表的查询次数不随页面大小增长"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _mark_read_and_favorited(self, articles, username='alice'):
+        for article in articles:
+            ReadingHistory.objects.create(
+                article=article, user_ip='127.0.0.1', username=username, read_duration=30
+            )
+            Favorite.objects.create(article=article, username=username)
+
+    def test_constant_query_count(self):
+        # COUNT + 文章页 + 阅读历史 + 收藏 = 4次查询
+        self._mark_read_and_favorited(create_articles(2, 'Small'))
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/articles/', {'username': 'alice'})
+        self.assertEqual(len(response.data['results']), 2)
+
+        self._mark_read_and_favorited(create_articles(8, 'Large'))
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/articles/', {'username': 'alice'})
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_user_state_in_results(self):
+        read, favorited, untouched = create_articles(3)
+        ReadingHistory.objects.create(
+            article=read, user_ip='127.0.0.1', username='alice', read_duration=42
+        )
+        Favorite.objects.create(article=favorited, username='alice')
+        Favorite.objects.create(article=untouched, username='bob')
+
+        response = self.client.get('/api/articles/', {'username': 'alice'})
+        results = {item['id']: item for item in response.data['results']}
+
+        self.assertEqual(results[read.id]['reading_info']['read_duration'], 42)
+        self.assertFalse(results[read.id]['is_favorited'])
+        self.assertIsNone(results[favorited.id]['reading_info'])
+        self.assertTrue(results[favorited.id]['is_favorited'])
+        self.assertIsNone(results[untouched.id]['reading_info'])
+        self.assertFalse(results[untouched.id]['is_favorited'])
+
+    def test_anonymous_list_skips_user_queries(self):
+        create_articles(3)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/articles/')
+        for item in response.data['results']:
+            self.assertIsNone(item['reading_info'])
+            self.assertFalse(item['is_favorited'])
+
+
+class ContentPreviewTest(TestCase):
+    """列表接口使用存储的内容预览，不加载全文"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_save_fills_preview(self):
+        article = Article.objects.create(title='Long', content='word ' * 100)
+        self.assertEqual(len(article.content_preview), PREVIEW_LENGTH + 3)
+        self.assertTrue(article.content_preview.endswith('...'))
+
+        article.content = 'Short text.'
+        article.save()
+        self.assertEqual(article.content_preview, 'Short text.')
+
+    def test_list_defers_content(self):
+        Article.objects.create(title='Long', content='word ' * 100)
+        GrammarArticle.objects.create(title='Tense', content='Grammar ' * 50)
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/articles/')
+        self.assertTrue(response.data['results'][0]['content_preview'].startswith('word word'))
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/grammar-articles/')
+        self.assertTrue(response.data['results'][0]['content_preview'].startswith('Grammar'))
+
+
+class FullTextSearchTest(TestCase):
+    """全文索引搜索：BM25排序、高亮摘要和索引同步"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.body_match = Article.objects.create(
+            title='Morning routine',
+            content='Many people drink coffee before work.\n\nOthers prefer tea.'
+        )
+        self.title_match = Article.objects.create(
+            title='The history of coffee',
+            content='Coffee spread from Ethiopia to the rest of the world.'
+        )
+        Article.objects.create(title='Gardening', content='Plants need water and light.')
+
+    def _search(self, text, url='/api/articles/'):
+        return self.client.get(url, {'search': text}).data['results']
+
+    def test_ranked_results_with_snippets(self):
+        results = self._search('coffee')
+        self.assertEqual([r['id'] for r in results], [self.title_match.id, self.body_match.id])
+        self.assertIn('<mark>coffee</mark>', results[0]['search_highlight']['title'])
+        self.assertIn('<mark>coffee</mark>', results[1]['search_highlight']['snippet'])
+
+    def test_highlights_escape_html(self):
+        Article.objects.create(
+            title='<img src=x onerror=alert(1)> coffee',
+            content='<script>alert("coffee")</script> & more coffee.'
+        )
+        results = {r['title']: r['search_highlight'] for r in self._search('coffee')}
+        highlight = results['<img src=x onerror=alert(1)> coffee']
+        self.assertEqual(highlight['title'], '&lt;img src=x onerror=alert(1)&gt; <mark>coffee</mark>')
+        self.assertNotIn('<script>', highlight['snippet'])
+        self.assertIn('&lt;script&gt;', highlight['snippet'])
+        self.assertIn('&amp; more <mark>coffee</mark>', highlight['snippet'])
+
+    def test_filters_apply_inside_the_ranked_search(self):
+        from .search import add_many_to_index
+
+        # 大量排名更靠前的匹配不会把筛选条件下的匹配挤出结果
+        created = Article.objects.bulk_create(
+            Article(title=f'Coffee {i}', content='coffee coffee', category='饮食') for i in range(520)
+        )
+        add_many_to_index(Article, [article.pk for article in created])
+        Article.objects.filter(pk=self.body_match.pk).update(category='生活')
+        Favorite.objects.create(article=self.body_match, username='alice')
+
+        response = self.client.get('/api/articles/', {'search': 'coffee', 'category': '生活'})
+        self.assertEqual([r['id'] for r in response.data['results']], [self.body_match.id])
+        response = self.client.get('/api/articles/', {
+            'search': 'coffee', 'is_favorite': 'true', 'username': 'alice'
+        })
+        self.assertEqual([r['id'] for r in response.data['results']], [self.body_match.id])
+        # 总数不再截断
+        response = self.client.get('/api/articles/', {'search': 'coffee', 'category': '饮食'})
+        self.assertEqual(response.data['count'], 520)
+
+    def test_prefix_match_while_typing(self):
+        self.assertEqual(len(self._search('coff')), 2)
+
+    def test_index_follows_save_and_delete(self):
+        self.body_match.content = 'Many people drink juice before work.'
+        self.body_match.save()
+        self.assertEqual([r['id'] for r in self._search('coffee')], [self.title_match.id])
+        self.assertEqual([r['id'] for r in self._search('juice')], [self.body_match.id])
+
+        self.title_match.delete()
+        self.assertEqual(self._search('coffee'), [])
+
+    def test_non_ascii_query_falls_back_to_icontains(self):
+        GrammarArticle.objects.create(title='Tenses', content='Present tense.', category='时态')
+        results = self._search('时态', url='/api/grammar-articles/')
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(results[0]['search_highlight'])
+
+
+class PageBoundaryCacheTest(TestCase):
+    """content_paginated 的页边界缓存"""
+
+    params = {
+        'target_chars': 20, 'min_chars': 10, 'max_chars': 40,
+        'min_paragraphs': 1, 'max_paragraphs': 3,
+    }
+
+    def setUp(self):
+        self.client = APIClient()
+        self.article = Article.objects.create(
+            title='Book',
+            content='\n\n'.join(f'Paragraph number {i:02d}.' for i in range(10))
+        )
+
+    def _get_page(self, page, url=None):
+        url = url or f'/api/articles/{self.article.id}/content_paginated/'
+        return self.client.get(url, {'page': page, **self.params}).data
+
+    def test_smart_offsets(self):
+        self.assertEqual(compute_smart_offsets([], **self.params), [0, 0])
+        self.assertEqual(compute_smart_offsets([25] * 3, **self.params), [0, 1, 2, 3])
+        self.assertEqual(compute_smart_offsets([5] * 7, **self.params), [0, 3, 6, 7])
+        self.assertEqual(compute_smart_offsets([5, 0, 5], **self.params), [0, 3])
+
+    def test_fixed_offsets(self):
+        self.assertEqual(compute_fixed_offsets(0, 8), [0, 0])
+        self.assertEqual(compute_fixed_offsets(10, 4), [0, 4, 8, 10])
+
+    def test_pages_slice_from_cached_boundaries(self):
+        first = self._get_page(1)
+        self.assertEqual(first['total_pages'], 10)
+        self.assertEqual(first['paragraphs'], ['Paragraph number 00.'])
+        self.assertEqual(PageBoundaryCache.objects.count(), 1)
+
+        # 后续请求直接使用缓存的边界，不再重新分页
+        cache = PageBoundaryCache.objects.get()
+        cache.offsets = pack_offsets([0, 5, 10])
+        cache.save()
+        second = self._get_page(2)
+        self.assertEqual(second['total_pages'], 2)
+        self.assertEqual(len(second['paragraphs']), 5)
+        self.assertEqual(PageBoundaryCache.objects.count(), 1)
+
+    def test_save_invalidates_cache(self):
+        self._get_page(1)
+        self.article.content = 'Only one paragraph now.'
+        self.article.save()
+        self.assertFalse(PageBoundaryCache.objects.exists())
+
+        data = self._get_page(1)
+        self.assertEqual(data['total_pages'], 1)
+        self.assertEqual(data['paragraphs'], ['Only one paragraph now.'])
+
+    def test_metadata_save_keeps_derived_data(self):
+        self._get_page(1)
+        self.client.get(f'/api/articles/{self.article.id}/vocabulary/')
+        versions = list(PageBoundaryCache.objects.order_by('id').values_list('content_version', flat=True))
+        self.assertTrue(ArticleWordCount.objects.filter(article=self.article).exists())
+
+        # 只修改标题和分类：页边界缓存、词频表都保留，也不会重新计算页边界
+        self.article.title = 'Renamed book'
+        self.article.category = '文学'
+        self.article.save()
+        self.assertTrue(ArticleWordCount.objects.filter(article=self.article).exists())
+        self.assertTrue(Article.objects.get(pk=self.article.pk).vocabulary_indexed)
+        self._get_page(1)
+        self.assertEqual(
+            list(PageBoundaryCache.objects.order_by('id').values_list('content_version', flat=True)), versions
+        )
+
+    def test_grammar_article_pages(self):
+        grammar = GrammarArticle.objects.create(title='Grammar', content=self.article.content)
+        url = f'/api/grammar-articles/{grammar.id}/content_paginated/'
+        data = self._get_page(3, url=url)
+        self.assertEqual(data['paragraphs'], ['Paragraph number 02.'])
+        self.assertEqual(
+            PageBoundaryCache.objects.filter(article_table='grammar_articles').count(), 1
+        )
+
+
+class SaveAnnotationsTest(TestCase):
+    """save_annotations 的差异写入与增量操作"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.article = create_articles(1)[0]
+        self.url = f'/api/articles/{self.article.id}/save_annotations/'
+
+    def _annotations(self):
+        return dict(
+            Annotation.objects.filter(article=self.article, user_ip='alice')
+            .values_list('word', 'color')
+        )
+
+    def _post(self, payload):
+        return self.client.post(self.url, {'username': 'alice', **payload}, format='json')
+
+    def test_full_list_writes_only_differences(self):
+        self._post({'annotations': [
+            {'word': 'apple', 'color': 'yellow'},
+            {'word': 'banana', 'color': 'green'},
+        ]})
+        unchanged = Annotation.objects.get(word='apple')
+
+        response = self._post({'annotations': [
+            {'word': 'apple', 'color': 'yellow'},
+            {'word': 'cherry', 'color': 'red'},
+        ]})
+        self.assertEqual(response.data['upserted'], 1)
+        self.assertEqual(response.data['removed'], 1)
+        self.assertEqual(self._annotations(), {'apple': 'yellow', 'cherry': 'red'})
+        self.assertEqual(Annotation.objects.get(word='apple').id, unchanged.id)
+
+    def test_ops_payload(self):
+        self._post({'annotations': [{'word': 'apple', 'color': 'yellow'}]})
+        response = self._post({'ops': [
+            {'op': 'add', 'word': 'banana', 'color': 'green'},
+            {'op': 'recolor', 'word': 'apple', 'color': 'blue'},
+            {'op': 'add', 'word': 'cherry', 'color': 'red'},
+            {'op': 'remove', 'word': 'cherry'},
+        ]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._annotations(), {'apple': 'blue', 'banana': 'green'})
+
+    def test_invalid_op_rejected(self):
+        response = self._post({'ops': [{'op': 'paint', 'word': 'apple'}]})
+        self.assertEqual(response.status_code, 400)
+        response = self._post({'ops': [{'op': 'add', 'word': 'apple'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._annotations(), {})
+
+    def test_malformed_payloads_rejected(self):
+        for payload in (
+            {'ops': 'abc'},
+            {'ops': ['add']},
+            {'ops': [{'op': 'remove'}]},
+            {'ops': [{'op': 'add', 'word': ['apple'], 'color': 'red'}]},
+            {'annotations': 'abc'},
+            {'annotations': [{'word': 'apple'}]},
+            {'annotations': [['apple', 'red']]},
+        ):
+            response = self._post(payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn('error', response.data)
+        self.assertEqual(self._annotations(), {})
+
+
+class ParagraphOffsetsTest(TestCase):
+    """段落以字符偏移量存储，翻页时只读取当前页的正文"""
+
+    content = '  First — café ☕ paragraph.  \n\n\n\nSecond 段落 here.\n\n   \n\nThird one.\n'
+
+    def test_offsets_match_split_paragraphs(self):
+        offsets = compute_paragraph_offsets(self.content)
+        paragraphs = [
+            self.content[offsets[i]:offsets[i + 1]] for i in range(0, len(offsets), 2)
+        ]
+        expected = [p.strip() for p in self.content.split('\n\n') if p.strip()]
+        self.assertEqual(paragraphs, expected)
+        self.assertEqual(compute_paragraph_offsets(''), compute_paragraph_offsets(None))
+
+    def test_save_stores_packed_offsets(self):
+        article = Article.objects.create(title='Offsets', content=self.content)
+        article.refresh_from_db()
+        self.assertEqual(article.paragraph_count, 3)
+        self.assertEqual(
+            unpack_paragraph_offsets(article.paragraph_offsets),
+            compute_paragraph_offsets(self.content)
+        )
+
+    def test_page_reads_slice_without_full_content(self):
+        article = Article.objects.create(title='Offsets', content=self.content)
+        url = f'/api/articles/{article.id}/content_paginated/'
+        data = APIClient().get(url, {'mode': 'fixed', 'page_size': 2, 'page': 1}).data
+        first_page = ['First — café ☕ paragraph.', 'Second 段落 here.']
+        self.assertEqual(data['paragraphs'], first_page)
+        self.assertEqual(data['total_paragraphs'], 3)
+        self.assertEqual(data['page_info']['char_count'], sum(len(p) for p in first_page))
+
+        data = APIClient().get(url, {'mode': 'fixed', 'page_size': 2, 'page': 2}).data
+        self.assertEqual(data['paragraphs'], ['Third one.'])
+
+
+class ParallelImportTest(TestCase):
+    """import_articles.py 的多进程批量导入"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for i in range(5):
+            Path(self.tmpdir.name, f'article_{i}.txt').write_text(
+                f'Story {i}\n\nThe novel tells a long story.\n\n\n\nIt ends well.',
+                encoding='utf-8'
+            )
+
+    def test_import_directory_with_workers(self):
+        from import_articles import ArticleImporter
+
+        importer = ArticleImporter(verbose=False)
+        with redirect_stdout(io.StringIO()):
+            importer.import_directory(self.tmpdir.name, workers=2, batch_size=2)
+        self.assertEqual(importer.imported_count, 5)
+
+        article = Article.objects.get(title='Story 3')
+        self.assertEqual(article.paragraph_count, 3)
+        self.assertEqual(article.category, '文学')
+        self.assertTrue(article.content_preview.startswith('Story 3'))
+        # bulk_create 写入的文章也能被全文检索到
+        response = APIClient().get('/api/articles/', {'search': 'novel'})
+        self.assertEqual(response.data['count'], 5)
+
+        # 再次导入未变化的目录只比较内容哈希
+        importer = ArticleImporter(verbose=False)
+        with redirect_stdout(io.StringIO()):
+            importer.import_directory(self.tmpdir.name, workers=2)
+        self.assertEqual(importer.unchanged_count, 5)
+        self.assertEqual(importer.imported_count, 0)
+        self.assertEqual(Article.objects.count(), 5)
+
+    def _import_file(self, path, on_duplicate):
+        from import_articles import ArticleImporter
+
+        importer = ArticleImporter(verbose=False, on_duplicate=on_duplicate)
+        with redirect_stdout(io.StringIO()):
+            importer.import_article(str(path))
+        return importer
+
+    def test_on_duplicate_policies(self):
+        path = Path(self.tmpdir.name, 'article_0.txt')
+        self._import_file(path, 'skip')
+        original = Article.objects.get(title='Story 0')
+        Annotation.objects.create(article=original, user_ip='alice', word='novel', color='red')
+
+        self.assertEqual(self._import_file(path, 'update').unchanged_count, 1)
+
+        path.write_text('Story 0\n\nA rewritten ending.', encoding='utf-8')
+        self.assertEqual(self._import_file(path, 'skip').skipped_count, 1)
+
+        self.assertEqual(self._import_file(path, 'update').updated_count, 1)
+        updated = Article.objects.get(title='Story 0')
+        self.assertEqual(updated.id, original.id)
+        self.assertIn('rewritten', updated.content)
+        self.assertTrue(Annotation.objects.filter(article=updated).exists())
+
+        path.write_text('Story 0\n\nYet another version.', encoding='utf-8')
+        self.assertEqual(self._import_file(path, 'new').imported_count, 1)
+        self.assertEqual(Article.objects.filter(title='Story 0').count(), 2)
+
+    def test_update_dedupes_titles_within_batch(self):
+        from import_articles import ArticleImporter
+
+        for name in ('shared_a.txt', 'shared_b.txt'):
+            Path(self.tmpdir.name, name).write_text(f'Shared\n\nWritten in {name}.', encoding='utf-8')
+        importer = ArticleImporter(verbose=False, on_duplicate='update')
+        with redirect_stdout(io.StringIO()):
+            importer.import_directory(self.tmpdir.name, workers=2)
+        self.assertEqual(
+            (importer.imported_count, importer.updated_count, importer.skipped_count), (6, 0, 1)
+        )
+        self.assertEqual(Article.objects.filter(title='Shared').count(), 1)
+
+        # 已有文章在同一批次中出现两次：只更新一次
+        for name in ('shared_a.txt', 'shared_b.txt'):
+            Path(self.tmpdir.name, name).write_text(f'Shared\n\nRewritten in {name}.', encoding='utf-8')
+        importer = ArticleImporter(verbose=False, on_duplicate='update')
+        with redirect_stdout(io.StringIO()):
+            importer.import_directory(self.tmpdir.name, workers=2)
+        self.assertEqual(
+            (importer.imported_count, importer.updated_count, importer.skipped_count), (0, 1, 1)
+        )
+        self.assertEqual(importer.unchanged_count, 5)
+        self.assertIn('Rewritten', Article.objects.get(title='Shared').content)
+
+
+class EncodingDetectionTest(TestCase):
+    """导入时的单次编码检测"""
+
+    def test_detects_encoding_and_reports_confidence(self):
+        from import_articles import ArticleImporter
+
+        samples = {
+            'gbk': ('中文文章。\n\n第二段内容。', 'gbk'),
+            'bom': ('带BOM的文章', 'utf-8-sig'),
+            'utf16': ('Hello 世界', 'utf-16'),
+        }
+        importer = ArticleImporter(verbose=False)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, (text, encoding) in samples.items():
+                path = Path(tmpdir, f'{name}.txt')
+                path.write_bytes(text.encode(encoding))
+                self.assertEqual(importer.read_file(path), text)
+
+        self.assertEqual(importer.encoding_stats['gbk'][0], 1)
+        self.assertGreater(importer.encoding_stats['gbk'][1], 0.9)
+        self.assertEqual(importer.encoding_stats['utf-8-sig'], [1, 1.0])
+        self.assertEqual(importer.encoding_stats['utf-16'], [1, 1.0])
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            importer.print_summary()
+        self.assertIn('编码 gbk: 1 个文件', output.getvalue())
+
+
+class KeywordClassifierTest(TestCase):
+    """Aho–Corasick 关键词分类"""
+
+    def test_scores_whole_words_for_every_category(self):
+        from .classifier import KeywordClassifier
+
+        classifier = KeywordClassifier({
+            '技术': ['AI', 'machine learning', '人工智能'],
+            '教育': ['learning', 'study'],
+            '文学': ['story'],
+        })
+        scores = classifier.scores('He said the AI story is about machine learning and 人工智能.')
+        self.assertEqual(scores, {'技术': 3, '教育': 1, '文学': 1})
+        # 只匹配完整单词
+        self.assertEqual(classifier.classify('She said it rained.'), '其他')
+        self.assertEqual(classifier.classify('A study of study habits and one story'), '教育')
+
+    def test_keywords_loaded_from_file(self):
+        from import_articles import ArticleImporter
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, 'keywords.json')
+            path.write_text('{"天文": ["telescope", "galaxy"]}', encoding='utf-8')
+            importer = ArticleImporter(verbose=False, keywords_file=str(path))
+        self.assertEqual(importer.detect_category('A telescope pointed at the galaxy.', 'Night'), '天文')
+        self.assertEqual(ArticleImporter(verbose=False).detect_category('Said nothing.', 'Plain'), '其他')
+
+
+class ReadabilityTest(TestCase):
+    """可读性统计与难度重新评估"""
+
+    EASY = 'The cat sat on the mat. It was a good day. We ran home and ate.'
+    HARD = (
+        'Notwithstanding epistemological ramifications, contemporary phenomenological '
+        'investigations systematically interrogate ontological presuppositions underlying '
+        'hermeneutic methodologies.'
+    )
+
+    def test_text_statistics(self):
+        from .readability import count_syllables, text_statistics
+
+        self.assertEqual(count_syllables(['make', 'table', 'beautiful', 'a']).tolist(), [1, 2, 3, 1])
+        stats = text_statistics(self.EASY)
+        self.assertEqual(stats['word_count'], 16)
+        self.assertEqual(stats['sentence_count'], 3)
+        self.assertEqual(stats['sentence_length']['median'], 5.0)
+        self.assertEqual(stats['rare_word_ratio'], 0.0)
+        self.assertGreater(text_statistics(self.HARD)['rare_word_ratio'], 0.5)
+        self.assertIsNone(text_statistics('只有中文。'))
+
+    def test_rescore_command(self):
+        from django.core.management import call_command
+
+        easy = Article.objects.create(title='Easy', content=self.EASY, difficulty='advanced')
+        hard = GrammarArticle.objects.create(title='Hard', content=self.HARD)
+        call_command('rescore_difficulty', chunk_size=1, workers=1, stdout=io.StringIO())
+
+        easy.refresh_from_db()
+        hard.refresh_from_db()
+        self.assertEqual(easy.difficulty, 'beginner')
+        self.assertLess(easy.reading_level, 2)
+        self.assertEqual(hard.difficulty, 'advanced')
+        response = APIClient().get('/api/articles/', {'difficulty': 'beginner'})
+        self.assertEqual([item['id'] for item in response.data['results']], [easy.id])
+
+    def test_rescore_invalidates_cached_reading_level(self):
+        from django.core.management import call_command
+        from .cache_versions import get_version
+
+        article = Article.objects.create(title='Easy', content=self.EASY, difficulty='beginner')
+        Article.objects.filter(pk=article.pk).update(reading_level=None)
+        version = get_version(Article)
+        updated_at = Article.objects.get(pk=article.pk).updated_at
+        # 难度不变，只有可读性年级变化
+        call_command('rescore_difficulty', model='article', workers=1, stdout=io.StringIO())
+        article.refresh_from_db()
+        self.assertEqual(article.difficulty, 'beginner')
+        self.assertIsNotNone(article.reading_level)
+        self.assertNotEqual(get_version(Article), version)
+        # Last-Modified 随之变化，If-Modified-Since 不会返回过期的304
+        self.assertGreater(article.updated_at, updated_at)
+
+        # 没有变化时不写回，版本号不变
+        version = get_version(Article)
+        call_command('rescore_difficulty', model='article', workers=1, stdout=io.StringIO())
+        self.assertEqual(get_version(Article), version)
+
+
+class VocabularyTest(TestCase):
+    """文章词频表"""
+
+    def setUp(self):
+        # 每段约3000字符，默认智能分页下每页2段
+        self.paragraphs = [
+            ('apple banana ' * 230).strip(),
+            ('banana cherry ' * 230).strip(),
+            ('cherry date ' * 250).strip(),
+            'A date and an Apple.',
+        ]
+        self.article = Article.objects.create(title='Fruit', content='\n\n'.join(self.paragraphs))
+        self.client = APIClient()
+
+    def test_vocabulary_sorted_and_paged(self):
+        url = f'/api/articles/{self.article.id}/vocabulary/'
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(response.data['results'], [
+            {'word': 'cherry', 'count': 480},
+            {'word': 'banana', 'count': 460},
+        ])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(url, {'sort': 'alpha'})
+        self.assertEqual([row['word'] for row in response.data['results']],
+                         ['an', 'and', 'apple', 'banana', 'cherry', 'date'])
+
+        self.assertEqual(self.client.get(url, {'sort': 'random'}).status_code, 400)
+
+    def test_page_counts_follow_smart_pages(self):
+        url = f'/api/articles/{self.article.id}/vocabulary/'
+        pages = self.client.get(f'/api/articles/{self.article.id}/content_paginated/')
+        self.assertEqual(pages.data['total_pages'], 2)
+
+        first = self.client.get(url, {'content_page': 1}).data['results']
+        self.assertEqual(first, [
+            {'word': 'banana', 'count': 460},
+            {'word': 'apple', 'count': 230},
+            {'word': 'cherry', 'count': 230},
+        ])
+        last = self.client.get(url, {'content_page': 2}).data['results']
+        self.assertEqual(last[:2], [{'word': 'date', 'count': 251}, {'word': 'cherry', 'count': 250}])
+
+        # 保存后词频表作废，下次请求时重新生成
+        self.article.content = 'Only new words here.'
+        self.article.save()
+        self.assertFalse(ArticleWordCount.objects.filter(article=self.article).exists())
+        words = [row['word'] for row in self.client.get(url).data['results']]
+        self.assertEqual(words, ['here', 'new', 'only', 'words'])
+
+    def test_empty_vocabulary_built_once(self):
+        from . import vocabulary
+
+        article = Article.objects.create(title='Numbers', content='1, 2, 3.')
+        url = f'/api/articles/{article.id}/vocabulary/'
+        with mock.patch.object(vocabulary, 'build_vocabulary', wraps=vocabulary.build_vocabulary) as build:
+            for _ in range(2):
+                self.assertEqual(self.client.get(url).data['count'], 0)
+            self.assertEqual(build.call_count, 1)
+
+            article.content = 'Now with words.'
+            article.save()
+            self.assertEqual(self.client.get(url).data['count'], 3)
+            self.assertEqual(build.call_count, 2)
+
+
+class ConcordanceTest(TestCase):
+    """单词位置索引与KWIC检索"""
+
+    def setUp(self):
+        self.hard = Article.objects.create(
+            title='Hard', difficulty='advanced',
+            content='Quantum apples, notwithstanding. The apple fell.'
+        )
+        self.easy = Article.objects.create(
+            title='Easy', difficulty='beginner',
+            content='I eat an apple.\n\nThe apple is red. Apple pie!'
+        )
+        Article.objects.create(title='Other', content='Pineapple and applesauce.')
+        self.client = APIClient()
+
+    def test_index_follows_save(self):
+        from .models import WordPosting
+
+        posting = WordPosting.objects.get(word='apple', article=self.easy)
+        self.assertEqual(posting.count, 3)
+        self.easy.title = 'Easy reading'
+        self.easy.save()  # 正文未变化，不重建索引
+        self.assertEqual(WordPosting.objects.get(word='apple', article=self.easy).pk, posting.pk)
+        self.easy.content = 'No fruit here.'
+        self.easy.save()
+        self.assertFalse(WordPosting.objects.filter(word='apple', article=self.easy).exists())
+
+    def test_kwic_ranked_by_difficulty_with_cursor(self):
+        response = self.client.get('/api/articles/concordance/', {'word': 'Apple', 'limit': 2, 'width': 8})
+        self.assertEqual(response.status_code, 200)
+        first = response.data['results']
+        self.assertEqual([(r['article_id'], r['left'], r['keyword'], r['right']) for r in first], [
+            (self.easy.id, 'eat an ', 'apple', '. The a'),
+            (self.easy.id, 'e. The ', 'apple', ' is red.'),
+        ])
+
+        response = self.client.get(response.data['next'])
+        rest = response.data['results']
+        self.assertEqual([(r['article_id'], r['keyword']) for r in rest], [
+            (self.easy.id, 'Apple'), (self.hard.id, 'apple'),
+        ])
+        self.assertIsNone(response.data['next'])
+
+        self.assertEqual(self.client.get('/api/articles/concordance/', {'word': 'a b'}).status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/articles/concordance/', {'word': 'apple', 'cursor': 'bad'}).status_code, 400
+        )
+
+
+class SentenceOffsetsTest(TestCase):
+    """服务端句子切分"""
+
+    def test_split_sentences(self):
+        from .sentences import split_sentences
+
+        text = ('Mr. Smith paid $3.50 for it. "Really?" she asked. He said: "Yes!" '
+                'Then J. K. Rowling left... The U.S. economy grew, e.g. in tech. Done')
+        self.assertEqual([text[start:end] for start, end in split_sentences(text)], [
+            'Mr. Smith paid $3.50 for it.',
+            '"Really?" she asked.',
+            'He said: "Yes!"',
+            'Then J. K. Rowling left...',
+            'The U.S. economy grew, e.g. in tech.',
+            'Done',
+        ])
+
+    def test_content_paginated_returns_sentences(self):
+        paragraphs = ['First one. Second one!', 'Dr. Who arrived. Then left.', 'Last']
+        article = Article.objects.create(title='S', content='\n\n'.join(paragraphs))
+        url = f'/api/articles/{article.id}/content_paginated/'
+
+        response = APIClient().get(url, {'mode': 'fixed', 'page_size': 2, 'page': 2})
+        self.assertNotIn('sentences', response.data)
+
+        response = APIClient().get(url, {'mode': 'fixed', 'page_size': 2, 'page': 2, 'sentences': 'true'})
+        self.assertEqual(response.data['sentence_start_index'], 4)
+        self.assertEqual(response.data['sentences'], [[(0, 4)]])
+
+        response = APIClient().get(url, {'mode': 'fixed', 'page_size': 2, 'sentences': 'true'})
+        self.assertEqual(response.data['sentence_start_index'], 0)
+        texts = [
+            [paragraph[start:end] for start, end in spans]
+            for paragraph, spans in zip(response.data['paragraphs'], response.data['sentences'])
+        ]
+        self.assertEqual(texts, [['First one.', 'Second one!'], ['Dr. Who arrived.', 'Then left.']])
+
+
+class CountingStubBackend(StubBackend):
+    """记录调用次数的测试翻译后端"""
+    calls = []
+
+    release = threading.Event()
+
+    def translate(self, text, source, target):
+        if text == 'explode':
+            raise RuntimeError('backend down')
+        if text == 'stall':
+            # 模拟迟迟不返回的翻译接口，测试结束时放行
+            CountingStubBackend.release.wait(5)
+        CountingStubBackend.calls.append(text)
+        return super().translate(text, source, target)
+
+
+@override_settings(TRANSLATION_BACKEND='articles.tests.CountingStubBackend')
+class TranslateViewTest(TestCase):
+    """批量段落翻译与翻译记忆"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        # 限流计数保存在默认缓存中
+        cache.clear()
+        CountingStubBackend.calls = []
+        CountingStubBackend.release.clear()
+        self.addCleanup(CountingStubBackend.release.set)
+        self.client = APIClient()
+
+    def translate(self, paragraphs, **extra):
+        return self.client.post('/api/translate/', {'paragraphs': paragraphs, **extra}, format='json')
+
+    @skipUnless(shutil.which('node'), '需要 node 运行前端脚本')
+    def test_long_paragraphs_are_split_for_the_backend(self):
+        # 前端按句子拆分超长段落（translation-batches.js），每片都能通过后端的单段限制，译文按段落拼回
+        script = Path(__file__).resolve().parent.parent / 'translation-batches.js'
+        long_paragraph = ' '.join(f'Sentence number {i} is here.' for i in range(400))
+        unbroken = 'x' * 6000
+        paragraphs = ['Short one.', long_paragraph, unbroken]
+        program = (
+            f'const t = require({json.dumps(str(script))});'
+            f'const paragraphs = {json.dumps(paragraphs)};'
+            'const plan = t.planTranslation(paragraphs);'
+            'const pieces = plan.batches.flat();'
+            'const joined = t.joinTranslatedPieces(paragraphs, plan.owners, pieces.map((p, i) => i === 1 ? null : p));'
+            'console.log(JSON.stringify({limit: t.TRANSLATE_PARAGRAPH_CHARS, batches: plan.batches, '
+            'owners: plan.owners, joined: joined.map(item => item.translated)}));'
+        )
+        output = json.loads(subprocess.run(
+            ['node', '-e', program], capture_output=True, text=True, check=True
+        ).stdout)
+
+        self.assertEqual(output['limit'], MAX_PARAGRAPH_LENGTH)
+        pieces = [piece for batch in output['batches'] for piece in batch]
+        self.assertGreater(len(pieces), 4)
+        self.assertTrue(all(len(piece) <= MAX_PARAGRAPH_LENGTH for piece in pieces))
+        # 按句子边界拆分，拼回后与原段落一致（只差句间空格）
+        long_pieces = [p for p, owner in zip(pieces, output['owners']) if owner == 1]
+        self.assertTrue(all(piece.endswith('is here.') for piece in long_pieces))
+        self.assertEqual(' '.join(long_pieces), long_paragraph)
+        self.assertEqual(''.join(p for p, owner in zip(pieces, output['owners']) if owner == 2), unbroken)
+        # 任一片失败时整段标记为失败，其余段落正常拼回
+        self.assertEqual(output['joined'][0], 'Short one.')
+        self.assertIsNone(output['joined'][1])
+        self.assertEqual(output['joined'][2], unbroken)
+
+        for batch in output['batches']:
+            self.assertEqual(self.translate(batch).status_code, 200)
+
+    def test_misses_are_translated_once_and_remembered(self):
+        response = self.translate(['Hello world.', 'Good  night.', 'Hello world.'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['translated'] for item in response.data['translations']],
+            ['[zh-CN] Hello world.', '[zh-CN] Good night.', '[zh-CN] Hello world.']
+        )
+        self.assertEqual((response.data['hits'], response.data['misses']), (0, 3))
+        self.assertEqual(sorted(CountingStubBackend.calls), ['Good night.', 'Hello world.'])
+
+        # 第二次请求全部命中翻译记忆，只有新段落调用后端
+        response = self.translate(['Good night.', 'Hello world.', 'New line.'])
+        self.assertEqual((response.data['hits'], response.data['misses']), (2, 1))
+        self.assertEqual(len(CountingStubBackend.calls), 3)
+
+        # 不同的目标语言分开缓存
+        response = self.translate(['Hello world.'], target='ja')
+        self.assertEqual(response.data['translations'][0]['translated'], '[ja] Hello world.')
+
+    def test_failures_are_reported_and_not_cached(self):
+        response = self.translate(['explode', 'Fine.'])
+        self.assertEqual(response.data['failed'], 1)
+        self.assertIsNone(response.data['translations'][0]['translated'])
+        self.assertFalse(TranslationMemory.objects.filter(source_text='explode').exists())
+
+        self.assertEqual(self.translate('not a list').status_code, 400)
+
+    @override_settings(TRANSLATION_DEADLINE=0.2, TRANSLATION_MAX_WORKERS=1)
+    def test_deadline_returns_partial_results(self):
+        response = self.translate(['Quick.', 'stall', 'Later.'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['translations'][0]['translated'], '[zh-CN] Quick.')
+        self.assertEqual(response.data['untranslated'], [1, 2])
+        self.assertEqual(response.data['timed_out'], 2)
+        self.assertFalse(TranslationMemory.objects.filter(source_text='Later.').exists())
+
+    def test_size_limits_and_throttle(self):
+        from django.core.cache import cache
+        from rest_framework.throttling import ScopedRateThrottle
+
+        self.assertEqual(self.translate(['a'] * (MAX_BATCH_SIZE + 1)).status_code, 400)
+        self.assertEqual(self.translate(['x' * 4000] * 6).status_code, 400)
+
+        # 被拒绝的请求也计入限流
+        cache.clear()
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'translate': '2/min'}):
+            self.assertEqual(self.translate(['One.']).status_code, 200)
+            self.assertEqual(self.translate(['Two.']).status_code, 200)
+            self.assertEqual(self.translate(['Three.']).status_code, 429)
+
+
+DICTIONARY_CSV = """word,phonetic,definition,translation,pos,collins,oxford,tag,bnc,frq,exchange,detail,audio
+go,gəʊ,v. move,v. 去\\n n. 尝试,,5,1,zk gk,100,100,p:went/d:gone/i:going/3:goes,,
+went,went,,v. go 的过去式,,,,,,,0:go/1:p,,
+polish,'pɒliʃ,,v. 擦亮,,,,,,,,,
+Polish,'pəuliʃ,,a. 波兰的,,,,,,,,,
+"""
+
+
+class DictionaryTest(TestCase):
+    """离线词典导入与批量查词"""
+
+    def setUp(self):
+        from django.core.management import call_command
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'ecdict.csv'
+            path.write_text(DICTIONARY_CSV, encoding='utf-8')
+            self.outputs = [io.StringIO(), io.StringIO()]
+            call_command('import_dictionary', str(path), batch_size=2, stdout=self.outputs[0])
+            # 重复导入不会产生重复词条
+            call_command('import_dictionary', str(path), stdout=self.outputs[1])
+        self.client = APIClient()
+
+    def test_import_reports_new_entries(self):
+        self.assertIn('新增 4 个', self.outputs[0].getvalue())
+        self.assertIn('新增 0 个', self.outputs[1].getvalue())
+        self.assertIn('跳过 4 个', self.outputs[1].getvalue())
+
+    def test_batch_lookup(self):
+        self.assertEqual(DictionaryEntry.objects.count(), 4)
+        response = self.client.post(
+            '/api/dictionary/', {'words': ['GO', 'went', 'Polish', 'polish', 'xyzzy']}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        entries = response.data['entries']
+        self.assertEqual(response.data['found'], 4)
+        self.assertEqual(entries['GO']['translation'], 'v. 去\n n. 尝试')
+        self.assertEqual(entries['went']['base']['word'], 'go')
+        self.assertNotIn('base', entries['GO'])
+        self.assertEqual(entries['Polish']['translation'], 'a. 波兰的')
+        self.assertEqual(entries['polish']['translation'], 'v. 擦亮')
+        self.assertIsNone(entries['xyzzy'])
+
+    def test_single_lookup_and_limits(self):
+        response = self.client.get('/api/dictionary/', {'word': 'went'})
+        self.assertEqual(response.data['phonetic'], 'went')
+        self.assertEqual(self.client.get('/api/dictionary/', {'word': 'xyzzy'}).status_code, 404)
+
+        response = self.client.get('/api/dictionary/', {'words': 'go,went'})
+        self.assertEqual(response.data['found'], 2)
+
+        self.assertEqual(self.client.post('/api/dictionary/', {'words': 'go'}, format='json').status_code, 400)
+        too_many = ['w%d' % i for i in range(MAX_LOOKUP_WORDS + 1)]
+        self.assertEqual(self.client.post('/api/dictionary/', {'words': too_many}, format='json').status_code, 400)
+
+
+class LLMGatewayTest(TestCase):
+    """AI 生成网关：客户端复用、并发上限与期限"""
+
+    def setUp(self):
+        generation_cache.get_cache().clear()
+        self.client = APIClient()
+
+    def generate(self, url, provider='fake', **config):
+        return self.client.post(
+            url, {'prompt': 'Rainy days', 'ai_config': {'provider': provider, **config}}, format='json'
+        )
+
+    def test_fake_provider_is_deterministic_for_all_viewsets(self):
+        first = self.generate('/api/articles/generate_content/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data['provider'], 'fake')
+        self.assertIn('Rainy days', first.data['content'])
+        self.assertEqual(self.generate('/api/articles/generate_content/').data['content'], first.data['content'])
+
+        grammar = self.generate('/api/grammar-articles/generate_content/').data['content']
+        self.assertNotEqual(grammar, first.data['content'])
+        self.assertEqual(self.generate('/api/user-grammar-articles/generate_content/').data['content'], grammar)
+
+        # 未配置服务商时返回示例内容
+        response = self.generate('/api/articles/generate_content/', provider='')
+        self.assertEqual(response.data['provider'], 'demo')
+        self.assertIn('Sample Generated Article', response.data['content'])
+
+    def test_clients_are_pooled_per_key(self):
+        provider = llm.get_provider('deepseek')
+        with mock.patch.object(type(provider), 'create_client', side_effect=lambda *args: object()) as create:
+            llm.clear_clients()
+            first = llm.get_client(provider, 'key-1', '', 10)
+            self.assertIs(llm.get_client(provider, 'key-1', '', 10), first)
+            self.assertIsNot(llm.get_client(provider, 'key-2', '', 10), first)
+            self.assertEqual(create.call_count, 2)
+            self.assertFalse(any('key-1' in str(key) for key in llm._clients))
+            llm.clear_clients()
+
+    def test_async_clients_are_pooled_per_event_loop(self):
+        provider = llm.get_provider('deepseek')
+
+        async def get_twice():
+            first = llm.get_client(provider, 'key-1', '', 10, asynchronous=True)
+            self.assertIs(llm.get_client(provider, 'key-1', '', 10, asynchronous=True), first)
+            return first
+
+        with mock.patch.object(type(provider), 'create_async_client', side_effect=lambda *args: object()):
+            llm.clear_clients()
+            # async_to_sync 每次调用使用新的事件循环（与 WSGI 下的请求相同），不能复用旧循环的客户端
+            self.assertIsNot(async_to_sync(get_twice)(), async_to_sync(get_twice)())
+            llm.clear_clients()
+
+    def test_streaming_requires_asgi(self):
+        response = self.client.post(
+            '/api/articles/generate_content/',
+            {'prompt': 'Rainy days', 'ai_config': {'provider': 'fake'}, 'stream': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 501)
+
+    @override_settings(LLM_CONCURRENCY={'fake': 1}, LLM_QUEUE_TIMEOUT=0.05)
+    def test_busy_provider_fails_fast(self):
+        semaphore = llm._semaphore('fake')
+        semaphore.acquire()
+        try:
+            response = self.generate('/api/articles/generate_content/')
+        finally:
+            semaphore.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.generate('/api/articles/generate_content/').status_code, 200)
+
+    def test_deadline(self):
+        with mock.patch.object(llm.FakeProvider, 'delay', 1):
+            with self.assertRaises(llm.GenerationTimeout):
+                llm.generate('fake', 'Rainy days', timeout=0.05)
+            # 超时的调用释放并发名额
+            self.assertTrue(llm._semaphore('fake').acquire(blocking=False))
+            llm._semaphore('fake').release()
+
+
+    async def stream(self, url, **data):
+        response = await AsyncClient().post(
+            url, {'prompt': 'Rainy days', 'ai_config': {'provider': 'fake'}, 'stream': True, **data},
+            content_type='application/json'
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+        events = []
+        for block in body.strip().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.split('\n'))
+            events.append((fields.get('event', 'message'), json.loads(fields['data'])))
+        return events
+
+    async def test_streaming_relays_fake_provider_tokens(self):
+        events = await self.stream('/api/grammar-articles/generate_content/')
+        self.assertEqual(events[-1], ('done', {'provider': 'fake'}))
+        deltas = [data['delta'] for event, data in events[:-1]]
+        self.assertGreater(len(deltas), 5)
+        expected = llm.get_provider('fake').text(llm.SYSTEM_PROMPTS['grammar'], 'Rainy days')
+        self.assertEqual(''.join(deltas), expected)
+
+        # 未配置服务商时示例内容作为一个片段返回
+        events = await self.stream('/api/articles/generate_content/', ai_config={})
+        self.assertEqual([event for event, _ in events], ['message', 'done'])
+        self.assertIn('Sample Generated Article', events[0][1]['delta'])
+
+    @override_settings(LLM_TIMEOUT=0.05)
+    async def test_streaming_deadline_reports_error(self):
+        with mock.patch.object(llm.FakeProvider, 'delay', 1):
+            events = await self.stream('/api/articles/generate_content/')
+        # 超时发生在第一个片段之前，按调用失败返回说明内容
+        self.assertIn('AI API Error', events[0][1]['delta'])
+
+        with self.assertRaises(llm.GenerationTimeout):
+            with mock.patch.object(llm.FakeProvider, 'delay', 1):
+                async for _ in llm.astream('fake', 'Rainy days'):
+                    pass
+
+
+class GenerationCacheTest(TestCase):
+    """AI 生成内容缓存"""
+
+    def setUp(self):
+        generation_cache.get_cache().clear()
+        generation_cache.reset_stats()
+        self.client = APIClient()
+
+    def generate(self, prompt, url='/api/articles/generate_content/', **data):
+        return self.client.post(
+            url, {'prompt': prompt, 'ai_config': {'provider': 'fake'}, **data}, format='json'
+        )
+
+    def test_identical_prompts_hit_the_cache(self):
+        with mock.patch.object(llm, 'generate', wraps=llm.generate) as generate:
+            first = self.generate('Past  tense')
+            second = self.generate('  past tense ')
+            self.assertFalse(first.data['cached'])
+            self.assertTrue(second.data['cached'])
+            self.assertEqual(second.data['content'], first.data['content'])
+            self.assertEqual(generate.call_count, 1)
+
+            # 语法文章和用户语法文章共享缓存，与普通文章分开
+            self.assertFalse(self.generate('past tense', '/api/grammar-articles/generate_content/').data['cached'])
+            self.assertTrue(self.generate('past tense', '/api/user-grammar-articles/generate_content/').data['cached'])
+
+            # 按请求跳过缓存
+            self.assertFalse(self.generate('past tense', cache=False).data['cached'])
+            self.assertEqual(generate.call_count, 3)
+
+        # 示例内容不缓存
+        self.client.post('/api/articles/generate_content/', {'prompt': 'past tense'}, format='json')
+
+        stats = self.client.get('/api/generation-cache/').data
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores'], stats['bypassed']), (2, 2, 3, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_streamed_result_is_cached(self):
+        async def stream():
+            response = await AsyncClient().post(
+                '/api/articles/generate_content/',
+                {'prompt': 'Rainy days', 'ai_config': {'provider': 'fake'}, 'stream': True},
+                content_type='application/json'
+            )
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        async_to_sync(stream)()
+        self.assertTrue(self.generate('Rainy days').data['cached'])
+
+    @override_settings(CACHES={
+        'generation': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'generation-test',
+            'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2},
+        },
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    })
+    def test_least_recently_used_entry_is_evicted(self):
+        self.generate('first')
+        self.generate('second')
+        self.assertTrue(self.generate('first').data['cached'])
+        self.generate('third')
+        self.assertTrue(self.generate('first').data['cached'])
+        self.assertFalse(self.generate('second').data['cached'])
+
+
+class KeysetPaginationTest(TestCase):
+    """列表的游标分页与缓存的总数"""
+
+    def setUp(self):
+        from django.utils import timezone
+
+        now = timezone.now()
+        # 两篇文章的创建时间相同，按 id 区分先后
+        self.articles = [
+            Article.objects.create(title=f'Article {i}', content='Some text.', created_at=now - timedelta(minutes=i // 2))
+            for i in range(5)
+        ]
+        self.client = APIClient()
+
+    def collect(self, url, **params):
+        ids = []
+        response = self.client.get(url, {'pagination': 'cursor', **params})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            if response.data['next'] is None:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_pages_follow_created_at_then_id(self):
+        ids, last = self.collect('/api/articles/', page_size=2)
+        expected = list(Article.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertNotIn('count', last.data)
+
+        # 不带 pagination=cursor 时仍是页码分页
+        response = self.client.get('/api/articles/', {'page': 1})
+        self.assertEqual(response.data['count'], 5)
+        self.assertIn('previous', response.data)
+
+        response = self.client.get('/api/articles/', {'pagination': 'cursor', 'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cached_count_follows_article_changes(self):
+        url = '/api/articles/'
+        response = self.client.get(url, {'pagination': 'cursor', 'include_count': 'true'})
+        self.assertEqual(response.data['count'], 5)
+
+        # 绕过响应缓存，只验证总数缓存
+        response_cache.get_cache().clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'pagination': 'cursor', 'include_count': 'true'})
+        self.assertEqual(response.data['count'], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Article.objects.create(title='New', content='More text.')
+        response = self.client.get(url, {'pagination': 'cursor', 'include_count': 'true'})
+        self.assertEqual(response.data['count'], 6)
+
+    def test_grammar_viewsets(self):
+        for i in range(3):
+            GrammarArticle.objects.create(title=f'Grammar {i}', content='Rule.')
+            UserGrammarArticle.objects.create(title=f'Mine {i}', content='Rule.', author='alice')
+        UserGrammarArticle.objects.create(title='Other', content='Rule.', author='bob')
+
+        ids, _ = self.collect('/api/grammar-articles/', page_size=2)
+        self.assertEqual(len(ids), 3)
+        ids, _ = self.collect('/api/user-grammar-articles/', page_size=2, username='alice')
+        self.assertEqual(
+            ids, list(UserGrammarArticle.objects.filter(author='alice').order_by('-created_at', '-id').values_list('id', flat=True))
+        )
+
+
+class UserTabFilterTest(TestCase):
+    """"收藏"和"在读"列表按收藏/阅读时间排序"""
+
+    def setUp(self):
+        from django.utils import timezone
+
+        now = timezone.now()
+        self.articles = [Article.objects.create(title=f'Article {i}', content='Some text.') for i in range(4)]
+        for minutes, index in ((3, 0), (1, 2), (2, 1)):
+            ReadingHistory.objects.create(
+                article=self.articles[index], username='alice', user_ip='127.0.0.1',
+                read_at=now - timedelta(minutes=minutes)
+            )
+            Favorite.objects.create(
+                article=self.articles[index], username='alice', created_at=now - timedelta(minutes=10 - minutes)
+            )
+        # 其他用户的记录不影响结果，也不会产生重复行
+        for article in self.articles:
+            ReadingHistory.objects.create(article=article, username='bob', user_ip='127.0.0.1')
+            Favorite.objects.create(article=article, username='bob')
+
+    def titles(self, **params):
+        response = APIClient().get('/api/articles/', {'username': 'alice', **params})
+        self.assertEqual(response.data['count'], 3)
+        return [item['title'] for item in response.data['results']]
+
+    def test_in_progress_tab_orders_by_read_time(self):
+        self.assertEqual(self.titles(is_read='true'), ['Article 2', 'Article 1', 'Article 0'])
+
+    def test_favorite_tab_orders_by_favorite_time(self):
+        self.assertEqual(self.titles(is_favorite='true'), ['Article 0', 'Article 1', 'Article 2'])
+
+    def test_cursor_requests_keep_tab_order(self):
+        from django.utils import timezone
+
+        # 让阅读顺序与创建顺序不同：最近读的是最早创建的文章
+        ReadingHistory.objects.filter(article=self.articles[0], username='alice').update(read_at=timezone.now())
+        # 每个标签页都返回游标分页格式，逐页读取的顺序与页码分页一致
+        client = APIClient()
+        for tab, expected in (('is_read', ['Article 0', 'Article 2', 'Article 1']),
+                              ('is_favorite', ['Article 0', 'Article 1', 'Article 2'])):
+            titles = []
+            response = client.get('/api/articles/', {
+                'username': 'alice', tab: 'true', 'pagination': 'cursor', 'page_size': 1
+            })
+            while True:
+                self.assertNotIn('previous', response.data)
+                self.assertIn('next_cursor', response.data)
+                titles.extend(item['title'] for item in response.data['results'])
+                if response.data['next'] is None:
+                    break
+                response = client.get(response.data['next'])
+            self.assertEqual(titles, expected)
+
+    def test_cursor_search_pages_by_rank(self):
+        Article.objects.filter(pk=self.articles[3].pk).update(title='Coffee')
+        Article.objects.filter(pk=self.articles[1].pk).update(content='Coffee and more coffee.')
+        from .search import rebuild_index
+        rebuild_index(Article)
+
+        client = APIClient()
+        response = client.get('/api/articles/', {'search': 'coffee', 'pagination': 'cursor', 'page_size': 1})
+        self.assertEqual([item['title'] for item in response.data['results']], ['Coffee'])
+        response = client.get(response.data['next'])
+        self.assertEqual([item['title'] for item in response.data['results']], ['Article 1'])
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_benchmark_command_rolls_back(self):
+        from django.core.management import call_command
+
+        out = io.StringIO()
+        call_command('benchmark_tab_filters', history_rows=40, favorite_rows=20, articles=20, users=4,
+                     repeat=1, stdout=out)
+        self.assertIn('JOIN', out.getvalue())
+        self.assertEqual(Article.objects.count(), 4)
+        self.assertEqual(ReadingHistory.objects.count(), 7)
+
+
+class ConditionalGetTest(TestCase):
+    """文章详情和分页内容的 ETag / Last-Modified"""
+
+    def setUp(self):
+        self.article = Article.objects.create(title='Cached', content='First paragraph.\n\nSecond paragraph.')
+        self.client = APIClient()
+
+    def test_retrieve_revalidates_without_loading_content(self):
+        url = f'/api/articles/{self.article.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        # 只查询 updated_at
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.article.content = 'Changed.'
+        self.article.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        self.assertEqual(self.client.get('/api/articles/999999/', HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_saving_another_article_keeps_etag(self):
+        url = f'/api/articles/{self.article.id}/content_paginated/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Article.objects.create(title='Other', content='Text.')
+            other.title = 'Renamed'
+            other.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_content_pages_have_their_own_etags(self):
+        url = f'/api/articles/{self.article.id}/content_paginated/'
+        first = self.client.get(url, {'mode': 'fixed', 'page_size': 1, 'page': 1})
+        second = self.client.get(url, {'mode': 'fixed', 'page_size': 1, 'page': 2})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+        response = self.client.get(url, {'mode': 'fixed', 'page_size': 1, 'page': 1}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, {'mode': 'fixed', 'page_size': 1, 'page': 2}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_grammar_viewsets(self):
+        grammar = GrammarArticle.objects.create(title='Rule', content='Rule.')
+        mine = UserGrammarArticle.objects.create(title='Mine', content='Rule.', author='alice')
+        for url, params in (
+            (f'/api/grammar-articles/{grammar.id}/', {}),
+            (f'/api/grammar-articles/{grammar.id}/content_paginated/', {'page': 1}),
+            (f'/api/user-grammar-articles/{mine.id}/', {'username': 'alice'}),
+        ):
+            etag = self.client.get(url, params)['ETag']
+            self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # 其他用户看不到这篇文章，条件请求也返回404
+        response = self.client.get(f'/api/user-grammar-articles/{mine.id}/', {'username': 'bob'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 404)
+
+
+class ResponseCacheTest(TestCase):
+    """文章列表和分页内容的响应缓存"""
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        response_cache.reset_stats()
+        self.articles = create_articles(3)
+        self.client = APIClient()
+
+    def test_shared_list_with_user_fields_per_request(self):
+        ReadingHistory.objects.create(
+            article=self.articles[0], user_ip='127.0.0.1', username='alice', read_duration=42
+        )
+        Favorite.objects.create(article=self.articles[1], username='bob')
+        self.client.get('/api/articles/', {'username': 'alice'})
+
+        # 共享数据命中缓存，只查询 bob 的阅读历史和收藏
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/articles/', {'username': 'bob'})
+        results = {item['id']: item for item in response.data['results']}
+        self.assertIsNone(results[self.articles[0].id]['reading_info'])
+        self.assertTrue(results[self.articles[1].id]['is_favorited'])
+
+        response = self.client.get('/api/articles/', {'username': 'alice'})
+        results = {item['id']: item for item in response.data['results']}
+        self.assertEqual(results[self.articles[0].id]['reading_info']['read_duration'], 42)
+        self.assertFalse(results[self.articles[1].id]['is_favorited'])
+
+        self.client.get('/api/grammar-articles/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/grammar-articles/')
+        stats = self.client.get('/api/response-cache/').data
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (3, 2, 2))
+
+    def test_user_filtered_lists_are_not_cached(self):
+        Favorite.objects.create(article=self.articles[0], username='alice')
+        for _ in range(2):
+            response = self.client.get('/api/articles/', {'username': 'alice', 'is_favorite': 'true'})
+            self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response_cache.stats()['stores'], 0)
+
+    def test_pagination_links_follow_the_request(self):
+        params = {'pagination': 'cursor', 'page_size': 2}
+        first = self.client.get('/api/articles/', {**params, 'username': 'alice'})
+        second = self.client.get('/api/articles/', {**params, 'username': 'bob'})
+        self.assertEqual(response_cache.stats()['hits'], 1)
+        self.assertIn('username=bob', second.data['next'])
+        self.assertEqual(second.data['next_cursor'], first.data['next_cursor'])
+        self.assertEqual(self.client.get(second.data['next']).data['results'][0]['id'], self.articles[0].id)
+
+    def test_save_invalidates_list_and_pages(self):
+        article = self.articles[0]
+        url = f'/api/articles/{article.id}/content_paginated/'
+        self.client.get('/api/articles/')
+        self.client.get(url)
+        other = self.client.get(f'/api/articles/{self.articles[1].id}/content_paginated/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            article.title = 'Renamed'
+            article.content = 'New text.'
+            article.save()
+        titles = [item['title'] for item in self.client.get('/api/articles/').data['results']]
+        self.assertIn('Renamed', titles)
+        self.assertEqual(self.client.get(url).data['paragraphs'], ['New text.'])
+
+        # 其他文章的分页内容仍然命中缓存（只查询 updated_at 生成 ETag）
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/articles/{self.articles[1].id}/content_paginated/')
+        self.assertEqual(response.data, other.data)
+
+    def test_versions_are_shared_across_processes(self):
+        from django.core.cache import caches
+        from .cache_versions import _key, bump_version, get_version
+
+        article = self.articles[0]
+        version = get_version(Article, article.pk)
+        bump_version(Article, article.pk)
+        # 新建的缓存连接相当于另一个进程：看到同一个版本号，清空响应缓存也不影响版本号
+        other_process = caches.create_connection('versions')
+        response_cache.get_cache().clear()
+        self.assertNotEqual(get_version(Article, article.pk), version)
+        self.assertEqual(other_process.get(_key(Article, article.pk)), get_version(Article, article.pk))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'responses': {
+            'BACKEND': 'articles.cache_backends.MeteredLocMemCache',
+            'LOCATION': 'responses-eviction-test',
+            'OPTIONS': {'MAX_ENTRIES': 2, 'CULL_FREQUENCY': 2},
+        },
+    })
+    def test_evictions_are_counted(self):
+        for article in self.articles:
+            self.client.get(f'/api/articles/{article.id}/content_paginated/')
+        stats = response_cache.stats()
+        self.assertEqual(stats['stores'], 3)
+        self.assertEqual(stats['evictions'], 1)
+
+
+class PageWindowTest(TestCase):
+    """content_paginated 一次返回连续多页"""
+
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.article = Article.objects.create(
+            title='Book',
+            content='\n\n'.join(f'Sentence {i}. Another one.' for i in range(12))
+        )
+        self.url = f'/api/articles/{self.article.id}/content_paginated/'
+        self.params = {'mode': 'fixed', 'page_size': 1, 'sentences': 'true'}
+        self.client = APIClient()
+
+    def test_window_matches_single_pages(self):
+        response = self.client.get(self.url, {**self.params, 'pages': '2-4'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_pages'], 12)
+        self.assertEqual([p['current_page'] for p in response.data['pages']], [2, 3, 4])
+
+        for page_data in response.data['pages']:
+            single = self.client.get(self.url, {**self.params, 'page': page_data['current_page']}).data
+            for field in ('paragraphs', 'has_next', 'has_previous', 'page_info', 'sentence_start_index', 'sentences'):
+                self.assertEqual(page_data[field], single[field])
+
+    def test_window_from_page_is_clamped(self):
+        data = self.client.get(self.url, {**self.params, 'page': 11, 'window': 3}).data
+        self.assertEqual([p['current_page'] for p in data['pages']], [11, 12])
+        self.assertFalse(data['pages'][-1]['has_next'])
+
+        data = self.client.get(self.url, {**self.params, 'page': 1, 'window': 50}).data
+        self.assertEqual(len(data['pages']), MAX_WINDOW_PAGES)
+
+        grammar = GrammarArticle.objects.create(title='Rule', content='A.')
+        data = self.client.get(f'/api/grammar-articles/{grammar.id}/content_paginated/', {'pages': '1-3'}).data
+        self.assertEqual([p['paragraphs'] for p in data['pages']], [['A.']])
+
+    def test_invalid_window(self):
+        for params in ({'pages': '3-1'}, {'pages': 'two'}, {'window': 0}):
+            self.assertEqual(self.client.get(self.url, {**self.params, **params}).status_code, 400)
+
+
+class BookChapterImportTest(TestCase):
+    """按章节流式切分书籍"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.chapters = [
+            ('Chapter 1', 'Chapter 1\n\nThe beginning of the story.\n\nA second paragraph.'),
+            ('Chapter 2', 'Chapter 2\n\n' + 'The middle part goes on. ' * 40),
+            ('Chapter 3', 'Chapter 3\n\nThe end.'),
+        ]
+        self.path = Path(self.tmpdir.name, 'book.txt')
+        self.path.write_text(
+            'Preface text.\n\n' + '\n\n'.join(text for _, text in self.chapters),
+            encoding='utf-8'
+        )
+
+    def test_chapters_split_across_small_chunks(self):
+        import import_articles
+        from import_articles import ArticleImporter
+
+        importer = ArticleImporter(verbose=False)
+        # 块很小时章节标题会落在两个读取块之间
+        with mock.patch.object(import_articles, 'STREAM_CHUNK_SIZE', 7), \
+                mock.patch.object(import_articles, 'HEADING_OVERLAP', 16), \
+                redirect_stdout(io.StringIO()):
+            encoding = importer.detect_encoding(self.path)
+            pattern = import_articles.CHAPTER_PATTERNS[
+                importer.detect_chapter_pattern(self.path, encoding)
+            ]
+            chapters = list(importer.iter_chapters(self.path, encoding, pattern))
+            importer.detect_and_import_book_chapters(self.path, batch_size=2)
+
+        self.assertEqual(chapters, [(heading, text.strip()) for heading, text in self.chapters])
+        self.assertEqual(importer.imported_count, 3)
+        article = Article.objects.get(title='book - Chapter 2')
+        self.assertEqual(article.paragraph_count, 2)
+        self.assertFalse(Article.objects.filter(content__contains='Preface').exists())
@@ -0,0 +1,154 @@
+"""
+段落翻译记忆
+
+翻译结果按 (原文哈希, 源语言, 目标语言) 保存到 TranslationMemory 表，所有用户共享。
+一批段落先一次性查询翻译记忆，未命中的段落去重后通过翻译后端并发翻译，成功的结果写回翻译记忆。
+整批翻译有总时限，超时未完成的段落不再等待，作为未翻译返回，客户端可稍后重试。
+
+翻译后端可在 settings 中配置：
+    TRANSLATION_BACKEND = 'articles.translation.MyMemoryBackend'  # 默认
+    TRANSLATION_MAX_WORKERS = 4                                    # 并发翻译数
+    TRANSLATION_DEADLINE = 20                                      # 整批翻译的时限（秒）
+测试使用 StubBackend，不访问网络。
+"""
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+DEFAULT_BACKEND = 'articles.translation.MyMemoryBackend'
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_DEADLINE = 20
+
+# 单次请求最多翻译的段落数、单段最大长度和总字符数
+MAX_BATCH_SIZE = 50
+MAX_PARAGRAPH_LENGTH = 5000
+MAX_TOTAL_CHARS = 20000
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class TranslationError(Exception):
+    """翻译后端返回错误"""
+
+
+class MyMemoryBackend:
+    """MyMemory 免费翻译接口（与前端原来直接调用的接口相同）"""
+    name = 'mymemory'
+    url = 'https://api.mymemory.translated.net/get'
+    timeout = 10
+
+    def translate(self, text, source, target):
+        query = urlencode({'q': text, 'langpair': f'{source}|{target}'})
+        with urlopen(f'{self.url}?{query}', timeout=self.timeout) as response:
+            data = json.load(response)
+        if data.get('responseStatus') != 200 or not data.get('responseData'):
+            raise TranslationError(data.get('responseDetails') or '翻译失败')
+        return data['responseData']['translatedText']
+
+
+class StubBackend:
+    """本地测试用后端：不访问网络，返回带语言标记的原文"""
+    name = 'stub'
+
+    def translate(self, text, source, target):
+        return f'[{target}] {text}'
+
+
+def get_backend():
+    """按 settings.TRANSLATION_BACKEND 创建翻译后端"""
+    return import_string(getattr(settings, 'TRANSLATION_BACKEND', DEFAULT_BACKEND))()
+
+
+def normalize_paragraph(text):
+    """合并空白，使仅空白不同的段落共享翻译"""
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def paragraph_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def translate_paragraphs(paragraphs, source='en', target='zh-CN', backend=None):
+    """
+    批量翻译段落（优先使用翻译记忆）
+
+    返回:
+        (结果列表, 统计)
+        结果列表与输入顺序一致：[{'original', 'translated'}, ...]，翻译失败或超时时 translated 为None
+        统计：{'hits': 命中数, 'misses': 未命中数, 'failed': 失败数, 'timed_out': 超时数,
+               'untranslated': 未翻译段落的下标列表}
+    """
+    from .models import TranslationMemory
+
+    normalized = [normalize_paragraph(text) for text in paragraphs]
+    hashes = [paragraph_hash(text) for text in normalized]
+
+    # 一次查询取出所有已缓存的翻译
+    translations = dict(
+        TranslationMemory.objects.filter(
+            source_hash__in=set(hashes), source_lang=source, target_lang=target
+        ).values_list('source_hash', 'translated_text')
+    )
+
+    # 未命中的段落去重后并发翻译
+    missing = {}
+    for text, key in zip(normalized, hashes):
+        if key not in translations and text:
+            missing.setdefault(key, text)
+
+    failed = set()
+    timed_out = set()
+    if missing:
+        backend = backend or get_backend()
+        max_workers = min(len(missing), getattr(settings, 'TRANSLATION_MAX_WORKERS', DEFAULT_MAX_WORKERS))
+        deadline = getattr(settings, 'TRANSLATION_DEADLINE', DEFAULT_DEADLINE)
+
+        def translate(text):
+            try:
+                return backend.translate(text, source, target)
+            except Exception:
+                return None
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {key: executor.submit(translate, text) for key, text in missing.items()}
+        wait(futures.values(), timeout=deadline)
+        # 超时后不再等待：未开始的段落取消，正在进行的请求在后台结束（受后端自身的超时限制）
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        new_entries = []
+        for key, future in futures.items():
+            if not future.done() or future.cancelled():
+                timed_out.add(key)
+                continue
+            translated = future.result()
+            if translated is None:
+                failed.add(key)
+                continue
+            translations[key] = translated
+            new_entries.append(TranslationMemory(
+                source_hash=key, source_lang=source, target_lang=target,
+                source_text=missing[key], translated_text=translated,
+                backend=getattr(backend, 'name', type(backend).__name__),
+            ))
+        # 并发请求可能同时写入同一段落，忽略重复
+        TranslationMemory.objects.bulk_create(new_entries, ignore_conflicts=True)
+
+    results = [
+        {'original': original, 'translated': translations.get(key) if text else ''}
+        for original, text, key in zip(paragraphs, normalized, hashes)
+    ]
+    stats = {
+        'hits': sum(1 for text, key in zip(normalized, hashes) if text and key not in missing),
+        'misses': sum(1 for text, key in zip(normalized, hashes) if key in missing),
+        'failed': sum(1 for key in hashes if key in failed),
+        'timed_out': sum(1 for key in hashes if key in timed_out),
+        'untranslated': [i for i, item in enumerate(results) if item['translated'] is None],
+    }
+    return results, stats
@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ArticleViewSet, ReadingHistoryViewSet, AnnotationViewSet,
-    GrammarArticleViewSet, UserGrammarArticleViewSet
+    GrammarArticleViewSet, UserGrammarArticleViewSet, TranslateView, DictionaryView,
+    GenerationCacheView, ResponseCacheView
 )
 
 router = DefaultRouter()
@@ -14,5 +15,9 @@ router.register(r'user-grammar-articles', UserGrammarArticleViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('translate/', TranslateView.as_view(), name='translate'),
+    path('dictionary/', DictionaryView.as_view(), name='dictionary'),
+    path('generation-cache/', GenerationCacheView.as_view(), name='generation-cache'),
+    path('response-cache/', ResponseCacheView.as_view(), name='response-cache'),
 ]
 
@@ -1,17 +1,154 @@
+import json
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from django.core.paginator import Paginator
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+from rest_framework.utils.urls import replace_query_param
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.db import transaction
 from django.db.models import Q
-from .models import Article, ReadingHistory, Annotation, Favorite, GrammarArticle, UserGrammarArticle
+from .models import (
+    Article, ReadingHistory, Annotation, Favorite, GrammarArticle, UserGrammarArticle,
+    ArticleWordCount
+)
+from .search import apply_ranked_search, get_snippets
+from .page_boundaries import get_smart_offsets, compute_fixed_offsets
+from .pagination import KeysetPaginationMixin
+from .conditional import ConditionalRetrieveMixin, conditional_article
+from .paragraphs import unpack_paragraph_offsets, paragraph_lengths, load_paragraphs
+from .sentences import unpack_sentence_offsets, page_sentences
+from .translation import translate_paragraphs, MAX_BATCH_SIZE, MAX_PARAGRAPH_LENGTH, MAX_TOTAL_CHARS
+from .dictionary import lookup_words, MAX_LOOKUP_WORDS
+from . import generation_cache, response_cache
+from .generation import generate_content, astream_content
+from .llm import ProviderBusy
+from .vocabulary import VOCABULARY_SORTS, ensure_vocabulary
+from .concordance import (
+    search_concordance, normalize_word, decode_cursor,
+    DEFAULT_CONTEXT_WIDTH, MAX_CONTEXT_WIDTH, DEFAULT_CONCORDANCE_LIMIT, MAX_CONCORDANCE_LIMIT
+)
 from .serializers import (
     ArticleSerializer, ArticleListSerializer,
     ReadingHistorySerializer, AnnotationSerializer,
     GrammarArticleSerializer, GrammarArticleListSerializer,
-    UserGrammarArticleSerializer, UserGrammarArticleListSerializer
+    UserGrammarArticleSerializer, UserGrammarArticleListSerializer,
+    apply_user_article_states
 )
 
 
+# save_annotations 支持的增量操作
+ANNOTATION_OPS = ('add', 'remove', 'recolor')
+
+
+def annotation_item_error(item, is_op=False):
+    """检查一条标注（is_op=True 时为增量操作），返回错误信息，有效时返回None"""
+    if not isinstance(item, dict):
+        return f'标注必须是对象: {item}'
+    if is_op and item.get('op') not in ANNOTATION_OPS:
+        return f'无效的标注操作: {item}'
+    if not item.get('word') or not isinstance(item['word'], str):
+        return f'标注缺少单词: {item}'
+    # remove 操作不需要颜色
+    if not (is_op and item['op'] == 'remove'):
+        if not item.get('color') or not isinstance(item['color'], str):
+            return f'标注缺少颜色: {item}'
+    return None
+
+# content_paginated 一次最多返回的页数（pages / window 参数）
+MAX_WINDOW_PAGES = 10
+
+
+def sse_event(data, event=None):
+    """编码一条 server-sent event"""
+    lines = [f'event: {event}'] if event else []
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+async def generation_events(kind, prompt, ai_config, use_cache):
+    """
+    流式生成的事件序列
+
+    data: {"delta": "..."}             生成的文本片段（可能有多条）
+    event: done  data: {"provider"}    生成结束
+    event: error data: {"error"}       生成失败（已发送的片段作废）
+    """
+    try:
+        async for chunk in astream_content(kind, prompt, ai_config, use_cache=use_cache):
+            yield sse_event({'delta': chunk})
+    except ProviderBusy:
+        yield sse_event({'error': 'AI服务繁忙，请稍后再试'}, event='error')
+        return
+    except Exception as e:
+        yield sse_event({'error': f'生成失败: {str(e)}'}, event='error')
+        return
+    yield sse_event({'provider': ai_config.get('provider') or 'demo'}, event='done')
+
+
+def generate_content_response(request, kind):
+    """
+    三个文章视图集共用的 AI 生成接口（kind: article / grammar）
+    
+    请求参数 stream=true 时以 server-sent events 逐段返回生成的文本。
+    事件流由异步生成器产生，只在 ASGI 服务器（如 uvicorn）下提供：WSGI 下 Django 会为每个请求
+    新建事件循环并缓冲整个事件流，既不能逐段返回也无法限制并发，因此返回501，客户端改用普通请求。
+    请求参数 cache=false 时不使用缓存的生成结果（重新生成并覆盖缓存）。
+    """
+    prompt = request.data.get('prompt', '').strip()
+    ai_config = request.data.get('ai_config', {})
+    
+    if not prompt:
+        return Response({
+            'error': '提示词不能为空'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    use_cache = request.data.get('cache', request.query_params.get('cache')) not in (False, 'false', '0')
+    stream = request.data.get('stream', request.query_params.get('stream'))
+    if stream in (True, 'true', '1'):
+        if not isinstance(request._request, ASGIRequest):
+            return Response({
+                'error': '流式生成需要使用 ASGI 服务器（如 uvicorn）运行，请去掉 stream 参数'
+            }, status=status.HTTP_501_NOT_IMPLEMENTED)
+        response = StreamingHttpResponse(
+            generation_events(kind, prompt, ai_config, use_cache),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # 禁止 nginx 等反向代理缓冲事件流
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    try:
+        content, provider, cached = generate_content(kind, prompt, ai_config, use_cache=use_cache)
+        return Response({
+            'content': content,
+            'prompt': prompt,
+            'provider': provider,
+            'cached': cached
+        })
+    except ProviderBusy:
+        # 并发已满时立即拒绝，不占用工作线程排队等待上游
+        return Response({
+            'error': 'AI服务繁忙，请稍后再试'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+    except Exception as e:
+        return Response({
+            'error': f'生成失败: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class VocabularyPagination(PageNumberPagination):
+    """词频表分页（单词数量通常远多于文章，默认每页100个）"""
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
 def get_client_ip(request):
     """获取客户端IP地址"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -38,7 +175,133 @@ def get_user_identifier(request):
     return get_client_ip(request)
 
 
-class ArticleViewSet(viewsets.ModelViewSet):
+def parse_page_window(params, page):
+    """
+    解析 content_paginated 的多页窗口参数
+
+    pages=N-M 返回第 N 到 M 页，window=k 返回从 page 开始的 k 页，最多 MAX_WINDOW_PAGES 页。
+    返回 (第一页, 最后一页)，未请求多页时返回None；参数无效时抛出 ValueError。
+    """
+    pages = params.get('pages')
+    if pages:
+        first, separator, last = pages.partition('-')
+        first = int(first)
+        last = int(last) if separator else first
+    elif params.get('window'):
+        first = page
+        last = page + int(params['window']) - 1
+    else:
+        return None
+
+    if first < 1 or last < first:
+        raise ValueError(pages)
+    return first, min(last, first + MAX_WINDOW_PAGES - 1)
+
+
+def paginated_content_data(view, request):
+    """
+    content_paginated 的响应数据（文章和语法文章共用）
+
+    默认返回 page 指定的一页；带 pages / window 参数时在 pages 中返回连续的多页，
+    页边界只计算一次，整个窗口的正文一次读出后按页切分。
+    """
+    article = view.get_object()
+    page = int(request.query_params.get('page', 1))
+    try:
+        window = parse_page_window(request.query_params, page)
+    except ValueError:
+        raise ValidationError({'error': 'pages 应为 N-M 形式的页码范围，window 应为正整数'})
+    
+    # 获取分页配置（支持按字符数智能分页）
+    pagination_mode = request.query_params.get('mode', 'smart')  # smart 或 fixed
+    target_chars = int(request.query_params.get('target_chars', 4000))
+    min_chars = int(request.query_params.get('min_chars', 2000))
+    max_chars = int(request.query_params.get('max_chars', 8000))
+    min_paragraphs = int(request.query_params.get('min_paragraphs', 2))
+    max_paragraphs = int(request.query_params.get('max_paragraphs', 15))
+    
+    # 使用存储的段落偏移量（正文只按当前页需要的范围读取）
+    paragraph_offsets = unpack_paragraph_offsets(article.paragraph_offsets)
+    if not paragraph_offsets and article.paragraph_count:
+        # 兼容旧数据：重新计算段落偏移量并保存
+        article.save()
+        paragraph_offsets = unpack_paragraph_offsets(article.paragraph_offsets)
+    lengths = paragraph_lengths(paragraph_offsets)
+    
+    # 根据模式计算页边界（段落下标偏移量）
+    if pagination_mode == 'smart':
+        # 智能分页：按字符数，页边界按文章版本和分页参数缓存
+        offsets = get_smart_offsets(
+            article,
+            lengths,
+            target_chars=target_chars,
+            min_chars=min_chars,
+            max_chars=max_chars,
+            min_paragraphs=min_paragraphs,
+            max_paragraphs=max_paragraphs
+        )
+    else:
+        # 固定分页：按段落数（兼容旧方式）
+        page_size = int(request.query_params.get('page_size', 8))
+        offsets = compute_fixed_offsets(len(lengths), page_size)
+    
+    # 获取指定页（超出范围时取最近的有效页）
+    total_pages = len(offsets) - 1
+    first, last = window or (page, page)
+    first = min(max(first, 1), total_pages)
+    last = min(max(last, first), total_pages)
+    
+    # 可选：返回服务端切分好的句子（偏移量相对各段落，句子下标在整篇文章中稳定）
+    sentence_offsets = None
+    if request.query_params.get('sentences') == 'true':
+        sentence_offsets = unpack_sentence_offsets(article.sentence_offsets)
+        if not sentence_offsets and paragraph_offsets:
+            # 兼容旧数据：重新计算句子偏移量并保存
+            article.save()
+            sentence_offsets = unpack_sentence_offsets(article.sentence_offsets)
+    
+    # 直接按页边界读取窗口内的段落，再按页切分
+    window_start = offsets[first - 1]
+    paragraphs = load_paragraphs(article, window_start, offsets[last], paragraph_offsets)
+    pages = []
+    for current in range(first, last + 1):
+        start, end = offsets[current - 1], offsets[current]
+        current_page_paragraphs = paragraphs[start - window_start:end - window_start]
+        page_data = {
+            'current_page': current,
+            'paragraphs': current_page_paragraphs,
+            'has_next': current < total_pages,
+            'has_previous': current > 1,
+            # 页面信息
+            'page_info': {
+                'paragraph_count': len(current_page_paragraphs),
+                'char_count': sum(lengths[start:end]),
+                'pagination_mode': pagination_mode
+            },
+        }
+        if sentence_offsets is not None:
+            first_sentence, sentences = page_sentences(sentence_offsets, paragraph_offsets, start, end)
+            page_data['sentence_start_index'] = first_sentence
+            page_data['sentences'] = sentences
+        pages.append(page_data)
+    
+    data = {
+        'total_pages': total_pages,
+        'total_paragraphs': len(lengths),
+        # 基本文章信息
+        'article_id': article.id,
+        'article_title': article.title,
+        'word_count': article.word_count,
+        'paragraph_count': article.paragraph_count
+    }
+    if window is None:
+        data.update(pages[0])
+    else:
+        data['pages'] = pages
+    return data
+
+
+class ArticleViewSet(KeysetPaginationMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """文章视图集"""
     queryset = Article.objects.filter(is_active=True)
     serializer_class = ArticleSerializer
@@ -48,48 +311,46 @@ class ArticleViewSet(viewsets.ModelViewSet):
             return ArticleListSerializer
         return ArticleSerializer
     
-    def get_serializer_context(self):
-        """添加额外的context信息到序列化器"""
-        context = super().get_serializer_context()
-        # 添加用户名到context，用于获取阅读历史
-        context['username'] = self.request.query_params.get('username', None)
-        return context
-
     def get_queryset(self):
         queryset = super().get_queryset()
         
+        # 列表只读取存储的预览字段，不加载全文和段落数据；词频表已生成时也不需要正文
+        if self.action in ('list', 'vocabulary'):
+            queryset = queryset.defer('content', 'paragraph_offsets', 'sentence_offsets')
+        # 分页阅读只按需读取当前页的正文（句子偏移量只在请求时读取）
+        elif self.action == 'content_paginated':
+            queryset = queryset.defer('content', 'sentence_offsets')
+        
         # 推荐筛选
         is_recommended = self.request.query_params.get('is_recommended', None)
         if is_recommended == 'true':
             queryset = queryset.filter(is_recommended=True)
         
-        # 收藏筛选
+        # 收藏筛选（按收藏时间倒序）
+        # 从该用户的收藏记录出发连接文章表：(username, created_at) 索引同时完成筛选和排序，
+        # (article, username) 唯一，连接不会产生重复行
         is_favorite = self.request.query_params.get('is_favorite', None)
         if is_favorite == 'true':
             username = self.request.query_params.get('username', 'guest')
-            # 获取该用户收藏的文章ID列表
-            favorite_article_ids = Favorite.objects.filter(
-                username=username
-            ).values_list('article_id', flat=True).distinct()
-            queryset = queryset.filter(id__in=favorite_article_ids)
+            queryset = queryset.filter(favorite__username=username).order_by('-favorite__created_at')
         
-        # 在读筛选（已读文章）
+        # 在读筛选（已读文章，按最近阅读时间倒序，使用 (username, read_at) 索引）
         is_read = self.request.query_params.get('is_read', None)
         if is_read == 'true':
             username = self.request.query_params.get('username', 'guest')
-            # 获取该用户已读的文章ID列表
-            read_article_ids = ReadingHistory.objects.filter(
-                username=username
-            ).values_list('article_id', flat=True).distinct()
-            queryset = queryset.filter(id__in=read_article_ids)
+            queryset = queryset.filter(readinghistory__username=username).order_by('-readinghistory__read_at')
         
-        # 搜索功能
+        # 搜索功能（优先使用全文索引，按BM25相关度排序）
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(content__icontains=search)
-            )
+            ranked = apply_ranked_search(queryset, search)
+            if ranked is not None:
+                queryset = ranked
+            else:
+                queryset = queryset.filter(
+                    Q(title__icontains=search) | 
+                    Q(content__icontains=search)
+                )
         
         # 难度筛选
         difficulty = self.request.query_params.get('difficulty', None)
@@ -108,6 +369,69 @@ class ArticleViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """
+        文章列表（按整页批量获取用户的阅读历史和收藏状态）
+
+        对所有用户相同的部分走响应缓存，用户的阅读历史和收藏状态在取出后叠加；
+        收藏、在读列表按用户筛选，不缓存。
+        """
+        key = None
+        if response_cache.is_shared_list(request):
+            key = response_cache.list_key(Article, request)
+        data = response_cache.get_or_build(key, request, self._shared_list_data)
+
+        items = data['results'] if isinstance(data, dict) else data
+        states = self._get_user_article_states(
+            request.query_params.get('username'), [item['id'] for item in items]
+        )
+        apply_user_article_states(items, **states)
+        return Response(data)
+
+    def _shared_list_data(self):
+        """不含用户字段的列表数据（分页时包含分页信息）"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        articles = page if page is not None else list(queryset)
+
+        context = self.get_serializer_context()
+        search = self.request.query_params.get('search', None)
+        if search:
+            context['search_snippets'] = get_snippets(Article, search, [article.id for article in articles])
+        serializer = ArticleListSerializer(articles, many=True, context=context)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data).data
+        return serializer.data
+
+    def _get_user_article_states(self, username, article_ids):
+        """
+        一次性查询用户在给定文章上的阅读历史和收藏状态
+
+        返回:
+            {
+                'reading_history_map': {article_id: {'read_at': ..., 'read_duration': ...}},
+                'favorited_article_ids': {article_id, ...}
+            }
+        """
+        if not username or not article_ids:
+            return {'reading_history_map': {}, 'favorited_article_ids': set()}
+
+        histories = ReadingHistory.objects.filter(
+            username=username,
+            article_id__in=article_ids
+        ).values('article_id', 'read_at', 'read_duration')
+
+        favorited_ids = Favorite.objects.filter(
+            username=username,
+            article_id__in=article_ids
+        ).values_list('article_id', flat=True)
+
+        return {
+            'reading_history_map': {h['article_id']: h for h in histories},
+            'favorited_article_ids': set(favorited_ids),
+        }
+
     @action(detail=True, methods=['post'])
     def record_reading(self, request, pk=None):
         """记录阅读历史"""
@@ -146,155 +470,172 @@ class ArticleViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def save_annotations(self, request, pk=None):
-        """保存标注（支持用户名）"""
+        """
+        保存标注（支持用户名）
+        
+        支持两种请求格式：
+            annotations: 完整标注列表 [{'word': ..., 'color': ...}]，与已有标注比较后只写入差异
+            ops: 增量操作列表 [{'op': 'add'|'remove'|'recolor', 'word': ..., 'color': ...}]
+        """
         article = self.get_object()
         user_identifier = get_user_identifier(request)
-        annotations_data = request.data.get('annotations', [])
-        
-        # 删除旧标注
-        Annotation.objects.filter(article=article, user_ip=user_identifier).delete()
-        
-        # 保存新标注
-        for ann in annotations_data:
-            Annotation.objects.create(
-                article=article,
-                user_ip=user_identifier,  # 虽然字段名是user_ip，但现在存储的是用户标识
-                word=ann['word'],
-                color=ann['color']
+        ops = request.data.get('ops', None)
+        
+        if ops is not None:
+            if not isinstance(ops, list):
+                return Response({'error': 'ops 必须是列表'}, status=status.HTTP_400_BAD_REQUEST)
+            # 增量模式：按顺序合并操作，同一单词以最后一次操作为准
+            upserts = {}
+            removals = set()
+            for op in ops:
+                error = annotation_item_error(op, is_op=True)
+                if error:
+                    return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+                word = op['word']
+                if op['op'] == 'remove':
+                    upserts.pop(word, None)
+                    removals.add(word)
+                else:
+                    removals.discard(word)
+                    upserts[word] = op['color']
+        else:
+            # 完整列表模式：与已有标注比较差异
+            annotations_data = request.data.get('annotations', [])
+            if not isinstance(annotations_data, list):
+                return Response({'error': 'annotations 必须是列表'}, status=status.HTTP_400_BAD_REQUEST)
+            for ann in annotations_data:
+                error = annotation_item_error(ann)
+                if error:
+                    return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+            incoming = {ann['word']: ann['color'] for ann in annotations_data}
+            existing = dict(
+                Annotation.objects.filter(
+                    article=article, user_ip=user_identifier
+                ).values_list('word', 'color')
             )
+            upserts = {word: color for word, color in incoming.items() if existing.get(word) != color}
+            removals = set(existing) - set(incoming)
+        
+        # 一个事务内：一次批量删除 + 一次批量插入/更新
+        with transaction.atomic():
+            if removals:
+                Annotation.objects.filter(
+                    article=article,
+                    user_ip=user_identifier,
+                    word__in=removals
+                ).delete()
+            if upserts:
+                Annotation.objects.bulk_create(
+                    [
+                        Annotation(
+                            article=article,
+                            user_ip=user_identifier,  # 虽然字段名是user_ip，但现在存储的是用户标识
+                            word=word,
+                            color=color
+                        )
+                        for word, color in upserts.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['article', 'user_ip', 'word'],
+                    update_fields=['color']
+                )
         
-        return Response({'status': 'annotations saved'})
+        return Response({
+            'status': 'annotations saved',
+            'upserted': len(upserts),
+            'removed': len(removals)
+        })
 
     @action(detail=True, methods=['get'])
+    @conditional_article
     def content_paginated(self, request, pk=None):
-        """分页获取文章内容（支持智能分页）"""
-        article = self.get_object()
-        page = int(request.query_params.get('page', 1))
-        
-        # 获取分页配置（支持按字符数智能分页）
-        pagination_mode = request.query_params.get('mode', 'smart')  # smart 或 fixed
-        target_chars = int(request.query_params.get('target_chars', 4000))
-        min_chars = int(request.query_params.get('min_chars', 2000))
-        max_chars = int(request.query_params.get('max_chars', 8000))
-        min_paragraphs = int(request.query_params.get('min_paragraphs', 2))
-        max_paragraphs = int(request.query_params.get('max_paragraphs', 15))
+        """
+        分页获取文章内容（支持智能分页），结果按文章版本和查询参数缓存
+
+        参数 pages=N-M 或 window=k 时一次返回连续的多页，供阅读器预取
+        """
+        key = response_cache.page_key(Article, pk, request)
+        data = response_cache.get_or_build(key, request, lambda: paginated_content_data(self, request))
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def vocabulary(self, request, pk=None):
+        """
+        获取文章的词频表
         
-        # 使用存储的段落数据（如果没有则实时分割并保存）
-        if not article.paragraphs or len(article.paragraphs) == 0:
-            # 兼容旧数据：实时分割并保存
-            paragraphs = [p.strip() for p in article.content.split('\n\n') if p.strip()]
-            article.paragraphs = paragraphs
-            article.paragraph_count = len(paragraphs)
-            article.save()
-        else:
-            paragraphs = article.paragraphs
+        参数:
+            sort: frequency（按出现次数，默认）或 alpha（按字母顺序）
+            content_page: 只返回默认智能分页第N页的词频（不传则为全文）
+            page / page_size: 词频表本身的分页
+        """
+        article = self.get_object()
         
-        # 根据模式选择分页方式
-        if pagination_mode == 'smart':
-            # 智能分页：按字符数
-            pages = self._smart_paginate(
-                paragraphs,
-                target_chars=target_chars,
-                min_chars=min_chars,
-                max_chars=max_chars,
-                min_paragraphs=min_paragraphs,
-                max_paragraphs=max_paragraphs
+        sort = request.query_params.get('sort', 'frequency')
+        if sort not in VOCABULARY_SORTS:
+            return Response(
+                {'error': f"sort 必须是 {', '.join(VOCABULARY_SORTS)} 之一"},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        else:
-            # 固定分页：按段落数（兼容旧方式）
-            page_size = int(request.query_params.get('page_size', 8))
-            paginator = Paginator(paragraphs, page_size)
-            pages = [list(paginator.get_page(i).object_list) for i in range(1, paginator.num_pages + 1)]
-        
-        # 获取指定页
-        total_pages = len(pages)
-        if page < 1:
-            page = 1
-        elif page > total_pages:
-            page = total_pages
-        
-        current_page_paragraphs = pages[page - 1] if pages else []
-        
-        # 计算当前页的字符数
-        current_page_chars = sum(len(p) for p in current_page_paragraphs)
-        
-        return Response({
-            'current_page': page,
-            'total_pages': total_pages,
-            'total_paragraphs': len(paragraphs),
-            'paragraphs': current_page_paragraphs,
-            'has_next': page < total_pages,
-            'has_previous': page > 1,
-            # 页面信息
-            'page_info': {
-                'paragraph_count': len(current_page_paragraphs),
-                'char_count': current_page_chars,
-                'pagination_mode': pagination_mode
-            },
-            # 基本文章信息
-            'article_id': article.id,
-            'article_title': article.title,
-            'word_count': article.word_count,
-            'paragraph_count': article.paragraph_count
-        })
+        try:
+            content_page = int(request.query_params.get('content_page', 0))
+        except ValueError:
+            content_page = -1
+        if content_page < 0:
+            return Response({'error': 'content_page 必须是非负整数'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 文章保存后首次请求时生成词频表
+        ensure_vocabulary(article)
+        
+        queryset = ArticleWordCount.objects.filter(
+            article_id=article.id, page=content_page
+        ).order_by(*VOCABULARY_SORTS[sort]).values('word', 'count')
+        
+        paginator = VocabularyPagination()
+        words = paginator.paginate_queryset(queryset, request, view=self)
+        response = paginator.get_paginated_response(words)
+        response.data['article_id'] = article.id
+        response.data['content_page'] = content_page
+        response.data['sort'] = sort
+        return response
     
-    def _smart_paginate(self, paragraphs, target_chars=4000, min_chars=2000, 
-                       max_chars=8000, min_paragraphs=2, max_paragraphs=15):
+    @action(detail=False, methods=['get'])
+    def concordance(self, request):
         """
-        智能分页算法：按目标字符数分页，同时保持段落完整性
+        单词的上下文例句（KWIC），按文章难度从易到难排序
         
         参数:
-            paragraphs: 段落列表
-            target_chars: 目标字符数（每页理想长度）
-            min_chars: 最少字符数（避免页面太短）
-            max_chars: 最多字符数（避免页面太长）
-            min_paragraphs: 最少段落数（避免单段过长）
-            max_paragraphs: 最多段落数（避免段落过多）
-        
-        返回:
-            分页后的段落列表 [[page1_paragraphs], [page2_paragraphs], ...]
+            word: 要查询的单词
+            width: 关键词左右各取的字符数（默认60）
+            limit: 每页条数（默认20）
+            cursor: 上一页返回的 next 中的游标
         """
-        pages = []
-        current_page = []
-        current_length = 0
+        word = normalize_word(request.query_params.get('word'))
+        if word is None:
+            return Response({'error': 'word 必须是一个英文单词'}, status=status.HTTP_400_BAD_REQUEST)
         
-        for paragraph in paragraphs:
-            para_length = len(paragraph.strip())
-            
-            if para_length == 0:  # 跳过空段落
-                continue
-            
-            # 判断是否应该分页
-            should_paginate = False
-            
-            # 条件1：达到最大段落数
-            if len(current_page) >= max_paragraphs:
-                should_paginate = True
-            
-            # 条件2：加上当前段落会超过最大字符数
-            elif current_length + para_length > max_chars and len(current_page) >= min_paragraphs:
-                should_paginate = True
-            
-            # 条件3：已达到目标字符数且至少有最少段落数
-            elif (len(current_page) >= min_paragraphs and 
-                  current_length >= target_chars):
-                should_paginate = True
-            
-            # 执行分页
-            if should_paginate and current_page:
-                pages.append(current_page)
-                current_page = []
-                current_length = 0
-            
-            # 添加段落到当前页
-            current_page.append(paragraph)
-            current_length += para_length
-        
-        # 添加最后一页
-        if current_page:
-            pages.append(current_page)
-        
-        return pages if pages else [[]]  # 确保至少返回一个空页
+        try:
+            width = min(int(request.query_params.get('width', DEFAULT_CONTEXT_WIDTH)), MAX_CONTEXT_WIDTH)
+            limit = min(int(request.query_params.get('limit', DEFAULT_CONCORDANCE_LIMIT)), MAX_CONCORDANCE_LIMIT)
+        except ValueError:
+            return Response({'error': 'width 和 limit 必须是整数'}, status=status.HTTP_400_BAD_REQUEST)
+        if width < 0 or limit < 1:
+            return Response({'error': 'width 和 limit 必须是正整数'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            cursor = decode_cursor(cursor)
+            if cursor is None:
+                return Response({'error': '无效的游标'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results, next_cursor = search_concordance(word, width=width, limit=limit, cursor=cursor)
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        return Response({
+            'word': word,
+            'next': next_url,
+            'results': results,
+        })
     
     @action(detail=True, methods=['post'])
     def toggle_favorite(self, request, pk=None):
@@ -346,184 +687,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def generate_content(self, request):
         """使用AI生成文章内容"""
-        prompt = request.data.get('prompt', '').strip()
-        ai_config = request.data.get('ai_config', {})
-        
-        if not prompt:
-            return Response({
-                'error': '提示词不能为空'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            content = None
-            
-            # 获取AI配置
-            provider = ai_config.get('provider', '')
-            api_key = ai_config.get('apiKey', '')
-            custom_url = ai_config.get('customUrl', '')
-            
-            # 如果有真实的API配置，尝试调用
-            if provider and api_key:
-                try:
-                    if provider in ['openai', 'deepseek']:
-                        # OpenAI/DeepSeek兼容API
-                        import openai
-                        
-                        # 配置客户端
-                        if provider == 'deepseek':
-                            client = openai.OpenAI(
-                                api_key=api_key,
-                                base_url='https://api.deepseek.com'
-                            )
-                            model = 'deepseek-chat'
-                        else:
-                            client = openai.OpenAI(api_key=api_key)
-                            model = 'gpt-3.5-turbo'
-                        
-                        # 调用API
-                        response = client.chat.completions.create(
-                            model=model,
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant that writes English articles for language learners. Write clear, well-structured articles."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=2000,
-                            temperature=0.7
-                        )
-                        content = response.choices[0].message.content
-                        
-                    elif provider == 'claude':
-                        # Anthropic Claude API
-                        import anthropic
-                        client = anthropic.Anthropic(api_key=api_key)
-                        message = client.messages.create(
-                            model="claude-3-sonnet-20240229",
-                            max_tokens=2000,
-                            messages=[
-                                {"role": "user", "content": f"Write an English article for language learners based on this prompt: {prompt}"}
-                            ]
-                        )
-                        content = message.content[0].text
-                        
-                    elif provider == 'custom' and custom_url:
-                        # 自定义API（OpenAI兼容）
-                        import openai
-                        client = openai.OpenAI(
-                            api_key=api_key,
-                            base_url=custom_url
-                        )
-                        response = client.chat.completions.create(
-                            model='gpt-3.5-turbo',
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant that writes English articles."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=2000
-                        )
-                        content = response.choices[0].message.content
-                        
-                except ImportError:
-                    # SDK未安装，返回提示
-                    content = f"""⚠️ AI SDK Not Installed
-
-To use {provider.upper()} API, please install the required package:
-
-For OpenAI/DeepSeek:
-pip install openai
-
-For Claude:
-pip install anthropic
-
----
-
-Your prompt was: "{prompt}"
-
-Please install the SDK and restart the server to use real AI generation."""
-                
-                except Exception as api_error:
-                    # API调用失败，返回错误信息和示例内容
-                    content = f"""⚠️ AI API Error: {str(api_error)}
-
-Showing sample content instead...
-
----
-
-# Sample Article
-
-Based on your prompt: "{prompt}"
-
-## Introduction
-
-This is a sample article structure. The actual content would be generated by the AI based on your prompt.
-
-## Main Content
-
-Your prompt requested information about: {prompt[:100]}...
-
-Here you would find detailed, well-structured content addressing your topic.
-
-## Conclusion
-
-To use real AI generation, please:
-1. Ensure your API key is correct
-2. Check your API account has sufficient credits
-3. Verify your network connection
-
----
-
-Note: This is sample content shown because the AI API call failed."""
-            
-            # 如果没有配置或调用失败，返回示例内容
-            if not content:
-                content = f"""# Sample Generated Article
-
-**Your prompt:** {prompt}
-
-## Introduction
-
-This is a **sample article** generated for demonstration purposes. To use real AI generation, please:
-
-1. Go to **Personal Center** (个人中心)
-2. Configure your **AI API** settings
-3. Choose a provider (OpenAI, Claude, DeepSeek, etc.)
-4. Enter your API key
-5. Save the configuration
-
-## Main Content
-
-Once you've configured a real AI API, the system will generate actual content based on your prompt. The content will be:
-
-- Professionally written
-- Tailored to your specific prompt
-- Suitable for language learners
-- Well-structured and informative
-
-### Example Topics
-
-For grammar articles, you might request:
-- Explanations of tenses
-- Common grammar mistakes
-- Usage of prepositions
-- Sentence structures
-
-## Conclusion
-
-This sample demonstrates the article structure. Configure your AI API to generate real content!
-
----
-
-💡 **Tip:** DeepSeek is recommended for Chinese users - fast, affordable, and excellent Chinese support."""
-            
-            return Response({
-                'content': content,
-                'prompt': prompt,
-                'provider': provider if provider else 'demo'
-            })
-            
-        except Exception as e:
-            return Response({
-                'error': f'生成失败: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return generate_content_response(request, 'article')
 
 
 class ReadingHistoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -548,7 +712,7 @@ class AnnotationViewSet(viewsets.ModelViewSet):
         return queryset.filter(user_ip=user_ip)
 
 
-class GrammarArticleViewSet(viewsets.ModelViewSet):
+class GrammarArticleViewSet(KeysetPaginationMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """语法文章视图集（系统管理）"""
     queryset = GrammarArticle.objects.filter(is_active=True)
     serializer_class = GrammarArticleSerializer
@@ -563,14 +727,25 @@ class GrammarArticleViewSet(viewsets.ModelViewSet):
         """支持筛选和搜索"""
         queryset = super().get_queryset()
         
-        # 搜索
+        # 列表只读取存储的预览字段，不加载全文和段落数据
+        if self.action == 'list':
+            queryset = queryset.defer('content', 'paragraph_offsets', 'sentence_offsets')
+        # 分页阅读只按需读取当前页的正文（句子偏移量只在请求时读取）
+        elif self.action == 'content_paginated':
+            queryset = queryset.defer('content', 'sentence_offsets')
+        
+        # 搜索（优先使用全文索引，按BM25相关度排序）
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(content__icontains=search) |
-                Q(category__icontains=search)
-            )
+            ranked = apply_ranked_search(queryset, search)
+            if ranked is not None:
+                queryset = ranked
+            else:
+                queryset = queryset.filter(
+                    Q(title__icontains=search) | 
+                    Q(content__icontains=search) |
+                    Q(category__icontains=search)
+                )
         
         # 难度筛选
         difficulty = self.request.query_params.get('difficulty', None)
@@ -584,283 +759,44 @@ class GrammarArticleViewSet(viewsets.ModelViewSet):
         
         return queryset
 
-    @action(detail=False, methods=['post'])
-    def generate_content(self, request):
-        """使用AI生成语法文章内容"""
-        prompt = request.data.get('prompt', '').strip()
-        ai_config = request.data.get('ai_config', {})
-        
-        if not prompt:
-            return Response({
-                'error': '提示词不能为空'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            content = None
-            
-            # 获取AI配置
-            provider = ai_config.get('provider', '')
-            api_key = ai_config.get('apiKey', '')
-            custom_url = ai_config.get('customUrl', '')
-            
-            # 如果有真实的API配置，尝试调用
-            if provider and api_key:
-                try:
-                    if provider in ['openai', 'deepseek']:
-                        # OpenAI/DeepSeek兼容API
-                        import openai
-                        
-                        # 配置客户端
-                        if provider == 'deepseek':
-                            client = openai.OpenAI(
-                                api_key=api_key,
-                                base_url='https://api.deepseek.com'
-                            )
-                            model = 'deepseek-chat'
-                        else:
-                            client = openai.OpenAI(api_key=api_key)
-                            model = 'gpt-3.5-turbo'
-                        
-                        # 调用API
-                        response = client.chat.completions.create(
-                            model=model,
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant that writes English grammar articles for language learners. Write clear, well-structured grammar explanations with examples."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=2000,
-                            temperature=0.7
-                        )
-                        content = response.choices[0].message.content
-                        
-                    elif provider == 'claude':
-                        # Anthropic Claude API
-                        import anthropic
-                        client = anthropic.Anthropic(api_key=api_key)
-                        message = client.messages.create(
-                            model="claude-3-sonnet-20240229",
-                            max_tokens=2000,
-                            messages=[
-                                {"role": "user", "content": f"Write an English grammar article for language learners based on this prompt: {prompt}"}
-                            ]
-                        )
-                        content = message.content[0].text
-                        
-                    elif provider == 'custom' and custom_url:
-                        # 自定义API（OpenAI兼容）
-                        import openai
-                        client = openai.OpenAI(
-                            api_key=api_key,
-                            base_url=custom_url
-                        )
-                        response = client.chat.completions.create(
-                            model='gpt-3.5-turbo',
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant that writes English grammar articles."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=2000
-                        )
-                        content = response.choices[0].message.content
-                        
-                except ImportError:
-                    # SDK未安装，返回提示
-                    content = f"""⚠️ AI SDK Not Installed
-
-To use {provider.upper()} API, please install the required package:
-
-For OpenAI/DeepSeek:
-pip install openai
-
-For Claude:
-pip install anthropic
-
----
-
-Your prompt was: "{prompt}"
-
-Please install the SDK and restart the server to use real AI generation."""
-                
-                except Exception as api_error:
-                    # API调用失败，返回错误信息和示例内容
-                    content = f"""⚠️ AI API Error: {str(api_error)}
-
-Showing sample content instead...
-
----
-
-# Sample Grammar Article
-
-Based on your prompt: "{prompt}"
-
-## Grammar Point
-
-This section would explain the grammar concept in detail.
-
-## Usage and Rules
+    def list(self, request, *args, **kwargs):
+        """语法文章列表（搜索时附带高亮摘要，结果走响应缓存）"""
+        key = response_cache.list_key(GrammarArticle, request)
+        return Response(response_cache.get_or_build(key, request, self._list_data))
 
-Clear explanation of when and how to use this grammar point.
+    def _list_data(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        articles = page if page is not None else list(queryset)
 
-## Examples
-
-1. Correct usage examples
-2. Common mistakes to avoid
-3. Practice exercises
-
----
-
-Note: This is sample content shown because the AI API call failed."""
-            
-            # 如果没有配置或调用失败，返回示例内容
-            if not content:
-                content = f"""# Sample Grammar Article
-
-**Your prompt:** {prompt}
-
-## Overview
-
-This is a **sample grammar article** for demonstration purposes. To use real AI generation, please configure your AI API in the Personal Center.
-
-## How to Configure
-
-1. Go to **Personal Center** (个人中心)
-2. Configure your **AI API** settings
-3. Choose a provider (OpenAI, Claude, DeepSeek, etc.)
-4. Enter your API key
-5. Save the configuration
-
-## What You'll Get
-
-Once configured, the system will generate professional grammar articles including:
-
-- Clear explanations of grammar rules
-- Practical examples and usage scenarios
-- Common mistakes and how to avoid them
-- Practice exercises for learners
+        context = self.get_serializer_context()
+        search = self.request.query_params.get('search', None)
+        if search:
+            context['search_snippets'] = get_snippets(
+                GrammarArticle, search, [article.id for article in articles]
+            )
+        serializer = GrammarArticleListSerializer(articles, many=True, context=context)
 
----
+        if page is not None:
+            return self.get_paginated_response(serializer.data).data
+        return serializer.data
 
-💡 **Tip:** DeepSeek is recommended for Chinese users - fast, affordable, and excellent grammar content generation."""
-            
-            return Response({
-                'content': content,
-                'prompt': prompt,
-                'provider': provider if provider else 'demo'
-            })
-            
-        except Exception as e:
-            return Response({
-                'error': f'生成失败: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    @action(detail=False, methods=['post'])
+    def generate_content(self, request):
+        """使用AI生成语法文章内容"""
+        return generate_content_response(request, 'grammar')
 
     @action(detail=True, methods=['get'])
+    @conditional_article
     def content_paginated(self, request, pk=None):
-        """分页获取语法文章内容（支持智能分页）"""
-        article = self.get_object()
-        page = int(request.query_params.get('page', 1))
-        
-        # 获取分页配置（支持按字符数智能分页）
-        pagination_mode = request.query_params.get('mode', 'smart')  # smart 或 fixed
-        target_chars = int(request.query_params.get('target_chars', 4000))
-        min_chars = int(request.query_params.get('min_chars', 2000))
-        max_chars = int(request.query_params.get('max_chars', 8000))
-        min_paragraphs = int(request.query_params.get('min_paragraphs', 2))
-        max_paragraphs = int(request.query_params.get('max_paragraphs', 15))
-        
-        # 使用存储的段落数据
-        if not article.paragraphs or len(article.paragraphs) == 0:
-            # 实时分割并保存
-            paragraphs = [p.strip() for p in article.content.split('\n\n') if p.strip()]
-            article.paragraphs = paragraphs
-            article.paragraph_count = len(paragraphs)
-            article.save()
-        else:
-            paragraphs = article.paragraphs
-        
-        # 根据模式选择分页方式
-        if pagination_mode == 'smart':
-            # 智能分页：按字符数
-            pages = self._smart_paginate(
-                paragraphs,
-                target_chars=target_chars,
-                min_chars=min_chars,
-                max_chars=max_chars,
-                min_paragraphs=min_paragraphs,
-                max_paragraphs=max_paragraphs
-            )
-        else:
-            # 固定分页：按段落数（兼容旧方式）
-            page_size = int(request.query_params.get('page_size', 8))
-            paginator = Paginator(paragraphs, page_size)
-            pages = [list(paginator.get_page(i).object_list) for i in range(1, paginator.num_pages + 1)]
-        
-        # 获取指定页
-        total_pages = len(pages)
-        if page < 1:
-            page = 1
-        elif page > total_pages:
-            page = total_pages
-        
-        current_page_paragraphs = pages[page - 1] if pages else []
-        
-        # 计算当前页的字符数
-        current_page_chars = sum(len(p) for p in current_page_paragraphs)
-        
-        return Response({
-            'current_page': page,
-            'total_pages': total_pages,
-            'total_paragraphs': len(paragraphs),
-            'paragraphs': current_page_paragraphs,
-            'has_next': page < total_pages,
-            'has_previous': page > 1,
-            # 页面信息
-            'page_info': {
-                'paragraph_count': len(current_page_paragraphs),
-                'char_count': current_page_chars,
-                'pagination_mode': pagination_mode
-            },
-            # 基本文章信息
-            'article_id': article.id,
-            'article_title': article.title,
-            'word_count': article.word_count,
-            'paragraph_count': article.paragraph_count
-        })
-    
-    def _smart_paginate(self, paragraphs, target_chars=4000, min_chars=2000, 
-                       max_chars=8000, min_paragraphs=2, max_paragraphs=15):
-        """智能分页算法（与ArticleViewSet相同）"""
-        pages = []
-        current_page = []
-        current_length = 0
-        
-        for paragraph in paragraphs:
-            para_length = len(paragraph.strip())
-            
-            if para_length == 0:
-                continue
-            
-            should_paginate = False
-            
-            if len(current_page) >= max_paragraphs:
-                should_paginate = True
-            elif current_length + para_length > max_chars and len(current_page) >= min_paragraphs:
-                should_paginate = True
-            elif (len(current_page) >= min_paragraphs and 
-                  current_length >= target_chars):
-                should_paginate = True
-            
-            if should_paginate and current_page:
-                pages.append(current_page)
-                current_page = []
-                current_length = 0
-            
-            current_page.append(paragraph)
-            current_length += para_length
-        
-        if current_page:
-            pages.append(current_page)
-        
-        return pages if pages else [[]]
+        """
+        分页获取语法文章内容（支持智能分页），结果按文章版本和查询参数缓存
+
+        参数 pages=N-M 或 window=k 时一次返回连续的多页，供阅读器预取
+        """
+        key = response_cache.page_key(GrammarArticle, pk, request)
+        data = response_cache.get_or_build(key, request, lambda: paginated_content_data(self, request))
+        return Response(data)
 
     @action(detail=True, methods=['post'])
     def record_reading(self, request, pk=None):
@@ -874,7 +810,7 @@ Once configured, the system will generate professional grammar articles includin
         })
 
 
-class UserGrammarArticleViewSet(viewsets.ModelViewSet):
+class UserGrammarArticleViewSet(KeysetPaginationMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
     """用户语法文章视图集"""
     queryset = UserGrammarArticle.objects.filter(is_active=True)
     serializer_class = UserGrammarArticleSerializer
@@ -889,18 +825,26 @@ class UserGrammarArticleViewSet(viewsets.ModelViewSet):
         """支持筛选和搜索，只显示当前用户的文章"""
         queryset = super().get_queryset()
         
+        # 列表只读取存储的预览字段，不加载全文和段落数据
+        if self.action == 'list':
+            queryset = queryset.defer('content', 'paragraph_offsets', 'sentence_offsets')
+        
         # 获取用户标识
         username = get_user_identifier(self.request)
         queryset = queryset.filter(author=username)
         
-        # 搜索
+        # 搜索（优先使用全文索引，按BM25相关度排序）
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(content__icontains=search) |
-                Q(category__icontains=search)
-            )
+            ranked = apply_ranked_search(queryset, search)
+            if ranked is not None:
+                queryset = ranked
+            else:
+                queryset = queryset.filter(
+                    Q(title__icontains=search) | 
+                    Q(content__icontains=search) |
+                    Q(category__icontains=search)
+                )
         
         # 难度筛选
         difficulty = self.request.query_params.get('difficulty', None)
@@ -914,6 +858,24 @@ class UserGrammarArticleViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """用户语法文章列表（搜索时附带高亮摘要）"""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        articles = page if page is not None else list(queryset)
+
+        context = self.get_serializer_context()
+        search = request.query_params.get('search', None)
+        if search:
+            context['search_snippets'] = get_snippets(
+                UserGrammarArticle, search, [article.id for article in articles]
+            )
+        serializer = UserGrammarArticleListSerializer(articles, many=True, context=context)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
     def perform_create(self, serializer):
         """创建时自动设置作者"""
         # 优先使用请求中的author字段，如果没有则使用用户标识
@@ -932,168 +894,115 @@ class UserGrammarArticleViewSet(viewsets.ModelViewSet):
     def generate_content(self, request):
         """使用AI生成用户语法文章内容"""
         # 与GrammarArticleViewSet的generate_content相同
-        prompt = request.data.get('prompt', '').strip()
-        ai_config = request.data.get('ai_config', {})
-        
-        if not prompt:
-            return Response({
-                'error': '提示词不能为空'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            content = None
-            
-            # 获取AI配置
-            provider = ai_config.get('provider', '')
-            api_key = ai_config.get('apiKey', '')
-            custom_url = ai_config.get('customUrl', '')
-            
-            # 如果有真实的API配置，尝试调用
-            if provider and api_key:
-                try:
-                    if provider in ['openai', 'deepseek']:
-                        # OpenAI/DeepSeek兼容API
-                        import openai
-                        
-                        # 配置客户端
-                        if provider == 'deepseek':
-                            client = openai.OpenAI(
-                                api_key=api_key,
-                                base_url='https://api.deepseek.com'
-                            )
-                            model = 'deepseek-chat'
-                        else:
-                            client = openai.OpenAI(api_key=api_key)
-                            model = 'gpt-3.5-turbo'
-                        
-                        # 调用API
-                        response = client.chat.completions.create(
-                            model=model,
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant that writes English grammar articles for language learners. Write clear, well-structured grammar explanations with examples."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=2000,
-                            temperature=0.7
-                        )
-                        content = response.choices[0].message.content
-                        
-                    elif provider == 'claude':
-                        # Anthropic Claude API
-                        import anthropic
-                        client = anthropic.Anthropic(api_key=api_key)
-                        message = client.messages.create(
-                            model="claude-3-sonnet-20240229",
-                            max_tokens=2000,
-                            messages=[
-                                {"role": "user", "content": f"Write an English grammar article for language learners based on this prompt: {prompt}"}
-                            ]
-                        )
-                        content = message.content[0].text
-                        
-                    elif provider == 'custom' and custom_url:
-                        # 自定义API（OpenAI兼容）
-                        import openai
-                        client = openai.OpenAI(
-                            api_key=api_key,
-                            base_url=custom_url
-                        )
-                        response = client.chat.completions.create(
-                            model='gpt-3.5-turbo',
-                            messages=[
-                                {"role": "system", "content": "You are a helpful assistant that writes English grammar articles."},
-                                {"role": "user", "content": prompt}
-                            ],
-                            max_tokens=2000
-                        )
-                        content = response.choices[0].message.content
-                        
-                except ImportError:
-                    # SDK未安装，返回提示
-                    content = f"""⚠️ AI SDK Not Installed
-
-To use {provider.upper()} API, please install the required package:
-
-For OpenAI/DeepSeek:
-pip install openai
-
-For Claude:
-pip install anthropic
-
----
-
-Your prompt was: "{prompt}"
-
-Please install the SDK and restart the server to use real AI generation."""
-                
-                except Exception as api_error:
-                    # API调用失败，返回错误信息和示例内容
-                    content = f"""⚠️ AI API Error: {str(api_error)}
-
-Showing sample content instead...
+        return generate_content_response(request, 'grammar')
 
----
 
-# Sample Grammar Article
-
-Based on your prompt: "{prompt}"
-
-## Grammar Point
-
-This section would explain the grammar concept in detail.
-
-## Usage and Rules
-
-Clear explanation of when and how to use this grammar point.
-
-## Examples
-
-1. Correct usage examples
-2. Common mistakes to avoid
-3. Practice exercises
-
----
-
-Note: This is sample content shown because the AI API call failed."""
-            
-            # 如果没有配置或调用失败，返回示例内容
-            if not content:
-                content = f"""# Sample Grammar Article
-
-**Your prompt:** {prompt}
-
-## Overview
-
-This is a **sample grammar article** for demonstration purposes. To use real AI generation, please configure your AI API in the Personal Center.
-
-## How to Configure
+class TranslateView(APIView):
+    """
+    批量段落翻译（共享翻译记忆）
+    
+    POST /api/translate/
+        {"paragraphs": ["...", ...], "source": "en", "target": "zh-CN"}
+    返回:
+        {"translations": [{"original", "translated"}, ...], "hits", "misses", "failed", "timed_out",
+         "untranslated": [未翻译段落的下标, ...]}
+    
+    每个客户端按 settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']['translate'] 限流。
+    """
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'translate'
+    
+    def post(self, request):
+        paragraphs = request.data.get('paragraphs')
+        if not isinstance(paragraphs, list) or not all(isinstance(p, str) for p in paragraphs):
+            return Response({'error': 'paragraphs 必须是字符串列表'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(paragraphs) > MAX_BATCH_SIZE:
+            return Response(
+                {'error': f'每次最多翻译 {MAX_BATCH_SIZE} 个段落'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if any(len(p) > MAX_PARAGRAPH_LENGTH for p in paragraphs):
+            return Response(
+                {'error': f'单个段落不能超过 {MAX_PARAGRAPH_LENGTH} 个字符'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if sum(len(p) for p in paragraphs) > MAX_TOTAL_CHARS:
+            return Response(
+                {'error': f'每次最多翻译 {MAX_TOTAL_CHARS} 个字符'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        source = request.data.get('source', 'en')
+        target = request.data.get('target', 'zh-CN')
+        for lang in (source, target):
+            if not isinstance(lang, str) or not 0 < len(lang) <= 10:
+                return Response({'error': '无效的语言代码'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        translations, stats = translate_paragraphs(paragraphs, source=source, target=target)
+        return Response({'translations': translations, **stats})
 
-1. Go to **Personal Center** (个人中心)
-2. Configure your **AI API** settings
-3. Choose a provider (OpenAI, Claude, DeepSeek, etc.)
-4. Enter your API key
-5. Save the configuration
 
-## What You'll Get
+class DictionaryView(APIView):
+    """
+    离线词典查词
+    
+    GET  /api/dictionary/?word=apple          单个单词，未收录返回404
+    GET  /api/dictionary/?words=apple,went    多个单词
+    POST /api/dictionary/ {"words": [...]}    批量查询（换页后一次恢复全部单词翻译）
+    """
+    
+    def get(self, request):
+        word = request.query_params.get('word')
+        if word:
+            entry = lookup_words([word]).get(word.strip())
+            if entry is None:
+                return Response({'error': '词典中没有这个单词'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(entry)
+        words = [w for w in request.query_params.get('words', '').split(',') if w.strip()]
+        return self.lookup(words)
+    
+    def post(self, request):
+        words = request.data.get('words')
+        if not isinstance(words, list) or not all(isinstance(w, str) for w in words):
+            return Response({'error': 'words 必须是字符串列表'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.lookup(words)
+    
+    def lookup(self, words):
+        if not words:
+            return Response({'error': '请提供要查询的单词'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(words) > MAX_LOOKUP_WORDS:
+            return Response(
+                {'error': f'每次最多查询 {MAX_LOOKUP_WORDS} 个单词'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        entries = lookup_words(words)
+        return Response({
+            'entries': entries,
+            'found': sum(1 for entry in entries.values() if entry is not None),
+        })
 
-Once configured, the system will generate professional grammar articles including:
 
-- Clear explanations of grammar rules
-- Practical examples and usage scenarios
-- Common mistakes and how to avoid them
-- Practice exercises for learners
+class GenerationCacheView(APIView):
+    """
+    AI 生成缓存的命中率统计（当前进程）
+    
+    GET /api/generation-cache/
+    返回:
+        {"hits", "misses", "stores", "bypassed", "evictions", "hit_rate"}
+    """
+    
+    def get(self, request):
+        return Response(generation_cache.stats())
 
----
 
-💡 **Tip:** DeepSeek is recommended for Chinese users - fast, affordable, and excellent grammar content generation."""
-            
-            return Response({
-                'content': content,
-                'prompt': prompt,
-                'provider': provider if provider else 'demo'
-            })
-            
-        except Exception as e:
-            return Response({
-                'error': f'生成失败: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+class ResponseCacheView(APIView):
+    """
+    文章列表和分页内容响应缓存的统计（当前进程）
+    
+    GET /api/response-cache/
+    返回:
+        {"hits", "misses", "stores", "evictions", "hit_rate"}
+    """
+    
+    def get(self, request):
+        return Response(response_cache.stats())
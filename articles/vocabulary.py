@@ -0,0 +1,96 @@
+"""
+文章词频表
+
+与前端 extractWords 的规则一致：转为小写，只统计连续字母组成的单词，忽略单个字母。
+词频按文章保存到 ArticleWordCount 表：page=0 为全文词频，
+page>=1 为默认参数智能分页（与 content_paginated 默认分页一致）每一页的词频。
+文章保存时删除旧词频并清除 Article.vocabulary_indexed 标记，首次请求 /vocabulary/ 或运行
+`python manage.py build_vocabulary` 时重新生成。
+"""
+import re
+from collections import Counter
+
+from django.db import transaction
+
+from .page_boundaries import get_smart_offsets
+from .paragraphs import compute_paragraph_offsets, unpack_paragraph_offsets, paragraph_lengths
+
+
+WORD_TOKEN_RE = re.compile(r'[a-z]+')
+
+# 少于这个长度的单词不统计（与前端一致）
+MIN_WORD_LENGTH = 2
+
+# 超过字段长度的"单词"通常是乱码，不统计
+MAX_WORD_LENGTH = 100
+
+VOCABULARY_SORTS = {
+    'frequency': ('-count', 'word'),
+    'alpha': ('word',),
+}
+
+
+def count_words(text):
+    """统计文本的词频"""
+    return Counter(
+        word for word in WORD_TOKEN_RE.findall(text.lower())
+        if MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH
+    )
+
+
+def build_vocabulary(article):
+    """重新生成文章的全文词频和分页词频，返回写入的行数"""
+    from .models import Article, ArticleWordCount
+
+    content = article.content or ''
+    paragraph_offsets = unpack_paragraph_offsets(article.paragraph_offsets)
+    if not paragraph_offsets:
+        # 兼容旧数据：没有保存段落偏移量时按正文计算
+        paragraph_offsets = compute_paragraph_offsets(content)
+    offsets = get_smart_offsets(article, paragraph_lengths(paragraph_offsets))
+
+    totals = Counter()
+    rows = []
+    for page in range(1, len(offsets)):
+        start, end = offsets[page - 1], offsets[page]
+        if start >= end:
+            continue
+        page_counts = count_words(
+            content[paragraph_offsets[2 * start]:paragraph_offsets[2 * end - 1]]
+        )
+        totals.update(page_counts)
+        rows.extend(
+            ArticleWordCount(article_id=article.pk, page=page, word=word, count=count)
+            for word, count in page_counts.items()
+        )
+    rows.extend(
+        ArticleWordCount(article_id=article.pk, page=0, word=word, count=count)
+        for word, count in totals.items()
+    )
+
+    with transaction.atomic():
+        ArticleWordCount.objects.filter(article_id=article.pk).delete()
+        # 并发请求可能同时生成，重复行忽略即可
+        ArticleWordCount.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+        # 只在正文未被并发修改时标记（按内容哈希匹配）；不经过 save()，不影响 updated_at 和缓存版本号
+        Article.objects.filter(
+            pk=article.pk, content_hash=article.content_hash
+        ).update(vocabulary_indexed=True)
+    article.vocabulary_indexed = True
+    return len(rows)
+
+
+def ensure_vocabulary(article):
+    """文章还没有词频表时生成"""
+    if not article.vocabulary_indexed:
+        build_vocabulary(article)
+
+
+def invalidate_vocabulary(article):
+    """删除文章的词频表并清除已生成标记（文章内容变化时在 save() 之前调用）"""
+    from .models import ArticleWordCount
+
+    article.vocabulary_indexed = False
+    if article.pk is None:
+        return
+    ArticleWordCount.objects.filter(article_id=article.pk).delete()
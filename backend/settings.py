@@ -10,6 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import atexit
+import shutil
+import sys
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -86,6 +90,54 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# 进程内的 LocMemCache 在多进程部署时互不相通：响应缓存、生成缓存可以各进程一份，
+# 但文章的缓存版本号必须共享（一个进程中的修改要使所有进程的缓存失效），因此 versions 使用 FileBasedCache；
+# 多台服务器部署时应换成 Redis 等共享缓存。
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 文章表和单篇文章的缓存版本号（articles/cache_versions.py）
+    'versions': {
+        'BACKEND': 'articles.cache_backends.MeteredFileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'versions',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+    # 文章列表和分页内容的响应缓存（articles/response_cache.py）
+    'responses': {
+        'BACKEND': 'articles.cache_backends.MeteredLocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    # AI生成内容缓存（articles/generation_cache.py）
+    # LocMemCache 按最近访问顺序淘汰；CULL_FREQUENCY 与 MAX_ENTRIES 相同时，
+    # 缓存满后每次只淘汰最久未使用的一条
+    'generation': {
+        'BACKEND': 'articles.cache_backends.MeteredLocMemCache',
+        'LOCATION': 'generation',
+        'TIMEOUT': 7 * 24 * 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+            'CULL_FREQUENCY': 1000,
+        },
+    },
+}
+
+# 运行测试时版本号写入临时目录：不写入工作目录，也不与正在运行的开发服务器共享版本号
+if sys.argv[1:2] == ['test']:
+    CACHES['versions']['LOCATION'] = tempfile.mkdtemp(prefix='paperread-test-versions-')
+    atexit.register(shutil.rmtree, CACHES['versions']['LOCATION'], True)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -139,4 +191,8 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # 按客户端IP限流（ScopedRateThrottle，计数保存在默认缓存中）
+    'DEFAULT_THROTTLE_RATES': {
+        'translate': '30/min',
+    },
 }
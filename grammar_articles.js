@@ -794,6 +794,48 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
+
+// 读取流式生成的事件（server-sent events），每个文本片段调用一次 onDelta
+async function readGenerationEvents(response, onDelta) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        
+        // 事件之间以空行分隔
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let eventType = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) {
+                    eventType = line.slice(7);
+                } else if (line.startsWith('data: ')) {
+                    data += line.slice(6);
+                }
+            });
+            const payload = JSON.parse(data);
+            
+            if (eventType === 'error') {
+                throw new Error(payload.error);
+            }
+            if (eventType === 'done') {
+                return;
+            }
+            onDelta(payload.delta);
+        }
+    }
+}
+
 // AI生成内容
 async function generateContent() {
     const aiPrompt = document.getElementById('aiPrompt');
@@ -841,42 +883,55 @@ async function generateContent() {
         generateStatus.style.display = 'flex';
         generateStatus.querySelector('.status-text').textContent = '正在生成中...';
         
-        // 调用后端API生成内容，传递AI配置
-        const response = await fetch(`${API_BASE_URL}/${apiEndpoint}/generate_content/`, {
+        // 调用后端API流式生成内容，传递AI配置
+        const requestGeneration = stream => fetch(`${API_BASE_URL}/${apiEndpoint}/generate_content/`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({ 
                 prompt: prompt,
-                ai_config: aiConfig  // 传递AI配置给后端
+                ai_config: aiConfig,  // 传递AI配置给后端
+                stream: stream
             })
         });
+        let response = await requestGeneration(true);
         
-        if (!response.ok) {
-            throw new Error('生成失败');
-        }
-        
-        const data = await response.json();
-        
-        // 将生成的内容填充到文章内容框
-        if (data.content) {
+        if (response.status === 501) {
+            // 后端不在 ASGI 服务器下运行，不支持流式输出：改为生成完成后一次性填充
+            response = await requestGeneration(false);
+            if (!response.ok) {
+                throw new Error('生成失败');
+            }
+            const data = await response.json();
             articleContent.value = data.content;
             updateContentStats();
+        } else {
+            if (!response.ok) {
+                throw new Error('生成失败');
+            }
             
-            // 更新状态
-            generateStatus.querySelector('.status-icon').textContent = '✅';
-            generateStatus.querySelector('.status-text').textContent = '生成成功！';
-            generateStatus.style.color = '#4caf50';
-            
-            // 3秒后隐藏状态
-            setTimeout(() => {
-                generateStatus.style.display = 'none';
-                generateStatus.querySelector('.status-icon').textContent = '⏳';
-                generateStatus.style.color = '#4caf50';
-            }, 3000);
+            // 边接收边把生成的内容填充到文章内容框
+            articleContent.value = '';
+            await readGenerationEvents(response, delta => {
+                articleContent.value += delta;
+                articleContent.scrollTop = articleContent.scrollHeight;
+                updateContentStats();
+            });
         }
         
+        // 更新状态
+        generateStatus.querySelector('.status-icon').textContent = '✅';
+        generateStatus.querySelector('.status-text').textContent = '生成成功！';
+        generateStatus.style.color = '#4caf50';
+        
+        // 3秒后隐藏状态
+        setTimeout(() => {
+            generateStatus.style.display = 'none';
+            generateStatus.querySelector('.status-icon').textContent = '⏳';
+            generateStatus.style.color = '#4caf50';
+        }, 3000);
+        
     } catch (error) {
         console.error('生成内容失败:', error);
         
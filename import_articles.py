@@ -13,21 +13,180 @@
 3. 指定元数据：
    python import_articles.py --file book.txt --title "书名" --category "技术" --difficulty advanced
 
-4. 自动检测书籍章节：
+4. 重复文章处理（按内容哈希跳过未变化的文章，标题相同时按策略处理）：
+   python import_articles.py --dir ./articles/ --on-duplicate update
+
+5. 自动检测书籍章节：
    python import_articles.py --file book.txt --detect-chapters
+
+6. 多进程批量导入（读取、解码和分析在进程池中完成，分批写入数据库）：
+   python import_articles.py --dir ./articles/ --workers 4
+
+7. 自定义分类关键词表（JSON: {"分类": ["关键词", ...]}）：
+   python import_articles.py --dir ./articles/ --keywords my_keywords.json
 """
 import os
 import sys
+import time
 import django
 import argparse
+import codecs
+import mmap
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 # 设置Django环境
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
-from articles.models import Article
+from django.db import transaction
+
+from articles.cache_versions import bump_version_on_commit
+from articles.classifier import get_classifier
+from articles.concordance import index_articles
+from articles.models import Article, compute_content_fields, compute_content_hash
+from articles.readability import score_text
+from articles.search import add_many_to_index
+
+
+# 常见章节标记（按优先级排列）: Chapter 1, 第一章, CHAPTER ONE, etc.
+CHAPTER_PATTERNS = [
+    r'Chapter\s+\d+',
+    r'CHAPTER\s+\d+',
+    r'第[一二三四五六七八九十百]+章',
+    r'\d+\.\s+[A-Z]',  # 1. Introduction
+]
+
+# 所有章节模式合并为一个正则：零宽前瞻使不同模式的匹配可以重叠，lastgroup 指出命中的模式
+CHAPTER_RE = re.compile(
+    '(?=' + '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(CHAPTER_PATTERNS)) + ')',
+    re.IGNORECASE
+)
+
+# 流式读取的块大小（字符数）
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# 章节标题可能跨越两个读取块，每块末尾保留这么多字符留到下一块再匹配
+HEADING_OVERLAP = 256
+
+# 候选编码（按优先级排列，没有BOM时依次用样本试解码）
+ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'utf-16']
+
+# 字节顺序标记 -> 编码
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# 编码检测读取的样本字节数
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# 中文编码解码后"合理"的非ASCII字符：汉字、中文标点、全角字符
+CJK_CHAR_RE = re.compile(r'[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]')
+
+
+def guess_encoding(data):
+    """
+    根据BOM和文件开头的样本判断编码
+
+    参数:
+        data: 文件的全部字节（bytes 或 mmap），只会读取开头的样本
+
+    返回:
+        (编码, 置信度 0~1)，所有候选编码都无法解码样本时返回 (None, 0.0)
+    """
+    for bom, encoding in BOMS:
+        if data[:len(bom)] == bom:
+            return encoding, 1.0
+
+    sample = data[:ENCODING_SAMPLE_SIZE]
+    complete = len(sample) == len(data)
+    for encoding in ENCODINGS:
+        try:
+            # final=False：样本末尾被截断的多字节字符不算错误
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+        except UnicodeDecodeError:
+            continue
+        return encoding, _encoding_confidence(encoding, sample, text, complete)
+    return None, 0.0
+
+
+def _encoding_confidence(encoding, sample, text, complete):
+    """估计样本解码结果的可信程度"""
+    if sample.isascii():
+        # 纯ASCII样本：检查过整个文件时可以确定，否则后面仍可能出现非ASCII字节
+        return 1.0 if complete else 0.9
+    if encoding == 'utf-8':
+        # 多字节UTF-8序列很少能被其他编码的文本偶然凑出
+        return 0.99
+    non_ascii = [char for char in text if ord(char) > 0x7f]
+    ratio = sum(1 for char in non_ascii if CJK_CHAR_RE.match(char)) / len(non_ascii)
+    # 没有BOM的UTF-16几乎能解码任何偶数长度的字节，可信度打折
+    return round(ratio * (0.5 if encoding == 'utf-16' else 0.95), 2)
+
+
+def decode_bytes(data):
+    """
+    判断编码后只完整解码一次
+
+    返回:
+        (文本, 编码, 置信度)；无法解码时抛出 UnicodeDecodeError
+    """
+    encoding, confidence = guess_encoding(data)
+    if encoding is not None:
+        try:
+            return str(data, encoding), encoding, confidence
+        except UnicodeDecodeError:
+            pass
+
+    # 样本之后才出现非法字节（很少见）：依次完整尝试其余候选编码
+    for fallback in ENCODINGS:
+        if fallback == encoding:
+            continue
+        try:
+            return str(data, fallback), fallback, round(confidence / 2, 2)
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError('unknown', b'', 0, 1, f'无法识别文件编码，尝试的编码: {ENCODINGS}')
+
+
+def read_text(file_path):
+    """把文件映射到内存，读取一次并解码，返回 (文本, 编码, 置信度)"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return '', 'utf-8', 1.0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return decode_bytes(data)
+
+
+def iter_text_chunks(file_path, encoding):
+    """按块读取已解码的文本，产出 (文本块, 是否最后一块)"""
+    with open(file_path, 'r', encoding=encoding) as f:
+        chunk = f.read(STREAM_CHUNK_SIZE)
+        while chunk:
+            next_chunk = f.read(STREAM_CHUNK_SIZE)
+            yield chunk, not next_chunk
+            chunk = next_chunk
+
+
+def iter_scan_windows(file_path, encoding):
+    """
+    产出用于正则扫描的窗口 (base, buffer, start, limit)
+
+    只处理起点在 [start, limit) 内的匹配；limit 之后的字符会留到下一个窗口，
+    base 为 buffer 开头在整个文件中的字符偏移量。
+    """
+    base = 0
+    carry = ''
+    for chunk, final in iter_text_chunks(file_path, encoding):
+        buffer = carry + chunk
+        limit = len(buffer) if final else max(0, len(buffer) - HEADING_OVERLAP)
+        yield base, buffer, 0, limit
+        carry = buffer[limit:]
+        base += limit
 
 
 class ArticleImporter:
@@ -39,29 +198,51 @@ class ArticleImporter:
         'advanced': '高级'
     }
     
-    def __init__(self):
+    # 标题相同但内容不同时的处理策略
+    DUPLICATE_POLICIES = ('skip', 'update', 'new')
+    
+    def __init__(self, verbose=True, on_duplicate='skip', keywords_file=None):
+        if on_duplicate not in self.DUPLICATE_POLICIES:
+            raise ValueError(f"无效的重复处理策略: {on_duplicate}")
+        self.verbose = verbose
+        self.on_duplicate = on_duplicate
+        # 分类关键词表（None 表示使用 articles/category_keywords.json）
+        self.keywords_file = keywords_file
+        self.classifier = get_classifier(keywords_file)
         self.imported_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
         self.failed_count = 0
         self.skipped_count = 0
+        # 吞吐量统计
+        self.bytes_read = 0
+        # 编码统计: 编码 -> [文件数, 最低置信度]
+        self.encoding_stats = {}
+        self.started_at = time.perf_counter()
     
     def read_file(self, file_path):
-        """读取文件内容，自动检测编码"""
-        encodings = ['utf-8', 'gbk', 'gb2312', 'utf-16']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                print(f"✓ 使用编码 {encoding} 成功读取文件")
-                return content
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
+        """读取文件内容，自动检测编码（文件只读取和解码一次）"""
+        try:
+            content, encoding, confidence = read_text(file_path)
+        except UnicodeDecodeError:
+            if self.verbose:
+                print(f"✗ 无法识别文件编码，尝试的编码: {ENCODINGS}")
+            return None
+        except Exception as e:
+            if self.verbose:
                 print(f"✗ 读取文件失败: {e}")
-                return None
+            return None
         
-        print(f"✗ 无法识别文件编码，尝试的编码: {encodings}")
-        return None
+        self.record_encoding(encoding, confidence)
+        if self.verbose:
+            print(f"✓ 使用编码 {encoding} 成功读取文件（置信度 {confidence:.0%}）")
+        return content
+    
+    def record_encoding(self, encoding, confidence):
+        """记录检测到的编码，用于导入摘要"""
+        stats = self.encoding_stats.setdefault(encoding, [0, confidence])
+        stats[0] += 1
+        stats[1] = min(stats[1], confidence)
     
     def extract_title(self, content, filename):
         """从内容或文件名提取标题"""
@@ -77,42 +258,13 @@ class ArticleImporter:
         return Path(filename).stem.replace('_', ' ').replace('-', ' ').title()
     
     def detect_category(self, content, title):
-        """自动检测文章分类"""
-        keywords = {
-            '技术': ['technology', 'programming', 'software', 'computer', 'AI', 'machine learning'],
-            '科学': ['science', 'research', 'study', 'experiment'],
-            '商业': ['business', 'marketing', 'management', 'economy'],
-            '健康': ['health', 'medical', 'wellness', 'fitness'],
-            '教育': ['education', 'learning', 'teaching', 'study'],
-            '文学': ['literature', 'novel', 'story', 'fiction'],
-            '新闻': ['news', 'report', 'current', 'event'],
-        }
-        
-        text = (content + ' ' + title).lower()
-        
-        for category, words in keywords.items():
-            for word in words:
-                if word.lower() in text:
-                    return category
-        
-        return '其他'
+        """自动检测文章分类（返回关键词命中次数最多的分类）"""
+        return self.classifier.classify(title + '\n' + content)
     
     def detect_difficulty(self, content):
-        """自动检测文章难度"""
-        # 简单的难度判断：基于词汇复杂度和句子长度
-        words = re.findall(r'\b[a-zA-Z]+\b', content)
-        if not words:
-            return 'intermediate'
-        
-        # 平均单词长度
-        avg_word_length = sum(len(word) for word in words) / len(words)
-        
-        if avg_word_length < 5:
-            return 'beginner'
-        elif avg_word_length < 6.5:
-            return 'intermediate'
-        else:
-            return 'advanced'
+        """自动检测文章难度（Flesch-Kincaid 年级结合生僻词比例）"""
+        difficulty, _ = score_text(content)
+        return difficulty
     
     def clean_content(self, content):
         """清理文章内容"""
@@ -122,6 +274,71 @@ class ArticleImporter:
         content = content.strip()
         return content
     
+    def analyze_content(self, content, file_path, title=None, category=None, difficulty=None, source=None):
+        """清理内容并提取元数据，返回创建文章所需的字段"""
+        # 清理内容
+        content = self.clean_content(content)
+        
+        # 提取或使用指定的元数据
+        article_title = title or self.extract_title(content, file_path)
+        detected_difficulty, reading_level = score_text(content)
+        return {
+            'title': article_title,
+            'content': content,
+            'category': category or self.detect_category(content, article_title),
+            'difficulty': difficulty or detected_difficulty,
+            'reading_level': reading_level,
+            'source': source or f"导入自: {Path(file_path).name}",
+            'content_hash': compute_content_hash(content),
+        }
+    
+    def find_duplicates(self, batch):
+        """
+        一次性查询一批文章的重复情况
+        
+        返回:
+            (已存在的内容哈希集合, {标题: 已有文章})
+        """
+        unchanged_hashes = set(
+            Article.objects.filter(
+                content_hash__in=[fields['content_hash'] for fields in batch]
+            ).values_list('content_hash', flat=True)
+        )
+        existing_by_title = {}
+        for article in Article.objects.filter(
+            title__in=[fields['title'] for fields in batch]
+        ).defer('content').order_by('id'):
+            existing_by_title.setdefault(article.title, article)
+        return unchanged_hashes, existing_by_title
+    
+    def plan_import(self, fields, unchanged_hashes, existing_by_title):
+        """
+        根据内容哈希和重复处理策略决定如何导入一篇文章
+        
+        返回 (action, article)：
+            ('unchanged', None)  内容完全相同的文章已存在，无需写入
+            ('skip', None)       标题已存在且策略为 skip
+            ('update', article)  原地更新已有文章（保留ID、标注、阅读历史和收藏），尚未保存
+            ('create', article)  新文章，尚未保存
+        """
+        if fields['content_hash'] in unchanged_hashes:
+            return 'unchanged', None
+        
+        existing = existing_by_title.get(fields['title'])
+        if existing and self.on_duplicate == 'skip':
+            return 'skip', None
+        
+        # 同一批次中后续的相同内容或标题也按重复处理
+        unchanged_hashes.add(fields['content_hash'])
+        if existing and self.on_duplicate == 'update':
+            for field, value in fields.items():
+                setattr(existing, field, value)
+            return 'update', existing
+        
+        article = Article(**fields)
+        existing_by_title.setdefault(fields['title'], article)
+        return 'create', article
+    
     def import_article(self, file_path, title=None, category=None, difficulty=None, source=None):
         """导入单篇文章"""
         print(f"\n{'='*60}")
@@ -134,40 +351,29 @@ class ArticleImporter:
             print(f"✗ 跳过文件: {file_path}")
             self.failed_count += 1
             return False
+        self.bytes_read += os.path.getsize(file_path)
         
-        # 清理内容
-        content = self.clean_content(content)
+        fields = self.analyze_content(
+            content, file_path,
+            title=title, category=category, difficulty=difficulty, source=source
+        )
         
-        # 提取或使用指定的元数据
-        article_title = title or self.extract_title(content, file_path)
-        article_category = category or self.detect_category(content, article_title)
-        article_difficulty = difficulty or self.detect_difficulty(content)
-        article_source = source or f"导入自: {Path(file_path).name}"
-        
-        # 检查是否已存在
-        existing = Article.objects.filter(title=article_title).first()
-        if existing:
-            print(f"⚠ 文章已存在: {article_title}")
-            choice = input("是否覆盖? (y/n): ").lower()
-            if choice != 'y':
-                print(f"✗ 已跳过")
-                self.skipped_count += 1
-                return False
-            else:
-                existing.delete()
-                print(f"✓ 已删除旧版本")
+        # 检查是否已存在（不交互，按内容哈希和 --on-duplicate 策略处理）
+        action, article = self.plan_import(fields, *self.find_duplicates([fields]))
+        if action == 'unchanged':
+            print(f"= 内容未变化，已跳过: {fields['title']}")
+            self.unchanged_count += 1
+            return False
+        if action == 'skip':
+            print(f"⊗ 文章已存在，已跳过: {fields['title']}")
+            self.skipped_count += 1
+            return False
         
-        # 创建文章
+        # 创建或原地更新文章
         try:
-            article = Article.objects.create(
-                title=article_title,
-                content=content,
-                category=article_category,
-                difficulty=article_difficulty,
-                source=article_source
-            )
+            article.save()
             
-            print(f"\n✓ 导入成功!")
+            print(f"\n✓ {'更新' if action == 'update' else '导入'}成功!")
             print(f"  标题: {article.title}")
             print(f"  分类: {article.category}")
             print(f"  难度: {self.DIFFICULTY_CHOICES.get(article.difficulty, article.difficulty)}")
@@ -175,7 +381,10 @@ class ArticleImporter:
             print(f"  段落数: {article.paragraph_count}")
             print(f"  ID: {article.id}")
             
-            self.imported_count += 1
+            if action == 'update':
+                self.updated_count += 1
+            else:
+                self.imported_count += 1
             return True
             
         except Exception as e:
@@ -183,8 +392,8 @@ class ArticleImporter:
             self.failed_count += 1
             return False
     
-    def import_directory(self, dir_path, pattern='*.txt', **kwargs):
-        """批量导入目录中的文章"""
+    def import_directory(self, dir_path, pattern='*.txt', workers=1, batch_size=200, **kwargs):
+        """批量导入目录中的文章（workers > 1 时使用多进程并行导入）"""
         dir_path = Path(dir_path)
         
         if not dir_path.exists():
@@ -201,81 +410,276 @@ class ArticleImporter:
         print(f"\n找到 {len(files)} 个文件")
         print(f"{'='*60}\n")
         
-        for file_path in files:
-            self.import_article(str(file_path), **kwargs)
+        if workers > 1:
+            self.import_files_parallel(files, workers, batch_size, **kwargs)
+        else:
+            for file_path in files:
+                self.import_article(str(file_path), **kwargs)
         
         self.print_summary()
     
-    def detect_and_import_book_chapters(self, file_path, **kwargs):
-        """检测书籍章节并分章节导入"""
+    def import_files_parallel(self, files, workers, batch_size=200, **kwargs):
+        """
+        多进程导入：子进程负责读取、解码、清理和分析，
+        主进程按批次用 bulk_create 在单个事务中写入
+        """
+        print(f"⚡ 并行导入: {workers} 个进程，每批写入 {batch_size} 篇")
+        chunksize = max(1, min(16, len(files) // (workers * 4)))
+        batch = []
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                analyze_file, [str(f) for f in files], repeat(kwargs), repeat(self.keywords_file),
+                chunksize=chunksize
+            )
+            for result in results:
+                if 'error' in result:
+                    print(f"✗ {result['file_path']}: {result['error']}")
+                    self.failed_count += 1
+                    continue
+                self.bytes_read += result.pop('size')
+                self.record_encoding(result.pop('encoding'), result.pop('confidence'))
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    self.write_batch(batch)
+                    batch = []
+        
+        if batch:
+            self.write_batch(batch)
+    
+    def dedupe_batch(self, batch):
+        """
+        update 策略下同一批次中标题相同的文章只保留最后一篇（与逐个导入时的最终结果一致），
+        前面的按跳过计数，避免同一篇文章既计为导入又计为更新
+        """
+        if self.on_duplicate != 'update':
+            return batch
+        
+        latest = {fields['title']: fields for fields in batch}
+        kept = []
+        for fields in batch:
+            if latest[fields['title']] is fields:
+                kept.append(fields)
+            else:
+                print(f"⊗ 同一批次中有同名文章，以后者为准: {fields['title']} ({fields['file_path']})")
+                self.skipped_count += 1
+        return kept
+    
+    def write_batch(self, batch):
+        """在一个事务中批量写入一批已分析的文章（按内容哈希和重复策略去重）"""
+        batch = self.dedupe_batch(batch)
+        unchanged_hashes, existing_by_title = self.find_duplicates(batch)
+        
+        to_create = []
+        to_update = []
+        for fields in batch:
+            file_path = fields.pop('file_path')
+            action, article = self.plan_import(fields, unchanged_hashes, existing_by_title)
+            if action == 'unchanged':
+                self.unchanged_count += 1
+            elif action == 'skip':
+                print(f"⊗ 文章已存在，已跳过: {fields['title']} ({file_path})")
+                self.skipped_count += 1
+            elif action == 'update':
+                to_update.append(article)
+            else:
+                to_create.append(article)
+        
+        with transaction.atomic():
+            # bulk_create 不会调用 save()，派生字段已在子进程中计算，这里补建全文索引和单词位置索引
+            created = Article.objects.bulk_create(to_create)
+            add_many_to_index(Article, [article.pk for article in created])
+            index_articles(created)
+            if created:
+                bump_version_on_commit(Article)
+            # 更新通常很少，逐条 save() 以同步索引和分页缓存
+            for article in to_update:
+                article.save()
+        
+        self.imported_count += len(created)
+        self.updated_count += len(to_update)
+        if created or to_update:
+            print(f"✓ 已写入 {len(created)} 篇，更新 {len(to_update)} 篇（累计导入 {self.imported_count} 篇）")
+    
+    def detect_encoding(self, file_path):
+        """根据BOM和文件开头的样本判断编码（文件映射到内存，只读取样本）"""
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                encoding, confidence = 'utf-8', 1.0
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    encoding, confidence = guess_encoding(data)
+        
+        if encoding is not None:
+            self.record_encoding(encoding, confidence)
+        return encoding
+    
+    def detect_chapter_pattern(self, file_path, encoding):
+        """
+        流式扫描一遍文件，用合并后的正则同时统计所有章节模式的匹配数
+        
+        返回优先级最高且至少匹配2次的模式下标；最高优先级的模式
+        一旦匹配2次即可确定结果，提前结束扫描。没有章节时返回None。
+        """
+        counts = [0] * len(CHAPTER_PATTERNS)
+        last_end = [-1] * len(CHAPTER_PATTERNS)
+        
+        for base, buffer, start, limit in iter_scan_windows(file_path, encoding):
+            for match in CHAPTER_RE.finditer(buffer, start):
+                if match.start() >= limit:
+                    break
+                index = int(match.lastgroup[1:])
+                # 同一模式的匹配互不重叠（与单独 finditer 的结果一致）
+                if base + match.start() < last_end[index]:
+                    continue
+                last_end[index] = base + match.end(match.lastgroup)
+                counts[index] += 1
+                if counts[0] > 1:
+                    return 0
+        
+        for index, count in enumerate(counts):
+            if count > 1:  # 至少2章才认为是书籍
+                return index
+        return None
+    
+    def iter_chapters(self, file_path, encoding, pattern):
+        """
+        流式按章节标题切分书籍，逐章产出 (章节标题, 章节内容)
+        
+        内存中最多保留当前章节和一个读取块；第一个章节标题之前的内容（前言等）不导入。
+        """
+        regex = re.compile(pattern, re.IGNORECASE)
+        carry = ''
+        resume = 0
+        heading = None
+        
+        for chunk, final in iter_text_chunks(file_path, encoding):
+            buffer = carry + chunk
+            limit = len(buffer) if final else max(0, len(buffer) - HEADING_OVERLAP)
+            chapter_start = 0
+            for match in regex.finditer(buffer, resume):
+                if match.start() >= limit:
+                    break
+                if heading is not None:
+                    yield heading, buffer[chapter_start:match.start()].strip()
+                heading = match.group()
+                chapter_start = match.start()
+            
+            if heading is None:
+                carry = buffer[limit:]
+                resume = 0
+            else:
+                carry = buffer[chapter_start:]
+                resume = max(limit - chapter_start, 1)
+        
+        if heading is not None:
+            yield heading, carry.strip()
+    
+    def detect_and_import_book_chapters(self, file_path, batch_size=200, **kwargs):
+        """检测书籍章节并分章节导入（流式读取，章节内容直接批量写入，不生成临时文件）"""
         print(f"\n📚 检测书籍章节: {file_path}")
         
-        content = self.read_file(file_path)
-        if not content:
+        encoding = self.detect_encoding(file_path)
+        if encoding is None:
+            print(f"✗ 无法识别文件编码，尝试的编码: {ENCODINGS}")
+            self.failed_count += 1
             return
         
-        # 尝试按章节分割
         # 常见章节标记: Chapter 1, 第一章, CHAPTER ONE, etc.
-        chapter_patterns = [
-            r'Chapter\s+\d+',
-            r'CHAPTER\s+\d+',
-            r'第[一二三四五六七八九十百]+章',
-            r'\d+\.\s+[A-Z]',  # 1. Introduction
-        ]
-        
-        chapters = []
-        for pattern in chapter_patterns:
-            matches = list(re.finditer(pattern, content, re.IGNORECASE))
-            if len(matches) > 1:  # 至少2章才认为是书籍
-                print(f"✓ 检测到 {len(matches)} 个章节 (模式: {pattern})")
-                
-                for i, match in enumerate(matches):
-                    start = match.start()
-                    end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
-                    chapter_content = content[start:end].strip()
-                    chapter_title = match.group()
-                    
-                    chapters.append({
-                        'title': chapter_title,
-                        'content': chapter_content
-                    })
-                break
-        
-        if not chapters:
+        pattern_index = self.detect_chapter_pattern(file_path, encoding)
+        if pattern_index is None:
             print(f"⚠ 未检测到章节标记，作为单篇文章导入")
             return self.import_article(file_path, **kwargs)
         
+        pattern = CHAPTER_PATTERNS[pattern_index]
+        print(f"✓ 检测到章节 (模式: {pattern})")
+        
         # 导入各章节
         book_title = kwargs.get('title', Path(file_path).stem)
+        chapter_count = 0
+        batch = []
         
-        for i, chapter in enumerate(chapters, 1):
+        for heading, chapter_content in self.iter_chapters(file_path, encoding, pattern):
             chapter_kwargs = kwargs.copy()
-            chapter_kwargs['title'] = f"{book_title} - {chapter['title']}"
+            chapter_kwargs['title'] = f"{book_title} - {heading}"
             
-            # 临时保存章节内容
-            temp_file = f"/tmp/chapter_{i}.txt"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                f.write(chapter['content'])
+            fields = self.analyze_content(chapter_content, file_path, **chapter_kwargs)
+            fields.update(compute_content_fields(fields['content']))
+            fields['file_path'] = file_path
+            batch.append(fields)
+            chapter_count += 1
             
-            self.import_article(temp_file, **chapter_kwargs)
-            os.remove(temp_file)
+            if len(batch) >= batch_size:
+                self.write_batch(batch)
+                batch = []
         
+        if batch:
+            self.write_batch(batch)
+        
+        self.bytes_read += os.path.getsize(file_path)
+        print(f"✓ 共检测到 {chapter_count} 个章节")
         self.print_summary()
     
     def print_summary(self):
         """打印导入摘要"""
-        total = self.imported_count + self.failed_count + self.skipped_count
+        total = (self.imported_count + self.updated_count + self.unchanged_count
+                 + self.failed_count + self.skipped_count)
         
         print(f"\n{'='*60}")
         print(f"📊 导入摘要")
         print(f"{'='*60}")
         print(f"  总计: {total}")
         print(f"  ✓ 成功: {self.imported_count}")
+        print(f"  ↻ 更新: {self.updated_count}")
+        print(f"  = 未变化: {self.unchanged_count}")
         print(f"  ✗ 失败: {self.failed_count}")
         print(f"  ⊗ 跳过: {self.skipped_count}")
+        
+        # 吞吐量
+        elapsed = time.perf_counter() - self.started_at
+        if elapsed > 0 and total:
+            megabytes = self.bytes_read / (1024 * 1024)
+            print(f"  ⏱ 耗时: {elapsed:.2f} 秒")
+            print(f"  ⚡ 吞吐量: {total / elapsed:.1f} 文件/秒, {megabytes / elapsed:.2f} MB/秒")
+        
+        # 检测到的编码及最低置信度
+        for encoding, (count, confidence) in sorted(self.encoding_stats.items(),
+                                                    key=lambda item: -item[1][0]):
+            print(f"  🔤 编码 {encoding}: {count} 个文件（最低置信度 {confidence:.0%}）")
         print(f"{'='*60}\n")
 
 
+def analyze_file(file_path, overrides, keywords_file=None):
+    """
+    在子进程中读取、解码、清理并分析单个文件（不访问数据库）
+    
+    分类器按关键词表文件缓存，每个子进程只构建一次。
+
+    返回创建文章所需的全部字段（包括 save() 通常会计算的派生字段）；
+    失败时返回 {'file_path': ..., 'error': ...}
+    """
+    try:
+        content, encoding, confidence = read_text(file_path)
+    except UnicodeDecodeError:
+        return {'file_path': file_path, 'error': f'无法识别文件编码，尝试的编码: {ENCODINGS}'}
+    except Exception as e:
+        return {'file_path': file_path, 'error': str(e)}
+    
+    importer = ArticleImporter(verbose=False, keywords_file=keywords_file)
+    try:
+        if not content:
+            return {'file_path': file_path, 'error': '文件为空'}
+        fields = importer.analyze_content(content, file_path, **overrides)
+        fields.update(compute_content_fields(fields['content']))
+        fields['file_path'] = file_path
+        fields['size'] = os.path.getsize(file_path)
+        fields['encoding'] = encoding
+        fields['confidence'] = confidence
+        return fields
+    except Exception as e:
+        return {'file_path': file_path, 'error': str(e)}
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='导入文章或书籍到数据库',
@@ -291,6 +695,15 @@ def main():
   # 批量导入目录
   python import_articles.py --dir ./articles/ --category "科学"
   
+  # 重新导入目录：内容未变化的跳过，标题相同但内容变化的原地更新
+  python import_articles.py --dir ./articles/ --on-duplicate update
+  
+  # 使用4个进程并行导入目录
+  python import_articles.py --dir ./articles/ --workers 4 --batch-size 500
+  
+  # 使用自定义分类关键词表
+  python import_articles.py --dir ./articles/ --keywords my_keywords.json
+  
   # 导入书籍（自动检测章节）
   python import_articles.py --file book.txt --detect-chapters --title "书名"
         """
@@ -307,10 +720,21 @@ def main():
     parser.add_argument('--difficulty', choices=['beginner', 'intermediate', 'advanced'],
                        help='难度级别（不指定则自动判断）')
     parser.add_argument('--source', '-s', help='文章来源')
+    parser.add_argument('--keywords', metavar='FILE',
+                       help='分类关键词表 JSON 文件 {"分类": ["关键词", ...]}（默认: articles/category_keywords.json）')
+    
+    # 重复处理
+    parser.add_argument('--on-duplicate', choices=ArticleImporter.DUPLICATE_POLICIES, default='skip',
+                       help='内容哈希相同的文章总是跳过；标题相同但内容不同时：'
+                            'skip=跳过（默认），update=原地更新并保留ID，new=另建新文章')
     
     # 批量导入选项
     parser.add_argument('--pattern', '-p', default='*.txt',
                        help='文件匹配模式（仅用于目录导入，默认: *.txt）')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='并行进程数（仅用于目录导入，默认: 1 即逐个导入）')
+    parser.add_argument('--batch-size', type=int, default=200,
+                       help='并行导入或章节导入时每个事务写入的文章数（默认: 200）')
     
     # 书籍选项
     parser.add_argument('--detect-chapters', action='store_true',
@@ -318,7 +742,7 @@ def main():
     
     args = parser.parse_args()
     
-    importer = ArticleImporter()
+    importer = ArticleImporter(on_duplicate=args.on_duplicate, keywords_file=args.keywords)
     
     # 准备参数
     kwargs = {}
@@ -334,12 +758,18 @@ def main():
     # 执行导入
     if args.file:
         if args.detect_chapters:
-            importer.detect_and_import_book_chapters(args.file, **kwargs)
+            importer.detect_and_import_book_chapters(args.file, batch_size=args.batch_size, **kwargs)
         else:
             importer.import_article(args.file, **kwargs)
             importer.print_summary()
     elif args.dir:
-        importer.import_directory(args.dir, pattern=args.pattern, **kwargs)
+        importer.import_directory(
+            args.dir,
+            pattern=args.pattern,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            **kwargs
+        )
 
 
 if __name__ == '__main__':
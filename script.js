@@ -14,7 +14,7 @@ let translationMode = false; // 翻译模式开关
 let currentAnnotationColor = '#28a745'; // 当前选择的标注颜色（默认绿色）
 let translatedWords = new Set(); // 存储已翻译的单词
 let wordTranslations = new Map(); // 存储单词翻译缓存 {word: translation}
-let annotatedSentences = new Map(); // 存储标注的句子 {sentenceId: color}
+let annotatedSentences = new Map(); // 存储标注的句子 {sentenceId: color}，sentenceId 为句子在整篇文章中的下标（s0, s1, ...）
 let annotationsHidden = false; // 标注隐藏状态
 let translationsHidden = false; // 翻译隐藏状态
 
@@ -32,6 +32,11 @@ let totalPages = 1; // 总页数
 let paragraphsPerPage = 8; // 每页段落数
 let currentParagraphCount = 0; // 当前文章段落总数
 
+// 分页预取：一次请求当前页及之后的若干页，翻到这些页时不再请求后端
+const PREFETCH_WINDOW = 3; // 每次请求的页数（window 参数）
+let prefetchedPages = new Map(); // 已取得的页 {页码: 分页数据}
+let prefetchedQuery = null; // 预取数据对应的文章和分页参数，变化后清空
+
 // DOM元素
 const articleDisplay = document.getElementById('articleDisplay');
 const articleTitle = document.getElementById('articleTitle');
@@ -185,7 +190,8 @@ async function loadArticleContent(articleId, page = 1) {
         const config = { ...defaultConfig, ...paginationConfig };
         
         // 构建API URL
-        let url = `${API_BASE_URL}/articles/${articleId}/content_paginated/?page=${page}&mode=${paginationMode}`;
+        // sentences=true：句子由后端切分，前端不再做分句
+        let url = `${API_BASE_URL}/articles/${articleId}/content_paginated/?mode=${paginationMode}&sentences=true`;
         
         if (paginationMode === 'smart') {
             // 智能分页：传递字符数参数
@@ -200,13 +206,28 @@ async function loadArticleContent(articleId, page = 1) {
             url += `&page_size=${fixedPageSize}`;
         }
         
-        const response = await fetch(url);
-        
-        if (!response.ok) {
-            throw new Error('获取分页内容失败');
+        // 文章或分页参数变化后，之前预取的页不再可用
+        if (prefetchedQuery !== url) {
+            prefetchedQuery = url;
+            prefetchedPages.clear();
         }
         
-        const data = await response.json();
+        let data = prefetchedPages.get(page);
+        if (!data) {
+            // 一次取回从当前页开始的 PREFETCH_WINDOW 页
+            const response = await fetch(`${url}&page=${page}&window=${PREFETCH_WINDOW}`);
+            
+            if (!response.ok) {
+                throw new Error('获取分页内容失败');
+            }
+            
+            const windowData = await response.json();
+            windowData.pages.forEach(pageData => {
+                prefetchedPages.set(pageData.current_page, { ...pageData, total_pages: windowData.total_pages });
+            });
+            // 页码超出范围时后端返回最近的有效页
+            data = prefetchedPages.get(windowData.pages[0].current_page);
+        }
         
         // 更新分页信息
         currentPage = data.current_page;
@@ -226,7 +247,7 @@ async function loadArticleContent(articleId, page = 1) {
         extractWords(text);
         
         // 显示当前页内容
-        displayPagedContent(data.paragraphs);
+        displayPagedContent(data.paragraphs, data.sentences, data.sentence_start_index);
         
         // 更新分页控件
         updatePaginationControls();
@@ -264,21 +285,25 @@ async function loadArticleContent(articleId, page = 1) {
 }
 
 // 显示分页内容
-function displayPagedContent(paragraphs) {
+// sentenceOffsets 为后端返回的每段句子偏移量（缺省时在前端分句），sentenceStartIndex 为本页第一个句子在文章中的下标；
+// 句子ID取句子在整篇文章中的下标，翻页、一次取多页或改变分页方式后都不变
+function displayPagedContent(paragraphs, sentenceOffsets, sentenceStartIndex = 0) {
     articleDisplay.innerHTML = '';
     
-    let sentenceIdCounter = 0;
+    let sentenceIndex = sentenceStartIndex;
     
-    paragraphs.forEach(paragraph => {
+    paragraphs.forEach((paragraph, index) => {
         const p = document.createElement('p');
         
-        // 将段落按句子分割（按 . ! ? 等标点符号）
-        const sentences = splitIntoSentences(paragraph);
+        // 将段落按句子分割
+        const sentences = sentenceOffsets
+            ? sentencesFromOffsets(paragraph, sentenceOffsets[index])
+            : splitIntoSentences(paragraph);
         
         let paragraphHTML = '';
         sentences.forEach(sentence => {
             if (sentence.trim()) {
-                const sentenceId = `sentence_${sentenceIdCounter++}`;
+                const sentenceId = `s${sentenceIndex++}`;
                 
                 // 将句子中的单词包装
                 const wrappedSentence = sentence.replace(/\b[a-zA-Z]+\b/g, (word) => {
@@ -316,8 +341,11 @@ function displayPagedContent(paragraphs) {
         });
     });
     
-    // 加载句子标注
+    // 加载句子标注（旧版本按页保存的标注换算为新的句子ID）
     loadSentenceAnnotationsFromLocal();
+    if (sentenceOffsets) {
+        migrateLegacySentenceAnnotations(paragraphs, sentenceOffsets, sentenceStartIndex);
+    }
     
     // 恢复标注和翻译
     restoreAnnotations();
@@ -328,6 +356,17 @@ function displayPagedContent(paragraphs) {
     articleDisplay.scrollTop = 0;
 }
 
+// 按后端返回的偏移量取出句子（句子间的空白归入前一个句子）
+function sentencesFromOffsets(text, offsets) {
+    if (!offsets || offsets.length === 0) {
+        return [text];
+    }
+    return offsets.map(([start], i) => {
+        const end = i + 1 < offsets.length ? offsets[i + 1][0] : text.length;
+        return text.substring(start, end);
+    });
+}
+
 // 将文本按句子分割
 function splitIntoSentences(text) {
     // 按句子结束符分割（. ! ? ; :）后面跟空格或结尾
@@ -349,6 +388,78 @@ function splitIntoSentences(text) {
     return sentences.length > 0 ? sentences : [text];
 }
 
+// 旧版本前端分句（与 splitIntoSentences 相同）得到的非空句子范围 [[start, end], ...]，只用于换算旧的句子标注
+function legacySentenceSpans(text) {
+    const spans = [];
+    const regex = /[^.!?;]+[.!?;]+\s*/g;
+    let match;
+    let matchedLength = 0;
+    
+    while ((match = regex.exec(text)) !== null) {
+        spans.push([match.index, match.index + match[0].length]);
+        matchedLength += match[0].length;
+    }
+    
+    // 与 splitIntoSentences 一致：按已匹配文本的总长度取剩余部分
+    if (matchedLength < text.length) {
+        spans.push([matchedLength, text.length]);
+    }
+    if (spans.length === 0) {
+        spans.push([0, text.length]);
+    }
+    
+    // 旧版本只为非空句子编号
+    return spans.filter(([start, end]) => text.substring(start, end).trim());
+}
+
+// 换算旧版本保存的句子标注
+// 旧标注按页保存（sentence_annotations_{用户}_{文章}_page{页码}），句子ID为前端分句后在本页内的序号 sentence_{n}；
+// 用旧的分句方式重新切分本页，把每个旧句子对应到与它重叠最多的新句子，换算后删除旧记录
+function migrateLegacySentenceAnnotations(paragraphs, sentenceOffsets, sentenceStartIndex) {
+    if (!currentArticleId) return;
+    
+    const username = getUsername();
+    const legacyKey = `sentence_annotations_${username}_${currentArticleId}_page${currentPage}`;
+    const saved = localStorage.getItem(legacyKey);
+    if (!saved) return;
+    
+    let legacyColors;
+    try {
+        legacyColors = new Map(JSON.parse(saved).map(ann => [ann.sentenceId, ann.color]));
+    } catch (e) {
+        console.error('读取旧的句子标注失败:', e);
+        return;
+    }
+    
+    let legacyIndex = 0;
+    let sentenceIndex = sentenceStartIndex;
+    paragraphs.forEach((paragraph, index) => {
+        const spans = sentenceOffsets[index] || [];
+        legacySentenceSpans(paragraph).forEach(([start, end]) => {
+            const color = legacyColors.get(`sentence_${legacyIndex++}`);
+            if (!color) return;
+            
+            let best = -1;
+            let bestOverlap = 0;
+            spans.forEach(([spanStart, spanEnd], i) => {
+                const overlap = Math.min(end, spanEnd) - Math.max(start, spanStart);
+                if (overlap > bestOverlap) {
+                    best = i;
+                    bestOverlap = overlap;
+                }
+            });
+            const sentenceId = `s${sentenceIndex + best}`;
+            if (best >= 0 && !annotatedSentences.has(sentenceId)) {
+                annotatedSentences.set(sentenceId, color);
+            }
+        });
+        sentenceIndex += spans.length;
+    });
+    
+    saveSentenceAnnotationsToLocal();
+    localStorage.removeItem(legacyKey);
+}
+
 // 清空文章
 function clearArticle() {
     articleDisplay.innerHTML = '<p class="placeholder-text">📚 请从文章列表选择文章开始阅读</p>';
@@ -638,12 +749,16 @@ function hexToRgba(hex, alpha) {
     return `rgba(${r}, ${g}, ${b}, ${alpha})`;
 }
 
+// 句子标注的本地存储键（句子ID在整篇文章中唯一，整篇文章保存在一起）
+function sentenceAnnotationsKey() {
+    return `sentence_annotations_v2_${getUsername()}_${currentArticleId}`;
+}
+
 // 保存句子标注到本地存储
 function saveSentenceAnnotationsToLocal() {
     if (!currentArticleId) return;
     
-    const username = getUsername();
-    const key = `sentence_annotations_${username}_${currentArticleId}_page${currentPage}`;
+    const key = sentenceAnnotationsKey();
     
     const annotations = Array.from(annotatedSentences.entries()).map(([sentenceId, color]) => ({
         sentenceId,
@@ -657,8 +772,7 @@ function saveSentenceAnnotationsToLocal() {
 function loadSentenceAnnotationsFromLocal() {
     if (!currentArticleId) return;
     
-    const username = getUsername();
-    const key = `sentence_annotations_${username}_${currentArticleId}_page${currentPage}`;
+    const key = sentenceAnnotationsKey();
     
     const saved = localStorage.getItem(key);
     if (saved) {
@@ -691,13 +805,22 @@ async function toggleWordTranslation(word) {
 }
 
 // 查询并显示单词翻译
-async function fetchAndShowTranslation(word) {
+async function fetchAndShowTranslation(word, useDictionary = true) {
     // 检查缓存
     if (wordTranslations.has(word)) {
         showWordTranslation(word, wordTranslations.get(word));
         return;
     }
     
+    // 优先查离线词典，未收录时再调用在线翻译
+    const entries = useDictionary ? await lookupDictionary([word]) : {};
+    if (entries[word]) {
+        const translation = dictionaryTranslation(entries[word]);
+        wordTranslations.set(word, translation);
+        showWordTranslation(word, translation);
+        return;
+    }
+    
     try {
         // 使用MyMemory Translation API
         const url = `https://api.mymemory.translated.net/get?q=${encodeURIComponent(word)}&langpair=en|zh-CN`;
@@ -719,6 +842,31 @@ async function fetchAndShowTranslation(word) {
     }
 }
 
+// 批量查询离线词典，返回 {单词: 词条或null}；接口不可用时返回空对象
+async function lookupDictionary(words) {
+    try {
+        const response = await fetch(`${API_BASE_URL}/dictionary/`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ words })
+        });
+        if (!response.ok) {
+            return {};
+        }
+        const data = await response.json();
+        return data.entries || {};
+    } catch (error) {
+        console.error('查询词典失败:', error);
+        return {};
+    }
+}
+
+// 词条的简短释义（词典释义的第一行）
+function dictionaryTranslation(entry) {
+    const translation = entry.translation || (entry.base && entry.base.translation) || '';
+    return translation.split('\n')[0];
+}
+
 // 显示单词翻译在单词后面
 function showWordTranslation(word, translation) {
     document.querySelectorAll(`.word[data-word="${word}"]`).forEach(el => {
@@ -749,12 +897,28 @@ function removeWordTranslation(word) {
 }
 
 // 恢复所有单词翻译（重新渲染后）
-function restoreWordTranslations() {
+async function restoreWordTranslations() {
     translatedWords.forEach(word => {
         if (wordTranslations.has(word)) {
             showWordTranslation(word, wordTranslations.get(word));
         }
     });
+    
+    // 没有缓存的单词一次批量查词典，查不到的逐个走在线翻译
+    const missing = [...translatedWords].filter(word => !wordTranslations.has(word));
+    if (missing.length === 0) {
+        return;
+    }
+    const entries = await lookupDictionary(missing);
+    for (const word of missing) {
+        if (entries[word]) {
+            const translation = dictionaryTranslation(entries[word]);
+            wordTranslations.set(word, translation);
+            showWordTranslation(word, translation);
+        } else {
+            await fetchAndShowTranslation(word, false);
+        }
+    }
 }
 
 // 清除所有翻译
@@ -1036,11 +1200,13 @@ async function handleTranslate() {
     translateBtn.textContent = '翻译中...';
     
     try {
-        // 使用免费的翻译API（MyMemory Translation API）
+        // 通过后端翻译接口（共享翻译记忆，未命中的段落由后端调用翻译API）
         translatedParagraphs = await translateText(currentArticleText);
         
-        // 缓存翻译结果
-        translationCache.set(currentArticleText, translatedParagraphs);
+        // 缓存翻译结果（有段落未翻译时不缓存，下次点击翻译时重试）
+        if (translatedParagraphs.every(item => item.translated !== '（翻译失败）')) {
+            translationCache.set(currentArticleText, translatedParagraphs);
+        }
         
         // 显示内联翻译
         displayInlineTranslation(translatedParagraphs);
@@ -1058,44 +1224,36 @@ async function handleTranslate() {
 
 // 调用翻译API - 返回段落数组
 async function translateText(text) {
-    // 将长文本分段翻译
+    // 整页段落提交给后端：已翻译过的段落直接从翻译记忆返回，其余由后端并发翻译
+    // 超过后端的时限仍未翻译的段落返回null，显示为翻译失败，再次点击翻译时重试
+    // 超过后端单段限制的段落按句子拆开提交，翻译后再拼回（translation-batches.js）
     const paragraphs = text.split('\n\n').filter(p => p.trim());
-    const translations = [];
+    const { batches, owners } = planTranslation(paragraphs);
+    const translatedPieces = [];
     
-    for (let para of paragraphs) {
-        if (!para.trim()) continue;
-        
-        // 使用MyMemory Translation API（免费，每天限额）
-        const url = `https://api.mymemory.translated.net/get?q=${encodeURIComponent(para)}&langpair=en|zh-CN`;
-        
+    for (const batch of batches) {
         try {
-            const response = await fetch(url);
-            const data = await response.json();
-            
-            if (data.responseStatus === 200 && data.responseData) {
-                translations.push({
-                    original: para,
-                    translated: data.responseData.translatedText
-                });
-            } else {
-                translations.push({
-                    original: para,
-                    translated: '（翻译失败）'
-                });
+            const response = await fetch(`${API_BASE_URL}/translate/`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ paragraphs: batch, source: 'en', target: 'zh-CN' })
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
             }
+            const data = await response.json();
             
-            // 避免请求过快
-            await new Promise(resolve => setTimeout(resolve, 300));
+            data.translations.forEach(item => translatedPieces.push(item.translated ?? null));
         } catch (err) {
             console.error('段落翻译失败:', err);
-            translations.push({
-                original: para,
-                translated: '（翻译失败）'
-            });
+            batch.forEach(() => translatedPieces.push(null));
         }
     }
     
-    return translations;
+    return joinTranslatedPieces(paragraphs, owners, translatedPieces).map(item => ({
+        original: item.original,
+        translated: item.translated ?? '（翻译失败）'
+    }));
 }
 
 // 显示内联翻译（在原文下方）
@@ -0,0 +1,97 @@
+/**
+ * 翻译请求分批工具
+ * 按后端翻译接口的限制拆分段落和请求，翻译后再按原段落拼回
+ */
+
+// 后端翻译接口的单次请求限制：段落数、总字符数和单个段落的字符数
+const TRANSLATE_BATCH_SIZE = 50;
+const TRANSLATE_BATCH_CHARS = 20000;
+const TRANSLATE_PARAGRAPH_CHARS = 5000;
+
+// 句子：到句末标点（及其后的引号、括号和空白）为止
+const SENTENCE_PATTERN = /[^.!?。！？]*[.!?。！？]+["'”’)\]]*\s*|[^.!?。！？]+$/g;
+
+// 把超过单段限制的段落按句子边界拆成若干片，单个句子仍超过限制时在空白处（没有空白时直接）截断
+function splitLongParagraph(para, limit = TRANSLATE_PARAGRAPH_CHARS) {
+    if (para.length <= limit) {
+        return [para];
+    }
+    const pieces = [];
+    let current = '';
+    const sentences = para.match(SENTENCE_PATTERN) || [para];
+    sentences.forEach(sentence => {
+        while (sentence.length > limit) {
+            let cut = sentence.lastIndexOf(' ', limit);
+            if (cut <= 0) {
+                cut = limit;
+            }
+            if (current) {
+                pieces.push(current);
+                current = '';
+            }
+            pieces.push(sentence.slice(0, cut));
+            sentence = sentence.slice(cut);
+        }
+        if (current.length + sentence.length > limit) {
+            pieces.push(current);
+            current = '';
+        }
+        current += sentence;
+    });
+    if (current) {
+        pieces.push(current);
+    }
+    return pieces.map(piece => piece.trim()).filter(piece => piece);
+}
+
+// 按后端限制把段落分成若干批（段落应已经过 splitLongParagraph）
+function translationBatches(paragraphs) {
+    const batches = [];
+    let batch = [];
+    let chars = 0;
+    paragraphs.forEach(para => {
+        if (batch.length > 0 && (batch.length >= TRANSLATE_BATCH_SIZE || chars + para.length > TRANSLATE_BATCH_CHARS)) {
+            batches.push(batch);
+            batch = [];
+            chars = 0;
+        }
+        batch.push(para);
+        chars += para.length;
+    });
+    if (batch.length > 0) {
+        batches.push(batch);
+    }
+    return batches;
+}
+
+// 拆分段落并分批：返回 { batches, owners }，owners[i] 为第 i 片所属段落的下标
+function planTranslation(paragraphs) {
+    const pieces = [];
+    const owners = [];
+    paragraphs.forEach((para, index) => {
+        splitLongParagraph(para).forEach(piece => {
+            pieces.push(piece);
+            owners.push(index);
+        });
+    });
+    return { batches: translationBatches(pieces), owners };
+}
+
+// 把各片的译文（失败为 null）按段落拼回；段落中任一片失败时整段为 null
+function joinTranslatedPieces(paragraphs, owners, translatedPieces) {
+    const joined = paragraphs.map(() => []);
+    translatedPieces.forEach((translated, i) => {
+        const parts = joined[owners[i]];
+        if (parts !== null) {
+            joined[owners[i]] = translated == null ? null : [...parts, translated];
+        }
+    });
+    return paragraphs.map((para, index) => ({
+        original: para,
+        translated: joined[index] === null ? null : joined[index].join('')
+    }));
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { splitLongParagraph, translationBatches, planTranslation, joinTranslatedPieces, TRANSLATE_PARAGRAPH_CHARS };
+}
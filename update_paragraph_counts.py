@@ -13,7 +13,7 @@ django.setup()
 from articles.models import Article
 
 def update_paragraph_counts():
-    """更新所有文章的段落数据（包含段落数组）"""
+    """更新所有文章的段落数据（包含段落偏移量）"""
     articles = Article.objects.all()
     total = articles.count()
     updated = 0
@@ -23,18 +23,16 @@ def update_paragraph_counts():
     
     for article in articles:
         if article.content:
-            paragraphs = [p.strip() for p in article.content.split('\n\n') if p.strip()]
-            article.paragraph_count = len(paragraphs)
-            article.paragraphs = paragraphs  # 存储段落数组
+            # save() 会重新计算段落数和段落偏移量
             article.save()
             updated += 1
-            print(f"✓ [{updated}/{total}] {article.title[:40]}... 段落数: {len(paragraphs)}, 已存储段落数据")
+            print(f"✓ [{updated}/{total}] {article.title[:40]}... 段落数: {article.paragraph_count}, 已存储段落偏移量")
         else:
             print(f"⊗ [{updated}/{total}] {article.title[:40]}... (无内容)")
     
     print("-" * 50)
     print(f"✅ 更新完成！共更新 {updated} 篇文章")
-    print(f"   所有文章的段落数据已存储到数据库")
+    print(f"   所有文章的段落偏移量已存储到数据库")
 
 if __name__ == '__main__':
     update_paragraph_counts()